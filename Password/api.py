@@ -0,0 +1,216 @@
+# api.py
+#
+# JSON endpoints for services that need passwords without driving the UI.
+# main.py mounts `router` on the NiceGUI app:
+#
+#   GET  /api/generate?length=18&special=false   one password and its strength
+#   GET  /api/generate/batch?count=100000         streamed, one password per line
+#   POST /api/score   {"password": ...} or {"passwords": [...]}
+#   POST /api/breach  {"password": ...} or {"sha1": "<hex digest>"}
+#
+# Strength scoring is CPU-bound pure Python, so it runs in a process pool and
+# the event loop keeps serving other requests meanwhile. Requests past
+# PASSWORD_API_MAX_CONCURRENCY queue for a slot and get a 503 if none frees up
+# within PASSWORD_API_QUEUE_TIMEOUT seconds.
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, constr
+
+import batch_generator
+import breach
+import strength
+
+WORKERS = int(os.environ.get('PASSWORD_API_WORKERS', os.cpu_count() or 1))
+MAX_CONCURRENCY = int(os.environ.get('PASSWORD_API_MAX_CONCURRENCY', '32'))
+QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_API_QUEUE_TIMEOUT', '5'))
+MAX_BATCH = int(os.environ.get('PASSWORD_API_MAX_BATCH', '1000000'))
+# Passwords scored per request, and per task sent to a worker process.
+MAX_SCORE_PASSWORDS = 1000
+SCORE_CHUNK = 100
+MAX_LENGTH = 128
+
+router = APIRouter(prefix='/api')
+
+_pool = None
+_slots = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawned rather than forked: the server process has threads and an
+        # event loop that a fork would copy in an unknown state. Each worker
+        # loads the word lists once when it starts.
+        _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context('spawn'),
+                                    initializer=strength.word_index)
+    return _pool
+
+
+def start_workers():
+    """Spawns the scoring workers up front so the first requests don't pay for it; registered with app.on_startup."""
+    pool = _get_pool()
+    for _ in range(WORKERS):
+        pool.submit(strength.estimate_strength, '')
+
+
+def shutdown():
+    """Stops the scoring workers; registered with app.on_shutdown."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def _acquire_slot():
+    """Waits for one of the MAX_CONCURRENCY request slots, or answers 503 after QUEUE_TIMEOUT."""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(MAX_CONCURRENCY)
+    try:
+        await asyncio.wait_for(_slots.acquire(), QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail='Server busy, try again shortly.',
+                            headers={'Retry-After': '1'}) from None
+
+
+@asynccontextmanager
+async def _slot():
+    await _acquire_slot()
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+class _SlotStreamingResponse(StreamingResponse):
+    """A streamed response that releases the request slot taken for it once it has been sent or abandoned."""
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            _slots.release()
+
+
+def _score_chunk(passwords):
+    return [strength.strength_report(password) for password in passwords]
+
+
+async def _score(passwords: List[str]):
+    loop = asyncio.get_running_loop()
+    chunks = [passwords[i:i + SCORE_CHUNK] for i in range(0, len(passwords), SCORE_CHUNK)]
+    results = await asyncio.gather(*(loop.run_in_executor(_get_pool(), _score_chunk, chunk) for chunk in chunks))
+    return [report for chunk in results for report in chunk]
+
+
+def _character_classes(upper: bool, lower: bool, digits: bool, special: bool) -> dict:
+    return {'use_upper': upper, 'use_lower': lower, 'use_digits': digits, 'use_special': special}
+
+
+# --- ENDPOINTS ---
+@router.get('/generate')
+async def generate(length: int = Query(18, ge=4, le=MAX_LENGTH), upper: bool = True, lower: bool = True,
+                   digits: bool = True, special: bool = True):
+    """One password that is not in the breach index, with its strength report."""
+    loop = asyncio.get_running_loop()
+    classes = _character_classes(upper, lower, digits, special)
+    async with _slot():
+        try:
+            passwords = await loop.run_in_executor(
+                None, lambda: batch_generator.generate_passwords(1, length, breach_index=breach.default_index(), **classes))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from None
+        password = passwords[0]
+        report, = await _score([password])
+    return {'password': password, 'strength': report}
+
+
+@router.get('/generate/batch')
+async def generate_batch(count: int = Query(..., ge=1, le=MAX_BATCH), length: int = Query(18, ge=4, le=MAX_LENGTH),
+                         upper: bool = True, lower: bool = True, digits: bool = True, special: bool = True):
+    """Streams `count` passwords as text, one per line, generated a chunk at a time."""
+    classes = _character_classes(upper, lower, digits, special)
+    try:
+        # Validates the options before the response starts streaming.
+        batch_generator.generate_batch(1, length, **classes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+
+    # The slot is taken before streaming starts, so a busy server can still
+    # answer 503. The response gives it back once it has been sent, including
+    # when the client leaves before the stream is first read.
+    await _acquire_slot()
+
+    async def stream():
+        loop = asyncio.get_running_loop()
+        index = breach.default_index()
+        remaining = count
+        while remaining > 0:
+            size = min(batch_generator.DEFAULT_CHUNK_SIZE, remaining)
+            batch = await loop.run_in_executor(
+                None, lambda: batch_generator.generate_batch(size, length, breach_index=index, **classes))
+            lines = np.full((size, length + 1), ord('\n'), dtype=np.uint8)
+            lines[:, :length] = batch
+            yield lines.tobytes()
+            remaining -= size
+
+    try:
+        return _SlotStreamingResponse(stream(), media_type='text/plain; charset=utf-8')
+    except BaseException:
+        _slots.release()
+        raise
+
+
+# Longer passwords are rejected with 422 before they reach a worker.
+Password = constr(max_length=MAX_LENGTH)
+
+
+class ScoreRequest(BaseModel):
+    password: Optional[Password] = None
+    passwords: Optional[List[Password]] = None
+
+
+@router.post('/score')
+async def score(request: ScoreRequest):
+    """Strength report for one password, or a list of reports in request order."""
+    passwords = [request.password] if request.password is not None else request.passwords
+    if not passwords:
+        raise HTTPException(status_code=400, detail='Send "password" or a non-empty "passwords" list.')
+    if len(passwords) > MAX_SCORE_PASSWORDS:
+        raise HTTPException(status_code=400, detail=f'At most {MAX_SCORE_PASSWORDS} passwords per request.')
+    async with _slot():
+        reports = await _score(passwords)
+    return reports[0] if request.password is not None else {'results': reports}
+
+
+class BreachRequest(BaseModel):
+    password: Optional[Password] = None
+    sha1: Optional[str] = None
+
+
+@router.post('/breach')
+async def breach_check(request: BreachRequest):
+    """Whether a password, or its SHA-1 digest, appears in the offline breach index."""
+    index = breach.default_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail='No breach index has been built on this server.')
+    if request.password is not None:
+        digest = breach.digest(request.password)
+    else:
+        try:
+            digest = bytes.fromhex(request.sha1 or '')
+        except ValueError:
+            digest = b''
+        if len(digest) != 20:
+            raise HTTPException(status_code=400, detail='Send "password" or a 40-character hex "sha1".')
+    seen = index.count_digest(digest)
+    return {'breached': seen > 0, 'count': seen}
@@ -0,0 +1,178 @@
+# batch_generator.py
+#
+# Bulk password generation, with no UI dependency.
+#
+#   python batch_generator.py 50000 --length 18 > passwords.txt
+#   python batch_generator.py 100000 --no-special --output passwords.txt
+#
+# Passwords follow the same rule as generate_password in main.py: every
+# selected character class appears at least once, the rest of the password is
+# drawn from all selected classes, and the characters are then shuffled. Rather
+# than calling secrets.choice once per character, each batch draws its
+# randomness from one large os.urandom buffer and does the work with NumPy.
+#
+# When a breach index has been built (see breach.py), any generated password
+# found in it is replaced before it is returned; --allow-breached skips the check.
+
+import argparse
+import hashlib
+import os
+import string
+import sys
+import time
+
+import numpy as np
+
+import breach
+
+CHARACTER_CLASSES = {
+    'upper': string.ascii_uppercase,
+    'lower': string.ascii_lowercase,
+    'digits': string.digits,
+    'special': string.punctuation,
+}
+
+# Passwords generated per NumPy batch when streaming.
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def _random_bytes(count: int) -> np.ndarray:
+    return np.frombuffer(os.urandom(count), dtype=np.uint8)
+
+
+def uniform_indices(n: int, count: int) -> np.ndarray:
+    """
+    Returns `count` uniformly random integers in [0, n) for n <= 256, using
+    rejection sampling: bytes at or above the largest multiple of n are
+    discarded, so `byte % n` carries no modulo bias.
+    """
+    limit = 256 - (256 % n)
+    accepted = np.empty(0, dtype=np.uint8)
+    while len(accepted) < count:
+        missing = count - len(accepted)
+        # Draw a little more than the expected need so one pass usually suffices.
+        draw = _random_bytes(int(missing * 256 / limit * 1.1) + 16)
+        accepted = np.concatenate([accepted, draw[draw < limit]])
+    return (accepted[:count] % n).astype(np.intp)
+
+
+def selected_classes(use_upper=True, use_lower=True, use_digits=True, use_special=True):
+    flags = {'upper': use_upper, 'lower': use_lower, 'digits': use_digits, 'special': use_special}
+    return [CHARACTER_CLASSES[name] for name, enabled in flags.items() if enabled]
+
+
+def _breached_rows(batch: np.ndarray, breach_index) -> np.ndarray:
+    """Boolean mask of the rows whose password appears in the breach index."""
+    return np.fromiter((breach_index.count_digest(hashlib.sha1(row.tobytes()).digest()) > 0 for row in batch),
+                       dtype=bool, count=len(batch))
+
+
+def generate_batch(count: int, length: int, use_upper=True, use_lower=True, use_digits=True, use_special=True,
+                   breach_index=None):
+    """
+    Returns `count` passwords as a (count, length) array of ASCII codes. With a
+    breach_index, passwords found in it are regenerated until none are.
+    """
+    classes = selected_classes(use_upper, use_lower, use_digits, use_special)
+    if not classes:
+        raise ValueError('Select at least one character type.')
+    if length < len(classes):
+        raise ValueError(f'Length must be at least {len(classes)} to fit one character of each selected type.')
+
+    pool = np.frombuffer(''.join(classes).encode('ascii'), dtype=np.uint8)
+    chars = np.empty((count, length), dtype=np.uint8)
+
+    # One guaranteed character from each selected class...
+    for column, charset in enumerate(classes):
+        charset_codes = np.frombuffer(charset.encode('ascii'), dtype=np.uint8)
+        chars[:, column] = charset_codes[uniform_indices(len(charset_codes), count)]
+    # ...and the rest drawn from the whole pool.
+    fill = length - len(classes)
+    if fill:
+        chars[:, len(classes):] = pool[uniform_indices(len(pool), count * fill)].reshape(count, fill)
+
+    # Shuffle each row: sorting by independent random 64-bit keys gives every
+    # permutation equal probability (ties are vanishingly unlikely).
+    keys = np.frombuffer(os.urandom(count * length * 8), dtype=np.uint64).reshape(count, length)
+    order = np.argsort(keys, axis=1)
+    batch = np.take_along_axis(chars, order, axis=1)
+
+    if breach_index is not None:
+        breached = _breached_rows(batch, breach_index)
+        while breached.any():
+            batch[breached] = generate_batch(int(breached.sum()), length, use_upper, use_lower, use_digits, use_special)
+            breached[breached] = _breached_rows(batch[breached], breach_index)
+    return batch
+
+
+def to_strings(batch: np.ndarray):
+    """Turns a batch of ASCII codes into a list of password strings."""
+    return [row.decode('ascii') for row in batch.view(f'S{batch.shape[1]}').ravel()]
+
+
+def generate_passwords(count: int, length: int, use_upper=True, use_lower=True, use_digits=True, use_special=True,
+                       breach_index=None):
+    """Returns `count` passwords as strings."""
+    return to_strings(generate_batch(count, length, use_upper, use_lower, use_digits, use_special, breach_index))
+
+
+def stream_passwords(count: int, length: int, use_upper=True, use_lower=True, use_digits=True, use_special=True,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE, breach_index=None):
+    """Yields `count` passwords, generated `chunk_size` at a time so memory stays flat."""
+    remaining = count
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        yield from to_strings(generate_batch(size, length, use_upper, use_lower, use_digits, use_special, breach_index))
+        remaining -= size
+
+
+def write_passwords(out, count: int, length: int, chunk_size: int = DEFAULT_CHUNK_SIZE, **classes) -> float:
+    """Writes `count` passwords, one per line, to a binary stream and returns the seconds taken."""
+    started = time.perf_counter()
+    remaining = count
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        batch = generate_batch(size, length, **classes)
+        lines = np.full((size, length + 1), ord('\n'), dtype=np.uint8)
+        lines[:, :length] = batch
+        out.write(lines.tobytes())
+        remaining -= size
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate passwords in bulk, one per line.')
+    parser.add_argument('count', type=int, help='number of passwords to generate')
+    parser.add_argument('--length', type=int, default=18)
+    parser.add_argument('--no-upper', action='store_true', help='leave out uppercase letters')
+    parser.add_argument('--no-lower', action='store_true', help='leave out lowercase letters')
+    parser.add_argument('--no-digits', action='store_true', help='leave out digits')
+    parser.add_argument('--no-special', action='store_true', help='leave out special characters')
+    parser.add_argument('--output', '-o', help='file to write to (default: stdout)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--allow-breached', action='store_true', help='skip the breached-password check')
+    args = parser.parse_args(argv)
+
+    classes = {
+        'use_upper': not args.no_upper, 'use_lower': not args.no_lower,
+        'use_digits': not args.no_digits, 'use_special': not args.no_special,
+    }
+    if not args.allow_breached:
+        classes['breach_index'] = breach.default_index()
+    try:
+        if args.output:
+            with open(args.output, 'wb') as out:
+                seconds = write_passwords(out, args.count, args.length, args.chunk_size, **classes)
+        else:
+            seconds = write_passwords(sys.stdout.buffer, args.count, args.length, args.chunk_size, **classes)
+            sys.stdout.flush()
+    except ValueError as e:
+        print(f'Error: {e}', file=sys.stderr)
+        sys.exit(1)
+
+    rate = args.count / seconds if seconds > 0 else float('inf')
+    print(f'Generated {args.count:,} passwords in {seconds:.2f}s ({rate:,.0f} passwords/s)', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
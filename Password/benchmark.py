@@ -0,0 +1,255 @@
+# benchmark.py
+#
+# Throughput benchmarks and statistical checks for password generation and
+# scoring, written to a JSON file so runs can be compared:
+#
+#   python benchmark.py                              # full run -> benchmark_results.json
+#   python benchmark.py --quick --baseline old.json  # smaller batches, compared with a previous run
+#
+# Throughput covers generate_password and password_cracker (password_logic.py)
+# and the NumPy batch generator, across lengths 4-50 and charset combinations.
+# Scoring is timed on passwords it has not seen, so the estimator's cache does
+# not hide its cost at long lengths.
+#
+# The statistical checks account for the one-character-per-class rule: each
+# position should hold a forced class character with probability classes/length
+# and a pool character otherwise, and every position should look the same after
+# the shuffle. Each check is a chi-squared test against that expectation.
+# A run makes about 180 of them, so they are corrected together with Holm's
+# method: the chance that any check fails on a correct generator is at most
+# ALPHA for the whole run, not per check. The duplicate rate is reported alongside.
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import batch_generator
+from batch_generator import CHARACTER_CLASSES
+from password_logic import generate_password, password_cracker
+
+LENGTHS = (4, 8, 12, 16, 18, 24, 32, 50)
+CLASS_NAMES = tuple(CHARACTER_CLASSES)
+CHARSETS = (('lower',), ('digits',), ('lower', 'upper'), ('lower', 'upper', 'digits'), CLASS_NAMES)
+# Family-wise false-failure rate of all the statistical checks of a run.
+ALPHA = 0.001
+# A run is a throughput regression against the baseline when it is this much slower.
+REGRESSION_TOLERANCE = 0.2
+MIN_SECONDS = 0.2
+
+
+def _flags(classes) -> dict:
+    return {f'use_{name}': name in classes for name in CLASS_NAMES}
+
+
+# --- THROUGHPUT ---
+def _rate(func, items) -> float:
+    """Calls func on each item (repeating the list until MIN_SECONDS passed) and returns calls per second."""
+    calls, started = 0, time.perf_counter()
+    while True:
+        for item in items:
+            func(item)
+        calls += len(items)
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_SECONDS:
+            return calls / elapsed
+
+
+def throughput(quick: bool):
+    results = []
+    sample = 200 if quick else 1000
+    for classes in CHARSETS:
+        flags = _flags(classes)
+        for length in LENGTHS:
+            if length < len(classes):
+                continue
+            generate_rate = _rate(lambda _: generate_password(length, *flags.values()), range(sample))
+
+            # Fresh passwords each round, so every password_cracker call is uncached.
+            passwords = batch_generator.generate_passwords(sample, length, **flags)
+            started = time.perf_counter()
+            for password in passwords:
+                password_cracker(password)
+            score_rate = sample / (time.perf_counter() - started)
+
+            batch_rate = _rate(lambda _: batch_generator.generate_batch(10_000, length, **flags), range(1)) * 10_000
+            results.append({
+                'classes': '+'.join(classes), 'length': length,
+                'generate_per_second': round(generate_rate),
+                'score_per_second': round(score_rate),
+                'batch_generate_per_second': round(batch_rate),
+            })
+            print(f"  {'+'.join(classes):28} len {length:2}: generate {generate_rate:>9,.0f}/s  "
+                  f"score {score_rate:>7,.0f}/s  batch {batch_rate:>11,.0f}/s", file=sys.stderr)
+    return results
+
+
+# --- STATISTICS ---
+def chi2_pvalue(statistic: float, dof: int) -> float:
+    """Upper-tail p-value of a chi-squared statistic (Wilson-Hilferty approximation)."""
+    if dof <= 0:
+        return 1.0
+    z = ((statistic / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def chi2(observed: Counter, expected: dict):
+    """Chi-squared statistic and p-value of observed counts against expected counts."""
+    statistic = sum((observed.get(key, 0) - count) ** 2 / count for key, count in expected.items())
+    unexpected = sum(count for key, count in observed.items() if key not in expected)
+    if unexpected:
+        return math.inf, 0.0
+    return statistic, chi2_pvalue(statistic, len(expected) - 1)
+
+
+def expected_char_probabilities(classes, length: int) -> dict:
+    """Probability of each character at any one position, given one forced character per class."""
+    charsets = [CHARACTER_CLASSES[name] for name in classes]
+    pool = ''.join(charsets)
+    forced = len(charsets) / length
+    probabilities = {c: (1 - forced) / len(pool) for c in pool}
+    for charset in charsets:
+        for c in charset:
+            probabilities[c] += 1 / length / len(charset)
+    return probabilities
+
+
+def quality(name: str, generate, classes, length: int, count: int):
+    """Runs the statistical checks on `count` passwords from one generator."""
+    passwords = generate(count)
+    probabilities = expected_char_probabilities(classes, length)
+    class_of = {c: cls for cls in classes for c in CHARACTER_CLASSES[cls]}
+
+    checks = []
+    for position in range(length):
+        observed = Counter(password[position] for password in passwords)
+        statistic, p = chi2(observed, {c: count * prob for c, prob in probabilities.items()})
+        checks.append({'check': f'position_{position}', 'chi2': round(statistic, 2), 'p_value': p})
+
+    # Characters of each class over all positions: one forced plus a pool share of the rest.
+    pool_size = sum(len(CHARACTER_CLASSES[cls]) for cls in classes)
+    observed = Counter(class_of.get(c, '?') for password in passwords for c in password)
+    expected = {cls: count * (1 + (length - len(classes)) * len(CHARACTER_CLASSES[cls]) / pool_size) for cls in classes}
+    statistic, p = chi2(observed, expected)
+    checks.append({'check': 'class_totals', 'chi2': round(statistic, 2), 'p_value': p})
+
+    # Every password must contain each selected class.
+    missing = sum(any(not any(class_of.get(c) == cls for c in password) for cls in classes) for password in passwords)
+    checks.append({'check': 'class_coverage', 'missing': missing, 'p_value': 0.0 if missing else 1.0})
+
+    duplicates = count - len(set(passwords))
+    per_position_entropy = -sum(p * math.log2(p) for p in probabilities.values())
+    return {
+        'generator': name, 'classes': '+'.join(classes), 'length': length, 'samples': count,
+        'duplicates': duplicates, 'duplicate_rate': duplicates / count,
+        'expected_entropy_bits_per_char': round(per_position_entropy, 4),
+        'checks': checks,
+    }
+
+
+def holm_rejections(checks, alpha: float = ALPHA):
+    """
+    The checks that fail with the family-wise error rate held at alpha
+    (Holm-Bonferroni): the k-th smallest of m p-values fails while it is below
+    alpha / (m - k + 1). Coverage checks are exact, not tests, and fail on any miss.
+    """
+    tests = sorted((check for check in checks if 'chi2' in check), key=lambda check: check['p_value'])
+    rejected = [check for check in checks if 'chi2' not in check and check['p_value'] < alpha]
+    for rank, check in enumerate(tests):
+        if check['p_value'] >= alpha / (len(tests) - rank):
+            break
+        rejected.append(check)
+    return rejected
+
+
+def statistics(quick: bool):
+    count = 20_000 if quick else 200_000
+    results = []
+    for classes, length in ((CLASS_NAMES, 4), (CLASS_NAMES, 12), (CLASS_NAMES, 50), (('lower', 'digits'), 8), (('digits',), 6)):
+        flags = _flags(classes)
+        results.append(quality('generate', lambda n: [generate_password(length, *flags.values()) for _ in range(n)],
+                               classes, length, count))
+        results.append(quality('batch', lambda n: batch_generator.generate_passwords(n, length, **flags),
+                               classes, length, count))
+
+    rejected = {id(check) for check in holm_rejections([check for row in results for check in row['checks']])}
+    for row in results:
+        row['failed'] = [check['check'] for check in row['checks'] if id(check) in rejected]
+        row['passed'] = not row['failed']
+        verdict = '✅' if row['passed'] else f"🔴 failed {', '.join(row['failed'])}"
+        print(f"  {row['generator']:9} {row['classes']:28} len {row['length']:2}: {row['samples']:,} samples, "
+              f"{row['duplicates']} duplicates {verdict}", file=sys.stderr)
+    return results
+
+
+# --- REPORT ---
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results: dict, baseline: dict):
+    """Throughput figures that dropped by more than REGRESSION_TOLERANCE, plus newly failing checks."""
+    regressions = []
+    old_rows = {(row['classes'], row['length']): row for row in baseline.get('throughput', [])}
+    for row in results['throughput']:
+        old = old_rows.get((row['classes'], row['length']))
+        for metric in ('generate_per_second', 'score_per_second', 'batch_generate_per_second'):
+            if old and old.get(metric) and row[metric] < old[metric] * (1 - REGRESSION_TOLERANCE):
+                regressions.append(f"{metric} {row['classes']} len {row['length']}: {old[metric]:,} -> {row[metric]:,}")
+    for row in results['statistics']:
+        if not row['passed']:
+            regressions.append(f"statistics {row['generator']} {row['classes']} len {row['length']}: {', '.join(row['failed'])}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark and check the statistical quality of password generation.')
+    parser.add_argument('--output', '-o', default='benchmark_results.json')
+    parser.add_argument('--quick', action='store_true', help='smaller samples, for a fast check')
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    parser.add_argument('--skip-throughput', action='store_true')
+    parser.add_argument('--skip-statistics', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': args.quick,
+        'throughput': [],
+        'statistics': [],
+    }
+    if not args.skip_throughput:
+        print('Throughput:', file=sys.stderr)
+        results['throughput'] = throughput(args.quick)
+    if not args.skip_statistics:
+        print('Statistical quality:', file=sys.stderr)
+        results['statistics'] = statistics(args.quick)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            results['regressions'] = compare(results, json.load(f))
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f'Results written to {args.output}', file=sys.stderr)
+
+    failed = [row for row in results['statistics'] if not row['passed']]
+    for regression in results.get('regressions', []):
+        print(f'🔴 {regression}', file=sys.stderr)
+    if failed or results.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
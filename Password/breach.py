@@ -0,0 +1,306 @@
+# breach.py
+#
+# Offline check against a breached-password hash list, such as the SHA-1
+# "ordered by hash" download from Have I Been Pwned (lines of HASH:COUNT).
+#
+#   python breach.py build pwned-passwords-sha1.txt breached.idx
+#   python breach.py check 'hunter2'
+#
+# `build` converts the text list once into a binary index: a header, a table of
+# where each two-byte hash prefix starts, then fixed-size records (20-byte
+# digest + 4-byte count) sorted by digest. A Bloom filter of the same digests is
+# written next to it as <index>.bloom. Lookups memory-map the index and
+# binary-search only the records sharing the prefix. The Bloom filter, capped
+# in size, is memory-mapped too, so worker processes share the page cache's
+# copy; it answers most misses without searching the index.
+
+import argparse
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+
+DEFAULT_INDEX_PATH = os.environ.get(
+    'PASSWORD_BREACH_INDEX', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'breached.idx'))
+
+INDEX_MAGIC = b'PWNIDX01'
+BLOOM_MAGIC = b'PWNBLM01'
+INDEX_HEADER = struct.Struct('<8sQ')   # magic, record count
+BLOOM_HEADER = struct.Struct('<8sQI')  # magic, bits, hash functions
+RECORD = struct.Struct('<20sI')        # SHA-1 digest, times seen
+PREFIXES = 1 << 16
+TABLE_OFFSET = INDEX_HEADER.size
+RECORDS_OFFSET = TABLE_OFFSET + (PREFIXES + 1) * 8
+
+# Records sorted in memory per run while building; ~120 MB at 24 bytes each.
+RUN_RECORDS = 5_000_000
+# Upper bound on the Bloom filter, which is loaded into RAM by every process
+# that checks passwords. Past this size the false-positive rate rises instead.
+MAX_BLOOM_BYTES = int(os.environ.get('PASSWORD_BREACH_BLOOM_MB', '512')) * 1024 * 1024
+BLOOM_FALSE_POSITIVE_RATE = 0.01
+MAX_BLOOM_HASHES = 16
+
+_MASK64 = (1 << 64) - 1
+
+
+def digest(password: str) -> bytes:
+    return hashlib.sha1(password.encode('utf-8')).digest()
+
+
+# --- BLOOM FILTER ---
+def bloom_size(record_count: int, max_bytes: int = MAX_BLOOM_BYTES):
+    """Returns (bits, hash functions) for the target false-positive rate, capped at max_bytes."""
+    wanted = -record_count * math.log(BLOOM_FALSE_POSITIVE_RATE) / math.log(2) ** 2
+    bits = max(64, min(int(wanted), max_bytes * 8)) // 8 * 8
+    hashes = max(1, min(MAX_BLOOM_HASHES, round(bits / max(record_count, 1) * math.log(2))))
+    return bits, hashes
+
+
+def _bloom_positions(digest_bytes: bytes, bits: int, hashes: int):
+    # SHA-1 output is already uniform, so two 64-bit slices of it drive double hashing.
+    h1 = int.from_bytes(digest_bytes[0:8], 'little')
+    h2 = int.from_bytes(digest_bytes[8:16], 'little') | 1
+    return [((h1 + i * h2) & _MASK64) % bits for i in range(hashes)]
+
+
+def _add_to_bloom(bloom, digests, hashes: int):
+    """Sets the bits for an array of digests (NumPy, shape (n, 20)) in a uint8 bit array."""
+    import numpy as np
+
+    bits = np.uint64(len(bloom) * 8)
+    h1 = digests[:, 0:8].copy().view('<u8').ravel()
+    h2 = digests[:, 8:16].copy().view('<u8').ravel() | np.uint64(1)
+    for i in range(hashes):
+        positions = (h1 + np.uint64(i) * h2) % bits
+        np.bitwise_or.at(bloom, (positions >> np.uint64(3)).astype(np.intp),
+                         (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)))
+
+
+# --- BUILDING THE INDEX ---
+def _parse_lines(lines):
+    for line in lines:
+        hex_digest, _, count = line.strip().partition(':')
+        if len(hex_digest) == 40:
+            yield bytes.fromhex(hex_digest), min(int(count or 1), 0xFFFFFFFF)
+
+
+def _write_runs(source, run_dir: str):
+    """Splits the hash list into sorted run files and returns their paths."""
+    import numpy as np
+
+    dtype = np.dtype([('digest', 'S20'), ('count', '<u4')])
+    runs, batch = [], []
+    with open(source, encoding='ascii', errors='ignore') as f:
+        records = _parse_lines(f)
+        while True:
+            batch = [record for _, record in zip(range(RUN_RECORDS), records)]
+            if not batch:
+                break
+            run = np.array(batch, dtype=dtype)
+            run.sort(order='digest', kind='stable')
+            path = os.path.join(run_dir, f'run-{len(runs):05d}.bin')
+            run.tofile(path)
+            runs.append(path)
+            print(f'Sorted run {len(runs)} ({len(batch):,} hashes)', file=sys.stderr)
+    return runs
+
+
+def _read_run(path: str, block_records: int = 65536):
+    with open(path, 'rb') as f:
+        while block := f.read(RECORD.size * block_records):
+            yield from RECORD.iter_unpack(block)
+
+
+def build_index(source: str, index_path: str, max_bloom_bytes: int = MAX_BLOOM_BYTES):
+    """
+    Converts a HASH:COUNT text list into a sorted binary index plus Bloom
+    filter. Runs are sorted in memory and merged from disk, so memory use is
+    bounded by RUN_RECORDS regardless of the input size. Duplicate hashes are
+    merged and their counts added.
+    """
+    import numpy as np
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(index_path))) as run_dir:
+        runs = _write_runs(source, run_dir)
+        prefix_counts = np.zeros(PREFIXES, dtype=np.uint64)
+        record_count = 0
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'wb') as out:
+            out.write(b'\0' * RECORDS_OFFSET)
+            previous, previous_count = None, 0
+            buffer = bytearray()
+
+            def flush():
+                if buffer:
+                    out.write(buffer)
+                    buffer.clear()
+
+            for record_digest, count in heapq.merge(*(_read_run(path) for path in runs)):
+                if record_digest == previous:
+                    previous_count = min(previous_count + count, 0xFFFFFFFF)
+                    continue
+                if previous is not None:
+                    buffer += RECORD.pack(previous, previous_count)
+                    prefix_counts[previous[0] << 8 | previous[1]] += 1
+                    record_count += 1
+                    if len(buffer) >= RECORD.size * 65536:
+                        flush()
+                previous, previous_count = record_digest, count
+            if previous is not None:
+                buffer += RECORD.pack(previous, previous_count)
+                prefix_counts[previous[0] << 8 | previous[1]] += 1
+                record_count += 1
+            flush()
+
+            table = np.zeros(PREFIXES + 1, dtype='<u8')
+            table[1:] = np.cumsum(prefix_counts)
+            out.seek(0)
+            out.write(INDEX_HEADER.pack(INDEX_MAGIC, record_count))
+            out.write(table.tobytes())
+        os.replace(tmp_path, index_path)
+
+    # The Bloom filter needs the final record count, so it is a second,
+    # sequential pass over the finished index.
+    bits, hashes = bloom_size(record_count, max_bloom_bytes)
+    bloom = np.zeros(bits // 8, dtype=np.uint8)
+    records = np.memmap(index_path, dtype=np.uint8, mode='r', offset=RECORDS_OFFSET, shape=(record_count, RECORD.size))
+    for start in range(0, record_count, RUN_RECORDS):
+        _add_to_bloom(bloom, np.asarray(records[start:start + RUN_RECORDS, :20]), hashes)
+    del records
+    with open(index_path + '.bloom.tmp', 'wb') as out:
+        out.write(BLOOM_HEADER.pack(BLOOM_MAGIC, bits, hashes))
+        out.write(bloom.tobytes())
+    os.replace(index_path + '.bloom.tmp', index_path + '.bloom')
+
+    seconds = time.perf_counter() - started
+    print(f'Indexed {record_count:,} hashes in {seconds:.0f}s '
+          f'(Bloom filter {bits // 8 / 1024 / 1024:.0f} MB, {hashes} hashes)', file=sys.stderr)
+    return record_count
+
+
+# --- LOOKUPS ---
+class BreachIndex:
+    """A memory-mapped breach index; safe to share between threads."""
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.record_count = INDEX_HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f'{path} is not a breach index; build one with "python breach.py build".')
+        self._table = array('Q', self._map[TABLE_OFFSET:RECORDS_OFFSET])
+        if sys.byteorder == 'big':
+            self._table.byteswap()
+
+        # The filter is mapped like the records, so every worker process shares
+        # the same page-cache copy instead of reading its own.
+        self._bloom_file = self._bloom = None
+        self._bloom_bits, self._bloom_hashes = 0, 0
+        if os.path.exists(path + '.bloom') and os.path.getsize(path + '.bloom') > BLOOM_HEADER.size:
+            self._bloom_file = open(path + '.bloom', 'rb')
+            self._bloom = mmap.mmap(self._bloom_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self._bloom_bits, self._bloom_hashes = BLOOM_HEADER.unpack_from(self._bloom, 0)
+            if magic != BLOOM_MAGIC:
+                self._close_bloom()
+
+    def _close_bloom(self):
+        if self._bloom is not None:
+            self._bloom.close()
+            self._bloom_file.close()
+        self._bloom_file = self._bloom = None
+
+    def _might_contain(self, digest_bytes: bytes) -> bool:
+        if self._bloom is None:
+            return True
+        bloom = self._bloom
+        return all(bloom[BLOOM_HEADER.size + (p >> 3)] >> (p & 7) & 1
+                   for p in _bloom_positions(digest_bytes, self._bloom_bits, self._bloom_hashes))
+
+    def count_digest(self, digest_bytes: bytes) -> int:
+        """How many times a SHA-1 digest appears in the breach list (0 if never)."""
+        if not self._might_contain(digest_bytes):
+            return 0
+        prefix = digest_bytes[0] << 8 | digest_bytes[1]
+        low, high = self._table[prefix], self._table[prefix + 1]
+        records = self._map
+        while low < high:
+            middle = (low + high) // 2
+            offset = RECORDS_OFFSET + middle * RECORD.size
+            candidate = records[offset:offset + 20]
+            if candidate < digest_bytes:
+                low = middle + 1
+            elif candidate > digest_bytes:
+                high = middle
+            else:
+                return RECORD.unpack_from(records, offset)[1]
+        return 0
+
+    def count(self, password: str) -> int:
+        """How many times a password appears in the breach list (0 if never)."""
+        return self.count_digest(digest(password))
+
+    def close(self):
+        self._close_bloom()
+        self._map.close()
+        self._file.close()
+
+
+_default_index = None
+_default_index_loaded = False
+_default_index_lock = threading.Lock()
+
+
+def default_index():
+    """The index at DEFAULT_INDEX_PATH, opened on first use; None if it has not been built."""
+    global _default_index, _default_index_loaded
+    if not _default_index_loaded:
+        with _default_index_lock:
+            if not _default_index_loaded:
+                if os.path.exists(DEFAULT_INDEX_PATH):
+                    _default_index = BreachIndex(DEFAULT_INDEX_PATH)
+                _default_index_loaded = True
+    return _default_index
+
+
+def breach_count(password: str):
+    """Times the password was seen in the breach list, or None when no index is available."""
+    index = default_index()
+    return index.count(password) if index else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or query the offline breached-password index.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='convert a HASH:COUNT list into a binary index')
+    build.add_argument('source', help='SHA-1 hash list, e.g. pwned-passwords-sha1-ordered-by-hash.txt')
+    build.add_argument('index', nargs='?', default=DEFAULT_INDEX_PATH)
+    build.add_argument('--bloom-mb', type=int, default=MAX_BLOOM_BYTES // (1024 * 1024),
+                       help='upper bound on the Bloom filter size')
+    check = commands.add_parser('check', help='look up passwords in an index')
+    check.add_argument('passwords', nargs='+')
+    check.add_argument('--index', default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        build_index(args.source, args.index, args.bloom_mb * 1024 * 1024)
+        return
+
+    index = BreachIndex(args.index)
+    for password in args.passwords:
+        started = time.perf_counter()
+        seen = index.count(password)
+        micros = (time.perf_counter() - started) * 1e6
+        verdict = f'🔴 breached, seen {seen:,} times' if seen else '✅ not found'
+        print(f'{password}: {verdict} ({micros:.0f} µs)')
+
+
+if __name__ == '__main__':
+    main()
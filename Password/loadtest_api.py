@@ -0,0 +1,109 @@
+# loadtest_api.py
+#
+# Open-loop load test for the JSON API in api.py:
+#
+#   python loadtest_api.py --rate 200 --duration 30 --endpoint score
+#   python loadtest_api.py --url http://localhost:8081 --endpoint generate --rate 50
+#
+# Requests are sent on a fixed schedule at the target rate whether or not
+# earlier ones have finished, and latency is measured from each request's
+# scheduled start. A server that falls behind therefore shows up as growing
+# latency instead of a quietly lower request rate.
+
+import argparse
+import asyncio
+import json
+import random
+import string
+import sys
+import time
+
+import httpx
+
+ENDPOINTS = {
+    'generate': lambda: ('GET', '/api/generate', None),
+    'batch': lambda: ('GET', '/api/generate/batch?count=1000', None),
+    'score': lambda: ('POST', '/api/score', {'password': _sample_password()}),
+    'breach': lambda: ('POST', '/api/breach', {'password': _sample_password()}),
+}
+
+COMMON_WORDS = ('password', 'dragon', 'monkey', 'sunshine', 'letmein', 'qwerty', 'football', 'iloveyou')
+
+
+def _sample_password() -> str:
+    # A mix of weak and random passwords, so the strength cache rarely helps.
+    if random.random() < 0.5:
+        return random.choice(COMMON_WORDS) + str(random.randint(0, 9999))
+    return ''.join(random.choices(string.ascii_letters + string.digits + string.punctuation, k=random.randint(8, 24)))
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run_load(url: str, endpoint: str, rate: float, duration: float, timeout: float):
+    latencies, errors = [], {}
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+
+        async def one(scheduled: float):
+            method, path, body = ENDPOINTS[endpoint]()
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                response = await client.request(method, path, json=body)
+                await response.aread()
+                if response.status_code >= 400:
+                    errors[response.status_code] = errors.get(response.status_code, 0) + 1
+                    return
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                return
+            latencies.append(time.perf_counter() - scheduled)
+
+        started = time.perf_counter()
+        total = int(rate * duration)
+        await asyncio.gather(*(one(started + i / rate) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'endpoint': endpoint,
+        'target_rate': rate,
+        'requests': total,
+        'succeeded': len(latencies),
+        'errors': errors,
+        'achieved_rate': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p90_ms': round(percentile(latencies, 0.90) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Send requests to the password API at a fixed rate and report latency.')
+    parser.add_argument('--url', default='http://localhost:8081')
+    parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='score')
+    parser.add_argument('--rate', type=float, default=100, help='requests per second')
+    parser.add_argument('--duration', type=float, default=10, help='seconds to send requests for')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_load(args.url, args.endpoint, args.rate, args.duration, args.timeout))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['endpoint']}: {report['succeeded']}/{report['requests']} ok at {report['achieved_rate']}/s "
+          f"(target {report['target_rate']}/s)")
+    print(f"  p50 {report['p50_ms']} ms · p90 {report['p90_ms']} ms · p99 {report['p99_ms']} ms · max {report['max_ms']} ms")
+    if report['errors']:
+        print(f"  🔴 errors: {report['errors']}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
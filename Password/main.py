@@ -1,86 +1,41 @@
-import secrets
-import string
-from nicegui import ui, app
+import asyncio
+import json
+from collections import Counter
+from nicegui import ui, app, run
 
-# --- Password Generation and Cracking Logic (Backend) ---
+import api
+from password_logic import new_password
+from settings_store import (CUSTOM, EVICT_INTERVAL, FLUSH_INTERVAL, PRESETS, SettingsBuffer,
+                            evict_user_storage, touch_user_file)
+from vault import VaultNotInitialisedError, WrongPassphraseError, default_vault
 
-def generate_password(length, use_upper, use_lower, use_digits, use_special):
-    """Generates a secure password based on specified criteria."""
-    pool, password_chars = '', []
-    
-    # Build the character pool and ensure at least one of each required type
-    if use_upper:
-        pool += string.ascii_uppercase
-        password_chars.append(secrets.choice(string.ascii_uppercase))
-    if use_lower:
-        pool += string.ascii_lowercase
-        password_chars.append(secrets.choice(string.ascii_lowercase))
-    if use_digits:
-        pool += string.digits
-        password_chars.append(secrets.choice(string.digits))
-    if use_special:
-        pool += string.punctuation
-        password_chars.append(secrets.choice(string.punctuation))
-        
-    if not pool:
-        return "Error: Select at least one character type."
+# Browser ids with a page connected, and how many; their storage is never evicted.
+connected_users = Counter()
 
-    # Fill the rest of the password length
-    remaining_length = length - len(password_chars)
-    for _ in range(remaining_length):
-        password_chars.append(secrets.choice(pool))
+def user_connected(browser_id):
+    connected_users[browser_id] += 1
 
-    secrets.SystemRandom().shuffle(password_chars)
-    return ''.join(password_chars)
-
-def password_cracker(password):
-    """Estimates the time to crack a password via brute-force."""
-    if not password or "Error" in password:
-        return {"text": "N/A", "color": "text-gray-500"}
-        
-    char_set_size = sum([
-        26 if any(c.islower() for c in password) else 0,
-        26 if any(c.isupper() for c in password) else 0,
-        10 if any(c.isdigit() for c in password) else 0,
-        32 if any(c in string.punctuation for c in password) else 0
-    ])
-
-    if char_set_size == 0:
-        return {"text": "Analysis unavailable.", "color": "text-gray-500"}
-    
-    try:
-        combinations = char_set_size ** len(password)
-        guesses_per_second = 10**10
-        seconds_to_crack = combinations / guesses_per_second
-    except OverflowError:
-        return {"text": "Astronomically Strong", "color": "text-green-500"}
-
-    if seconds_to_crack < 60:
-        return {"text": "Very Weak (< 1 min)", "color": "text-red-500"}
-    elif seconds_to_crack < 3600:
-        return {"text": f"Weak (~{seconds_to_crack/60:.0f} mins)", "color": "text-orange-500"}
-    elif seconds_to_crack < 86400 * 30:
-        return {"text": f"Moderate (~{seconds_to_crack/3600:.1f} hrs)", "color": "text-yellow-500"}
-    elif seconds_to_crack < 31536000:
-        return {"text": f"Strong (~{seconds_to_crack/86400:.1f} days)", "color": "text-lime-500"}
-    else:
-        years = seconds_to_crack / 31536000
-        return {"text": f"Very Strong (~{years:,.1f} yrs)", "color": "text-green-500"}
+def user_disconnected(browser_id):
+    connected_users[browser_id] -= 1
+    if connected_users[browser_id] <= 0:
+        del connected_users[browser_id]
 
 # --- User Interface Definition (Frontend) ---
 
 @ui.page('/')
 def main_page():
     # --- UI State and Styling ---
-    app.storage.user.update({
-        'level': app.storage.user.get('level', 'Hard'), # New state for levels
-        'length': app.storage.user.get('length', 18),
-        'use_upper': app.storage.user.get('use_upper', True),
-        'use_lower': app.storage.user.get('use_lower', True),
-        'use_digits': app.storage.user.get('use_digits', True),
-        'use_special': app.storage.user.get('use_special', True),
-    })
-    
+    # Controls bind to an in-memory copy of the settings; it is written to the
+    # user's storage file at most every FLUSH_INTERVAL and on disconnect.
+    settings = SettingsBuffer(app.storage.user)
+    values = settings.values
+    browser_id = app.storage.browser['id']
+    touch_user_file(browser_id)
+    ui.timer(FLUSH_INTERVAL, settings.flush)
+    ui.context.client.on_disconnect(settings.flush)
+    ui.context.client.on_connect(lambda: user_connected(browser_id))
+    ui.context.client.on_disconnect(lambda: user_disconnected(browser_id))
+
     ui.query('body').classes('bg-gray-100 dark:bg-gray-900')
 
     # --- Header ---
@@ -99,8 +54,8 @@ def main_page():
             ui.label('1. Choose Your Strength').classes('text-xl font-semibold text-gray-700 dark:text-gray-300')
             
             # Level Selection
-            level_options = {'Easy': 'Easy', 'Medium': 'Medium', 'Hard': 'Hard', 'Custom': 'Custom'}
-            level_radio = ui.radio(level_options, value='Hard').bind_value(app.storage.user, 'level').props('inline')
+            level_options = {level: level for level in [*PRESETS, CUSTOM]}
+            level_radio = ui.radio(level_options, value=values['level']).bind_value(values, 'level').props('inline')
             
             ui.separator().classes('my-4')
             
@@ -108,13 +63,13 @@ def main_page():
             ui.label('2. Customize (If Applicable)').classes('text-xl font-semibold text-gray-700 dark:text-gray-300')
             with ui.row().classes('w-full items-center mt-4'):
                 ui.label('Length:').classes('text-lg text-gray-600 dark:text-gray-400')
-                slider = ui.slider(min=4, max=50).bind_value(app.storage.user, 'length').classes('w-2/3')
-                ui.label().bind_text_from(app.storage.user, 'length').classes('text-lg font-mono text-primary')
+                slider = ui.slider(min=4, max=50).bind_value(values, 'length').classes('w-2/3')
+                ui.label().bind_text_from(values, 'length').classes('text-lg font-mono text-primary')
             with ui.grid(columns=2).classes('w-full gap-x-8 gap-y-2 pt-4 text-gray-600 dark:text-gray-400'):
-                upper_switch = ui.switch('Uppercase (A-Z)').bind_value(app.storage.user, 'use_upper')
-                lower_switch = ui.switch('Lowercase (a-z)').bind_value(app.storage.user, 'use_lower')
-                digits_switch = ui.switch('Digits (0-9)').bind_value(app.storage.user, 'use_digits')
-                special_switch = ui.switch('Special (!@#$)').bind_value(app.storage.user, 'use_special')
+                upper_switch = ui.switch('Uppercase (A-Z)').bind_value(values, 'use_upper')
+                lower_switch = ui.switch('Lowercase (a-z)').bind_value(values, 'use_lower')
+                digits_switch = ui.switch('Digits (0-9)').bind_value(values, 'use_digits')
+                special_switch = ui.switch('Special (!@#$)').bind_value(values, 'use_special')
 
         # --- Result Card ---
         with ui.card().classes('w-full rounded-2xl shadow-md dark:bg-gray-800'):
@@ -129,35 +84,36 @@ def main_page():
         # --- Save Card ---
         with ui.card().classes('w-full rounded-2xl shadow-md dark:bg-gray-800'):
             ui.label('4. Save Password').classes('text-xl font-semibold text-gray-700 dark:text-gray-300')
-            with ui.row().classes('w-full items-center mt-4'):
+            with ui.row().classes('w-full items-center mt-4') as unlock_row:
+                passphrase_input = ui.input(placeholder='Master passphrase', password=True, password_toggle_button=True).classes('flex-grow')
+                unlock_button = ui.button('Unlock vault', icon='lock_open')
+            with ui.row().classes('w-full items-center mt-2'):
                 service_input = ui.input(placeholder='e.g., Google, Facebook...').classes('flex-grow')
-                save_button = ui.button('Save to file', icon='save')
+                save_button = ui.button('Save to vault', icon='save')
+            with ui.row().classes('w-full items-center mt-2'):
+                saved_select = ui.select([], label='Saved passwords', with_input=True).classes('flex-grow')
+                copy_saved_button = ui.button(icon='content_copy').props('flat round color=primary')
+                delete_saved_button = ui.button(icon='delete').props('flat round color=negative')
+            vault_status = ui.label().classes('text-sm text-gray-500 dark:text-gray-400')
 
     # --- Functions that control UI and Logic ---
 
     def update_password():
         """Generate and update the password based on current state."""
-        password = generate_password(
-            app.storage.user['length'], app.storage.user['use_upper'], app.storage.user['use_lower'],
-            app.storage.user['use_digits'], app.storage.user['use_special']
+        password, strength_info = new_password(
+            values['length'], values['use_upper'], values['use_lower'],
+            values['use_digits'], values['use_special']
         )
         password_display.set_text(password)
-        
-        strength_info = password_cracker(password)
         strength_display.set_text(strength_info['text'])
         strength_display.classes(replace=f"text-lg font-bold {strength_info['color']}")
 
     def handle_level_change():
         """Update settings based on the selected level and regenerate password."""
-        level = app.storage.user['level']
-        
-        presets = {
-            'Easy':   {'len': 10, 'upper': True, 'lower': True, 'digits': False, 'special': False},
-            'Medium': {'len': 14, 'upper': True, 'lower': True, 'digits': True, 'special': False},
-            'Hard':   {'len': 18, 'upper': True, 'lower': True, 'digits': True, 'special': True},
-        }
+        level = values['level']
+        settings.apply_level(level)
 
-        if level == 'Custom':
+        if level == CUSTOM:
             slider.enable()
             for switch in [upper_switch, lower_switch, digits_switch, special_switch]:
                 switch.enable()
@@ -165,32 +121,76 @@ def main_page():
             slider.disable()
             for switch in [upper_switch, lower_switch, digits_switch, special_switch]:
                 switch.disable()
-            
-            config = presets[level]
-            app.storage.user.update({
-                'length': config['len'],
-                'use_upper': config['upper'],
-                'use_lower': config['lower'],
-                'use_digits': config['digits'],
-                'use_special': config['special'],
-            })
-        
+
         update_password()
 
+    # This page's own session of the shared vault: the key it unlocks is only
+    # used by this client and is dropped when the client disconnects.
+    vault = default_vault().session()
+    ui.context.client.on_disconnect(vault.lock)
+
+    def refresh_vault(services=None):
+        """Show whether this session has unlocked the vault and, if so, list the saved services."""
+        if services is None:
+            services = vault.services() if vault.unlocked else []
+        saved_select.set_options(services, value=saved_select.value if saved_select.value in services else None)
+        unlock_row.set_visibility(not vault.unlocked)
+        if not vault.initialised:
+            vault_status.set_text("No vault yet · create one with `python vault.py init`")
+        elif vault.unlocked:
+            vault_status.set_text(f"Vault unlocked · {len(services)} saved")
+        else:
+            vault_status.set_text("Vault locked")
+
+    async def unlock_vault():
+        """Derive the vault key once; it stays in memory for this session until it auto-locks."""
+        try:
+            await run.io_bound(vault.unlock, passphrase_input.value)
+        except (WrongPassphraseError, VaultNotInitialisedError) as e:
+            ui.notify(str(e), type='negative')
+            return
+        passphrase_input.value = ''
+        ui.notify('Vault unlocked', type='positive')
+        refresh_vault()
+
     def save_password():
-        """Saves the service name and password to saved_passwords.txt."""
+        """Saves the password under the service name, replacing any earlier one."""
         service = service_input.value.strip()
         password = password_display.text
         if not service or not password or "Error" in password:
             ui.notify('Please enter a service name and generate a password first.', type='warning')
             return
-        try:
-            with open("saved_passwords.txt", "a", encoding="utf-8") as f:
-                f.write(f"Service: {service}\nPassword: {password}\n" + "-"*30 + "\n")
-            ui.notify(f"Password for '{service}' saved to saved_passwords.txt", type='positive')
-            service_input.value = ''
-        except IOError as e:
-            ui.notify(f"Error saving file: {e}", type='negative')
+        if not vault.unlocked:
+            refresh_vault()
+            ui.notify('Unlock the vault with your master passphrase first.', type='warning')
+            return
+        replaced, services = vault.save(service, password)
+        ui.notify(f"Password for '{service}' {'updated' if replaced else 'saved'} in the vault", type='positive')
+        service_input.value = ''
+        refresh_vault(services)
+
+    async def copy_saved_password():
+        if not saved_select.value:
+            return
+        if not vault.unlocked:
+            refresh_vault()
+            ui.notify('Unlock the vault with your master passphrase first.', type='warning')
+            return
+        password = vault.get(saved_select.value)
+        if password is not None:
+            await ui.run_javascript(f'navigator.clipboard.writeText({json.dumps(password)})')
+            ui.notify(f"Password for '{saved_select.value}' copied to clipboard!", type='info')
+
+    def delete_saved_password():
+        if not saved_select.value:
+            return
+        if not vault.unlocked:
+            refresh_vault()
+            ui.notify('Unlock the vault with your master passphrase first.', type='warning')
+            return
+        vault.delete(saved_select.value)
+        ui.notify(f"Password for '{saved_select.value}' deleted", type='info')
+        refresh_vault()
 
     async def copy_to_clipboard():
         await ui.run_javascript(f'navigator.clipboard.writeText("{password_display.text}")')
@@ -200,11 +200,37 @@ def main_page():
     level_radio.on('change', handle_level_change)
     for component in [slider, upper_switch, lower_switch, digits_switch, special_switch]:
         component.on('change', update_password, throttle=0.2)
+    unlock_button.on('click', unlock_vault)
+    passphrase_input.on('keydown.enter', unlock_vault)
     save_button.on('click', save_password)
+    copy_saved_button.on('click', copy_saved_password)
+    delete_saved_button.on('click', delete_saved_password)
     copy_button.on('click', copy_to_clipboard)
     
     # --- Initial Setup ---
     handle_level_change()
+    refresh_vault()
+
+# --- JSON API ---
+app.include_router(api.router)
+app.on_startup(api.start_workers)
+app.on_shutdown(api.shutdown)
+
+
+# --- Storage Housekeeping ---
+async def evict_idle_user_storage():
+    """Removes the storage of users who have not been back for a while, every EVICT_INTERVAL."""
+    while True:
+        removed = await run.io_bound(evict_user_storage, keep=set(connected_users))
+        for browser_id in removed:
+            # NiceGUI keeps each user's storage in memory too (a private dict;
+            # there is no public way to drop one), and would write it back.
+            app.storage._users.pop(browser_id, None)
+        if removed:
+            print(f"🧹 Evicted {len(removed)} idle user storage files")
+        await asyncio.sleep(EVICT_INTERVAL)
+
+app.on_startup(evict_idle_user_storage)
 
 # --- Start the Application ---
 ui.run(
@@ -0,0 +1,75 @@
+# password_logic.py
+#
+# Password generation and crack-time estimation behind the UI in main.py, kept
+# free of NiceGUI so benchmarks and other tools can import it (importing
+# main.py starts the app).
+
+import secrets
+import string
+
+from breach import breach_count
+from strength import estimate_strength
+
+# --- Password Generation and Cracking Logic (Backend) ---
+
+def generate_password(length, use_upper, use_lower, use_digits, use_special):
+    """Generates a secure password based on specified criteria."""
+    pool, password_chars = '', []
+    
+    # Build the character pool and ensure at least one of each required type
+    if use_upper:
+        pool += string.ascii_uppercase
+        password_chars.append(secrets.choice(string.ascii_uppercase))
+    if use_lower:
+        pool += string.ascii_lowercase
+        password_chars.append(secrets.choice(string.ascii_lowercase))
+    if use_digits:
+        pool += string.digits
+        password_chars.append(secrets.choice(string.digits))
+    if use_special:
+        pool += string.punctuation
+        password_chars.append(secrets.choice(string.punctuation))
+        
+    if not pool:
+        return "Error: Select at least one character type."
+
+    # Fill the rest of the password length
+    remaining_length = length - len(password_chars)
+    for _ in range(remaining_length):
+        password_chars.append(secrets.choice(pool))
+
+    secrets.SystemRandom().shuffle(password_chars)
+    return ''.join(password_chars)
+
+def password_cracker(password):
+    """Estimates the time to crack a password with a fast offline attack, accounting for common patterns."""
+    if not password or "Error" in password:
+        return {"text": "N/A", "color": "text-gray-500"}
+
+    # A password from a breach list is tried early no matter how random it looks.
+    times_seen = breach_count(password)
+    if times_seen:
+        return {"text": f"Breached (seen {times_seen:,} times) · Do not use", "color": "text-red-500"}
+
+    estimate = estimate_strength(password)
+    seconds_to_crack = estimate.crack_seconds['offline_fast_hash']
+    hint = f" · {estimate.warning}" if estimate.warning else ""
+
+    if seconds_to_crack < 60:
+        return {"text": f"Very Weak (< 1 min){hint}", "color": "text-red-500"}
+    elif seconds_to_crack < 3600:
+        return {"text": f"Weak (~{seconds_to_crack/60:.0f} mins){hint}", "color": "text-orange-500"}
+    elif seconds_to_crack < 86400 * 30:
+        return {"text": f"Moderate (~{seconds_to_crack/3600:.1f} hrs){hint}", "color": "text-yellow-500"}
+    elif seconds_to_crack < 31536000:
+        return {"text": f"Strong (~{seconds_to_crack/86400:.1f} days){hint}", "color": "text-lime-500"}
+    else:
+        years = seconds_to_crack / 31536000
+        if years >= 1e12:
+            return {"text": "Astronomically Strong", "color": "text-green-500"}
+        return {"text": f"Very Strong (~{years:,.1f} yrs)", "color": "text-green-500"}
+
+def new_password(length, use_upper, use_lower, use_digits, use_special):
+    """A new password and its strength rating, as the result card shows them after any settings change."""
+    password = generate_password(length, use_upper, use_lower, use_digits, use_special)
+    return password, password_cracker(password)
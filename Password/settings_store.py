@@ -0,0 +1,125 @@
+# settings_store.py
+#
+# Per-user generator settings, kept in memory while a page is open and written
+# to app.storage.user in one go: at most once per FLUSH_INTERVAL and again when
+# the browser disconnects. A preset level is stored as its name alone; the five
+# length/character fields are only stored for the Custom level. Storage files
+# of users who have not been back for a while are evicted by evict_user_storage.
+
+import os
+import time
+
+PRESETS = {
+    'Easy':   {'length': 10, 'use_upper': True, 'use_lower': True, 'use_digits': False, 'use_special': False},
+    'Medium': {'length': 14, 'use_upper': True, 'use_lower': True, 'use_digits': True, 'use_special': False},
+    'Hard':   {'length': 18, 'use_upper': True, 'use_lower': True, 'use_digits': True, 'use_special': True},
+}
+DEFAULT_LEVEL = 'Hard'
+CUSTOM = 'Custom'
+FIELDS = tuple(PRESETS[DEFAULT_LEVEL])
+
+STORAGE_KEY = 'settings'
+# Keys written by earlier versions, one per field, plus leftovers of older UIs.
+LEGACY_KEYS = ('level',) + FIELDS + ('generated_password', 'strength_info')
+
+# Seconds between writes of changed settings to the user's storage file.
+FLUSH_INTERVAL = float(os.environ.get('PASSWORD_SETTINGS_FLUSH_INTERVAL', '2'))
+
+# --- USER STORAGE EVICTION ---
+STORAGE_DIR = os.environ.get('NICEGUI_STORAGE_PATH', '.nicegui')
+# Files untouched for this long are deleted...
+USER_FILE_TTL = float(os.environ.get('PASSWORD_USER_FILE_TTL_DAYS', '30')) * 86400
+# ...and beyond this many files, the least recently used go first.
+MAX_USER_FILES = int(os.environ.get('PASSWORD_MAX_USER_FILES', '1000'))
+EVICT_INTERVAL = 3600
+
+
+def stored_form(settings: dict) -> dict:
+    """What gets persisted for a set of settings."""
+    if settings['level'] in PRESETS:
+        return {'level': settings['level']}
+    return {'level': CUSTOM, **{field: settings[field] for field in FIELDS}}
+
+
+def expand(stored: dict) -> dict:
+    """The full working settings (level plus every field) for a stored form."""
+    level = stored.get('level', DEFAULT_LEVEL)
+    if level in PRESETS:
+        return {'level': level, **PRESETS[level]}
+    defaults = PRESETS[DEFAULT_LEVEL]
+    return {'level': CUSTOM, **{field: stored.get(field, defaults[field]) for field in FIELDS}}
+
+
+class SettingsBuffer:
+    """One page's settings; UI elements bind to `values`, and flush() persists them when they changed."""
+
+    def __init__(self, user_storage):
+        self.storage = user_storage
+        stored = user_storage.get(STORAGE_KEY)
+        if stored is None:
+            # Carry over the flat keys earlier versions wrote, then drop them.
+            stored = {key: user_storage[key] for key in ('level',) + FIELDS if key in user_storage}
+        self.values = expand(stored)
+        self._saved = stored if STORAGE_KEY in user_storage else None
+        legacy = [key for key in LEGACY_KEYS if key in user_storage]
+        if legacy:
+            for key in legacy:
+                del user_storage[key]
+            self.flush()
+
+    def apply_level(self, level: str):
+        """Switches level; a preset overwrites the fields, Custom keeps the current ones."""
+        self.values['level'] = level
+        if level in PRESETS:
+            self.values.update(PRESETS[level])
+
+    def flush(self):
+        form = stored_form(self.values)
+        if form != self._saved:
+            self.storage[STORAGE_KEY] = form
+            self._saved = form
+
+
+def evict_user_storage(directory: str = STORAGE_DIR, ttl: float = USER_FILE_TTL, max_files: int = MAX_USER_FILES,
+                       keep=frozenset()) -> list:
+    """
+    Deletes storage-user-*.json files unused for longer than ttl, then the
+    least recently used ones beyond max_files, skipping the browser ids in
+    keep (users with a page open). Returns the browser ids removed.
+
+    Only the files are deleted: NiceGUI also holds every user's storage in
+    memory and writes it back on the next change, so the caller must drop
+    those entries too.
+    """
+    try:
+        names = [name for name in os.listdir(directory) if name.startswith('storage-user-') and name.endswith('.json')]
+    except FileNotFoundError:
+        return 0
+    files = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            files.append((os.path.getmtime(path), path))
+        except FileNotFoundError:
+            continue
+    files.sort(reverse=True)
+
+    cutoff = time.time() - ttl
+    removed = []
+    for position, (modified, path) in enumerate(files):
+        browser_id = os.path.basename(path)[len('storage-user-'):-len('.json')]
+        if (modified < cutoff or position >= max_files) and browser_id not in keep:
+            try:
+                os.remove(path)
+                removed.append(browser_id)
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def touch_user_file(browser_id: str, directory: str = STORAGE_DIR):
+    """Marks a user's storage file as recently used, so returning users are not evicted."""
+    try:
+        os.utime(os.path.join(directory, f'storage-user-{browser_id}.json'))
+    except FileNotFoundError:
+        pass
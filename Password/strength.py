@@ -0,0 +1,488 @@
+# strength.py
+#
+# Pattern-aware password strength estimation, in the spirit of zxcvbn.
+#
+# A password is split into the cheapest sequence of patterns an attacker would
+# try: common passwords and dictionary words (also reversed, capitalised or
+# written in l33t), keyboard walks, repeats, sequences and dates, with brute
+# force for whatever is left. The estimate is the number of guesses that
+# sequence needs, kept as a float so long passwords never turn into huge
+# integers. Dictionaries load once per process on first use, and results are
+# memoised so a live-typing UI can score every keystroke cheaply.
+#
+# The word lists in dictionaries/ are zxcvbn's ranked frequency lists (see
+# dictionaries/README.md). They are merged into one sorted word array, which
+# keeps the index to a few megabytes. The words at one position of a password
+# are found with a single bisect for the rest of the password: each of them
+# is the word just before it in sorted order or on that word's precomputed
+# chain of shorter words it starts with. A password costs about one search
+# per character rather than one per substring.
+
+import math
+import os
+import re
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+from itertools import accumulate, islice, product
+from math import comb
+from types import MappingProxyType
+
+DICTIONARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dictionaries')
+
+# Guesses per second for the attacks we report crack times for.
+ATTACK_SCENARIOS = {
+    'online_throttled': 100 / 3600,
+    'online_unthrottled': 10,
+    'offline_slow_hash': 1e4,
+    'offline_fast_hash': 1e10,
+}
+
+# Crack-time bands, as (upper bound in seconds, label).
+CRACK_TIME_BANDS = (
+    (1, 'instant'),
+    (60, 'seconds'),
+    (3600, 'minutes'),
+    (86400, 'hours'),
+    (86400 * 31, 'days'),
+    (86400 * 365, 'months'),
+    (86400 * 365 * 100, 'years'),
+    (math.inf, 'centuries'),
+)
+
+# Guess thresholds for scores 1-4 (0 is anything below the first).
+SCORE_THRESHOLDS = (1e3, 1e6, 1e8, 1e10)
+
+# Patterns shorter than this many characters are left to brute force.
+MIN_TOKEN_LENGTH = 3
+# Floor on the guesses any one pattern can cost, so a password is not scored
+# as dozens of tiny "patterns" that each look almost free.
+MIN_MATCH_GUESSES = 50
+# Ceiling on any estimate. Long passwords would otherwise overflow to inf,
+# which JSON cannot carry; anything this large is uncrackable either way.
+MAX_GUESSES = 1e100
+# Longer passwords are scored in chunks of this many characters, each memoised
+# on its own, so a keystroke only rescores the last chunk. A pattern spanning
+# two chunks is scored as two.
+MAX_SCORED_LENGTH = 32
+
+MIN_YEAR_SPACE = 20
+
+L33T_TABLE = {
+    '4': 'a', '@': 'a', '8': 'b', '(': 'c', '{': 'c', '3': 'e', '6': 'g', '9': 'g',
+    '1': 'il', '!': 'i', '|': 'il', '0': 'o', '$': 's', '5': 's', '7': 't', '+': 't', '2': 'z', '%': 'x',
+}
+# Limit on how many readings of a password with ambiguous l33t characters (e.g. '1' as i or l) are tried.
+MAX_L33T_READINGS = 16
+
+KEYBOARD_ROWS = ('`1234567890-=', 'qwertyuiop[]\\', "asdfghjkl;'", 'zxcvbnm,./')
+SHIFTED = dict(zip('~!@#$%^&*()_+{}|:"<>?', '`1234567890-=[]\\;\',./'))
+
+WARNINGS = {
+    'password': 'This is a commonly used password.',
+    'dictionary': 'Contains a common word or name.',
+    'keyboard': 'Contains a keyboard pattern.',
+    'repeat': 'Contains repeated characters.',
+    'sequence': 'Contains an easy sequence.',
+    'date': 'Contains a date or year.',
+}
+
+Match = namedtuple('Match', 'pattern start end token guesses')
+WordIndex = namedtuple('WordIndex', 'words ranks sources names parents ranges')
+
+StrengthEstimate = namedtuple('StrengthEstimate', 'guesses entropy_bits score crack_seconds crack_bands patterns warning')
+StrengthEstimate.__doc__ = """
+guesses:      estimated guesses an attacker needs (float).
+entropy_bits: log2 of guesses.
+score:        0 (trivial) to 4 (strong).
+crack_seconds / crack_bands: seconds and band label per ATTACK_SCENARIOS entry.
+patterns:     (pattern, token) pairs the password was split into.
+warning:      a short explanation of the weakest pattern, or ''.
+"""
+
+
+# --- DICTIONARIES ---
+def _word_lists():
+    """
+    Yields (dictionary name, words) for the word lists in DICTIONARY_DIR,
+    lowercased and without repeats. Lines are in frequency order, so the
+    first word has rank 1.
+    """
+    for filename in sorted(os.listdir(DICTIONARY_DIR)):
+        if filename.endswith('.txt'):
+            with open(os.path.join(DICTIONARY_DIR, filename), encoding='utf-8') as f:
+                words = dict.fromkeys(filter(None, (line.strip() for line in f.read().lower().splitlines())))
+            yield filename[:-4], list(words)
+
+
+@lru_cache(maxsize=None)
+def word_index() -> WordIndex:
+    """
+    Every dictionary merged once per process: words is sorted, ranks[i] and
+    names[sources[i]] are the rank and dictionary of the best-ranked entry for
+    words[i], parents[i] is the position of the longest shorter word that
+    words[i] starts with, or -1, and ranges maps the first two letters of the
+    words to the (start, end) of their run in words.
+    """
+    # rank << 8 | dictionary number, so the smaller entry is the better one.
+    names, best = [], {}
+    for name, words in _word_lists():
+        source = len(names)
+        names.append(name)
+        for rank, word in enumerate(words, start=1):
+            entry = rank << 8 | source
+            if best.get(word, entry) >= entry:
+                best[word] = entry
+    words = sorted(best)
+    entries = [best[word] for word in words]
+    del best
+    ranks = array('I', (entry >> 8 for entry in entries))
+    sources = array('B', (entry & 0xff for entry in entries))
+    # In sorted order a word follows every word it starts with, so the stack
+    # always holds the chain of words the current one may start with.
+    parents, stack = array('i'), []
+    for i, word in enumerate(words):
+        while stack and not word.startswith(words[stack[-1]]):
+            stack.pop()
+        parents.append(stack[-1] if stack else -1)
+        stack.append(i)
+    ranges = {}
+    for i, word in enumerate(words):
+        if len(word) >= 2:
+            ranges[word[:2]] = (ranges.get(word[:2], (i,))[0], i + 1)
+    return WordIndex(words, ranks, sources, tuple(names), parents, ranges)
+
+
+def _entry(index: WordIndex, i: int):
+    return index.names[index.sources[i]], index.ranks[i]
+
+
+def _word_spans(text: str, last_start: int = None):
+    """
+    (start, end, (dictionary name, rank)) for every dictionary word in text
+    starting no later than last_start, shortest first at each start.
+    """
+    index = word_index()
+    words, parents, ranges = index.words, index.parents, index.ranges
+    spans = []
+    if last_start is None:
+        last_start = len(text) - MIN_TOKEN_LENGTH
+    for start in range(min(last_start, len(text) - MIN_TOKEN_LENGTH) + 1):
+        # Only words sharing the first two letters here can be long enough.
+        first = text[start:start + 2]
+        if first not in ranges:
+            continue
+        low, high = ranges[first]
+        rest = text[start:]
+        position = bisect_left(words, rest, low, high)
+        # Every shorter word that rest starts with sorts between that word and
+        # rest, so it is on the chain of the word just before rest.
+        found = [position] if position < high and words[position] == rest else []
+        nearest = position - 1
+        while nearest >= 0 and not rest.startswith(words[nearest]):
+            nearest = parents[nearest]
+        while nearest >= 0 and len(words[nearest]) >= MIN_TOKEN_LENGTH:
+            found.append(nearest)
+            nearest = parents[nearest]
+        for i in reversed(found):
+            spans.append((start, start + len(words[i]), _entry(index, i)))
+    return spans
+
+
+def _uppercase_variations(token: str) -> float:
+    if token.lower() == token:
+        return 1
+    upper = sum(map(str.isupper, token))
+    lower = sum(map(str.islower, token))
+    if upper == 0:
+        return 1
+    # Capitalised, all caps and trailing-capital are what people actually do.
+    if token[0].isupper() and upper == 1 or lower == 0 or token[-1].isupper() and upper == 1:
+        return 2
+    return sum(comb(upper + lower, i) for i in range(1, min(upper, lower) + 1))
+
+
+def _dictionary_pattern(name: str) -> str:
+    return 'password' if name == 'passwords' else 'dictionary'
+
+
+def dictionary_matches(password: str):
+    lower = password.lower()
+    matches = []
+    for start, end, (name, rank) in _word_spans(lower):
+        token = password[start:end]
+        matches.append(Match(_dictionary_pattern(name), start, end, token, rank * _uppercase_variations(token)))
+    # Reversed words are the words of the reversed password.
+    for reversed_start, reversed_end, (_, rank) in _word_spans(lower[::-1]):
+        start, end = len(password) - reversed_end, len(password) - reversed_start
+        word = lower[start:end]
+        if word != word[::-1]:
+            token = password[start:end]
+            matches.append(Match('dictionary', start, end, token, rank * _uppercase_variations(token) * 2))
+    return matches
+
+
+def l33t_matches(password: str):
+    """
+    Dictionary words written with l33t substitutions, found as the words of
+    plain-letter readings of the password. An ambiguous character (e.g. '1'
+    as i or l) multiplies the readings, so at most MAX_L33T_READINGS are tried.
+    """
+    lower = password.lower()
+    last_substitution = max((i for i, char in enumerate(lower) if char in L33T_TABLE), default=None)
+    if last_substitution is None:
+        return []
+    substituted = list(accumulate((char in L33T_TABLE for char in lower), initial=0))
+    readings = islice(product(*(L33T_TABLE.get(char, char) for char in lower)), MAX_L33T_READINGS)
+    best = {}
+    for reading in readings:
+        # A word starting after the last substitution is a plain dictionary match.
+        for start, end, found in _word_spans(''.join(reading), last_substitution):
+            substitutions = substituted[end] - substituted[start]
+            if substitutions and substitutions != end - start and (
+                    (start, end) not in best or found[1] < best[start, end][1]):
+                best[start, end] = found
+    matches = []
+    for (start, end), (name, rank) in sorted(best.items()):
+        token = password[start:end]
+        # Each substituted character could have been left alone.
+        guesses = rank * _uppercase_variations(token) * 2 ** (substituted[end] - substituted[start])
+        matches.append(Match(_dictionary_pattern(name), start, end, token, guesses))
+    return matches
+
+
+# --- KEYBOARD WALKS ---
+@lru_cache(maxsize=None)
+def _keyboard_positions():
+    """Key -> (row, x) on a QWERTY layout, with each row shifted half a key."""
+    return {key: (row, col + row * 0.5) for row, keys in enumerate(KEYBOARD_ROWS) for col, key in enumerate(keys)}
+
+
+@lru_cache(maxsize=4096)
+def _key_step(a: str, b: str):
+    """Direction from key a to key b if they are adjacent, else None."""
+    positions = _keyboard_positions()
+    a, b = SHIFTED.get(a, a.lower()), SHIFTED.get(b, b.lower())
+    if a not in positions or b not in positions:
+        return None
+    (row_a, x_a), (row_b, x_b) = positions[a], positions[b]
+    d_row, d_x = row_b - row_a, x_b - x_a
+    if (d_row == 0 and abs(d_x) == 1) or (abs(d_row) == 1 and abs(d_x) <= 1):
+        return (d_row, d_x)
+    return None
+
+
+def keyboard_matches(password: str):
+    keys = len(_keyboard_positions())
+    average_degree = 6
+    matches = []
+    start = 0
+    while start < len(password) - 1:
+        end, turns, direction = start + 1, 0, None
+        while end < len(password):
+            step = _key_step(password[end - 1], password[end])
+            if step is None:
+                break
+            if step != direction:
+                turns += 1
+                direction = step
+            end += 1
+        length = end - start
+        if length >= MIN_TOKEN_LENGTH:
+            guesses = sum(comb(i - 1, j - 1) * keys * average_degree ** j
+                          for i in range(2, length + 1) for j in range(1, min(turns, i - 1) + 1))
+            shifted = sum(c.isupper() or c in SHIFTED for c in password[start:end])
+            if shifted and shifted < length:
+                guesses *= sum(comb(length, i) for i in range(1, min(shifted, length - shifted) + 1))
+            matches.append(Match('keyboard', start, end, password[start:end], guesses))
+            start = end - 1
+        else:
+            start += 1
+    return matches
+
+
+# --- REPEATS, SEQUENCES AND DATES ---
+_GREEDY_REPEAT = re.compile(r'(.+)\1+')
+_LAZY_REPEAT = re.compile(r'(.+?)\1+')
+
+
+def repeat_matches(password: str):
+    matches = []
+    for pattern in (_GREEDY_REPEAT, _LAZY_REPEAT):
+        for found in pattern.finditer(password):
+            base = found.group(1)
+            if found.end() - found.start() < MIN_TOKEN_LENGTH:
+                continue
+            repeats = (found.end() - found.start()) // len(base)
+            base_guesses = estimate_strength(base).guesses if len(base) > 1 else _cardinality(base)
+            matches.append(Match('repeat', found.start(), found.end(), found.group(0), base_guesses * repeats))
+    return matches
+
+
+def sequence_matches(password: str):
+    matches = []
+    start = 0
+    while start < len(password) - 1:
+        delta = ord(password[start + 1]) - ord(password[start])
+        end = start + 1
+        while (end < len(password) and 0 < abs(delta) <= 5
+               and ord(password[end]) - ord(password[end - 1]) == delta
+               and _char_class(password[end]) == _char_class(password[start])):
+            end += 1
+        if end - start >= MIN_TOKEN_LENGTH:
+            token = password[start:end]
+            first = token[0]
+            base = 4 if first in 'aAzZ019' else (10 if first.isdigit() else 26)
+            guesses = base * len(token) * abs(delta) * (2 if delta < 0 else 1)
+            matches.append(Match('sequence', start, end, token, guesses))
+            start = end - 1
+        else:
+            start += 1
+    return matches
+
+
+_YEAR = re.compile(r'19\d\d|20\d\d')
+_SEPARATED_DATE = re.compile(r'(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})')
+_DIGITS = re.compile(r'\d{4,8}')
+
+
+def _year_space(year: int) -> int:
+    return max(abs(year - date.today().year), MIN_YEAR_SPACE)
+
+
+def _as_year(value: str):
+    year = int(value)
+    this_year = date.today().year
+    if len(value) == 2:
+        return 2000 + year if year <= this_year % 100 + 5 else 1900 + year
+    return year if len(value) == 4 and 1000 <= year <= this_year + 25 else None
+
+
+def _plausible_date(parts):
+    """Returns the year if the three parts read as day, month and year in some order."""
+    for day, month, year in ((0, 1, 2), (1, 0, 2), (2, 1, 0), (1, 2, 0)):
+        year_value = _as_year(parts[year])
+        if year_value and 1 <= int(parts[month]) <= 12 and 1 <= int(parts[day]) <= 31 and len(parts[day]) <= 2 and len(parts[month]) <= 2:
+            return year_value
+    return None
+
+
+def date_matches(password: str):
+    matches = []
+    for found in _YEAR.finditer(password):
+        matches.append(Match('date', found.start(), found.end(), found.group(0), _year_space(int(found.group(0)))))
+    for found in _SEPARATED_DATE.finditer(password):
+        year = _plausible_date((found.group(1), found.group(3), found.group(4)))
+        if year:
+            matches.append(Match('date', found.start(), found.end(), found.group(0), 365 * _year_space(year) * 4))
+    for found in _DIGITS.finditer(password):
+        digits = found.group(0)
+        for start in range(len(digits)):
+            for end in range(start + 4, min(len(digits), start + 8) + 1):
+                token = digits[start:end]
+                for first in range(1, 3):
+                    for second in range(first + 1, min(first + 3, len(token))):
+                        year = _plausible_date((token[:first], token[first:second], token[second:]))
+                        if year:
+                            matches.append(Match('date', found.start() + start, found.start() + end, token, 365 * _year_space(year)))
+                            break
+    return matches
+
+
+# --- BRUTE FORCE AND SCORING ---
+def _char_class(c: str) -> str:
+    if c.islower():
+        return 'lower'
+    if c.isupper():
+        return 'upper'
+    if c.isdigit():
+        return 'digit'
+    return 'other'
+
+
+def _cardinality(c: str) -> int:
+    """Guesses needed for a single character an attacker has to brute-force."""
+    if c.isdigit():
+        return 10
+    if c.isascii() and c.isalpha():
+        return 26
+    if c.isascii():
+        return 33
+    return 100
+
+
+def _minimum_guesses(password: str):
+    """Finds the split of the password into patterns that needs the fewest guesses."""
+    matches = (dictionary_matches(password) + l33t_matches(password) + keyboard_matches(password)
+               + repeat_matches(password) + sequence_matches(password) + date_matches(password))
+    ending_at = [[] for _ in range(len(password) + 1)]
+    for match in matches:
+        ending_at[match.end].append(match)
+
+    # best[k] = (guesses, patterns) for the first k characters.
+    best = [(1.0, ())] + [None] * len(password)
+    for end in range(1, len(password) + 1):
+        guesses, patterns = best[end - 1]
+        char = password[end - 1]
+        if patterns and patterns[-1][0] == 'bruteforce':
+            candidate = (guesses * _cardinality(char), patterns[:-1] + (('bruteforce', patterns[-1][1] + char),))
+        else:
+            candidate = (guesses * _cardinality(char), patterns + (('bruteforce', char),))
+        for match in ending_at[end]:
+            previous_guesses, previous_patterns = best[match.start]
+            total = previous_guesses * max(match.guesses, MIN_MATCH_GUESSES)
+            if total < candidate[0]:
+                candidate = (total, previous_patterns + ((match.pattern, match.token),))
+        best[end] = candidate
+    guesses, patterns = best[-1]
+    return min(guesses, MAX_GUESSES), patterns
+
+
+def crack_time_band(seconds: float) -> str:
+    for bound, label in CRACK_TIME_BANDS:
+        if seconds < bound:
+            return label
+    return CRACK_TIME_BANDS[-1][1]
+
+
+@lru_cache(maxsize=4096)
+def estimate_strength(password: str) -> StrengthEstimate:
+    """Estimates how many guesses a password needs; results are memoised per process."""
+    if not password:
+        return StrengthEstimate(0.0, 0.0, 0, MappingProxyType({}), MappingProxyType({}), (), '')
+
+    if len(password) > MAX_SCORED_LENGTH:
+        head, tail = estimate_strength(password[:MAX_SCORED_LENGTH]), estimate_strength(password[MAX_SCORED_LENGTH:])
+        guesses, patterns = min(head.guesses * tail.guesses, MAX_GUESSES), head.patterns + tail.patterns
+        if head.patterns[-1][0] == tail.patterns[0][0] == 'bruteforce':
+            patterns = head.patterns[:-1] + (('bruteforce', head.patterns[-1][1] + tail.patterns[0][1]),) + tail.patterns[1:]
+    else:
+        guesses, patterns = _minimum_guesses(password)
+    crack_seconds = {scenario: guesses / rate for scenario, rate in ATTACK_SCENARIOS.items()}
+    score = sum(guesses >= threshold for threshold in SCORE_THRESHOLDS)
+    weakest = next((pattern for pattern, _ in patterns if pattern in WARNINGS), None)
+    return StrengthEstimate(
+        guesses=guesses,
+        entropy_bits=math.log2(guesses) if guesses > 0 else 0.0,
+        score=score,
+        crack_seconds=MappingProxyType(crack_seconds),
+        crack_bands=MappingProxyType({scenario: crack_time_band(s) for scenario, s in crack_seconds.items()}),
+        patterns=patterns,
+        warning=WARNINGS[weakest] if weakest and score < 4 else '',
+    )
+
+
+def strength_report(password: str) -> dict:
+    """estimate_strength as a JSON-ready dict, e.g. for the API's worker processes."""
+    estimate = estimate_strength(password)
+    return {
+        'guesses': estimate.guesses,
+        'entropy_bits': round(estimate.entropy_bits, 2),
+        'score': estimate.score,
+        'crack_seconds': dict(estimate.crack_seconds),
+        'crack_times': dict(estimate.crack_bands),
+        'patterns': [{'pattern': pattern, 'token': token} for pattern, token in estimate.patterns],
+        'warning': estimate.warning,
+    }
@@ -0,0 +1,300 @@
+# vault.py
+#
+# Encrypted password vault, replacing the append-only saved_passwords.txt.
+#
+#   python vault.py init                      # set the master passphrase of a new vault
+#   python vault.py import saved_passwords.txt
+#   python vault.py list
+#   python vault.py get Google
+#
+# Entries live in a SQLite table keyed by service name, so lookups, updates and
+# deletes go straight to one row and saving a service again replaces its
+# entry. Each password is encrypted with AES-GCM under a key derived from
+# the master passphrase with scrypt. The service name is bound in as associated
+# data, so ciphertexts cannot be swapped between rows. scrypt is deliberately
+# slow, so it runs once per unlock. The derived key belongs to a VaultSession,
+# one per browser tab in the app, and is kept in memory until that session is
+# locked, disconnects or sits idle for AUTO_LOCK_SECONDS; the shared Vault
+# object only holds the encrypted rows. A new vault gets its passphrase from
+# `python vault.py init`, never from whoever opens the app first.
+
+import argparse
+import getpass
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+DEFAULT_VAULT_PATH = os.environ.get(
+    'PASSWORD_VAULT_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vault.db'))
+
+# scrypt cost parameters (~100 ms and 32 MB per unlock on a laptop).
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 15, 8, 1
+KEY_BYTES = 32
+SALT_BYTES = 16
+NONCE_BYTES = 12
+# A known plaintext encrypted at creation, used to tell a wrong passphrase apart.
+CHECK_PLAINTEXT = b'password-vault-check'
+
+# Forget the derived key after this long without vault access.
+AUTO_LOCK_SECONDS = int(os.environ.get('PASSWORD_VAULT_AUTO_LOCK', '900'))
+
+
+class VaultLockedError(Exception):
+    """Raised when entries are read or written before the vault is unlocked."""
+
+
+class WrongPassphraseError(ValueError):
+    """Raised when the master passphrase does not match the vault."""
+
+
+class VaultNotInitialisedError(Exception):
+    """Raised when unlocking a vault whose passphrase has not been set with `vault.py init`."""
+
+
+def derive_key(passphrase: str, salt: bytes, n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P) -> bytes:
+    return hashlib.scrypt(passphrase.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r, dklen=KEY_BYTES)
+
+
+class Vault:
+    """The encrypted entries in SQLite; one instance can be shared between threads and sessions."""
+
+    def __init__(self, path: str = DEFAULT_VAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB NOT NULL);
+            CREATE TABLE IF NOT EXISTS entries (
+                service TEXT PRIMARY KEY COLLATE NOCASE,
+                nonce BLOB NOT NULL,
+                ciphertext BLOB NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+        ''')
+    # --- PASSPHRASE ---
+    def _meta(self, key: str):
+        row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def initialised(self) -> bool:
+        return self._meta('salt') is not None
+
+    def initialise(self, passphrase: str):
+        """Sets the master passphrase of a new vault."""
+        if not passphrase:
+            raise WrongPassphraseError('Enter the master passphrase.')
+        with self._lock:
+            if self._meta('salt') is not None:
+                raise ValueError('The vault already has a master passphrase.')
+            salt = os.urandom(SALT_BYTES)
+            aead = AESGCM(derive_key(passphrase, salt))
+            nonce = os.urandom(NONCE_BYTES)
+            check = nonce + aead.encrypt(nonce, CHECK_PLAINTEXT, b'check')
+            with self._conn:
+                self._conn.executemany('INSERT INTO meta (key, value) VALUES (?, ?)', [
+                    ('salt', salt), ('kdf', f'scrypt:{SCRYPT_N}:{SCRYPT_R}:{SCRYPT_P}'.encode()), ('check', check),
+                ])
+
+    def derive(self, passphrase: str) -> AESGCM:
+        """The cipher for the vault's key, after checking the passphrase against it."""
+        if not passphrase:
+            raise WrongPassphraseError('Enter the master passphrase.')
+        with self._lock:
+            salt = self._meta('salt')
+            if salt is None:
+                raise VaultNotInitialisedError('The vault has no master passphrase yet; run `python vault.py init`.')
+            # Use the parameters the vault was created with, so raising the
+            # defaults later does not lock anyone out.
+            _, n, r, p = self._meta('kdf').decode().split(':')
+            check = self._meta('check')
+        aead = AESGCM(derive_key(passphrase, salt, int(n), int(r), int(p)))
+        try:
+            aead.decrypt(check[:NONCE_BYTES], check[NONCE_BYTES:], b'check')
+        except InvalidTag:
+            raise WrongPassphraseError('Wrong master passphrase.') from None
+        return aead
+
+    def session(self) -> 'VaultSession':
+        return VaultSession(self)
+
+    # --- ENTRIES ---
+    def put(self, aead: AESGCM, service: str, password: str) -> bool:
+        """Stores a password for a service, replacing any previous one. Returns True if it replaced one."""
+        service = service.strip()
+        if not service:
+            raise ValueError('Enter a service name.')
+        nonce = os.urandom(NONCE_BYTES)
+        ciphertext = aead.encrypt(nonce, password.encode('utf-8'), service.lower().encode('utf-8'))
+        with self._lock, self._conn:
+            existed = self._conn.execute('SELECT 1 FROM entries WHERE service = ?', (service,)).fetchone() is not None
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (service, nonce, ciphertext, updated_at) VALUES (?, ?, ?, ?)',
+                (service, nonce, ciphertext, datetime.now(timezone.utc).isoformat()))
+        return existed
+
+    def get(self, aead: AESGCM, service: str):
+        """The password saved for a service (case-insensitive), or None."""
+        with self._lock:
+            row = self._conn.execute('SELECT service, nonce, ciphertext FROM entries WHERE service = ?',
+                                     (service.strip(),)).fetchone()
+        if row is None:
+            return None
+        return aead.decrypt(row[1], row[2], row[0].lower().encode('utf-8')).decode('utf-8')
+
+    def delete(self, service: str) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute('DELETE FROM entries WHERE service = ?', (service.strip(),)).rowcount > 0
+
+    def services(self):
+        """Saved service names, alphabetically. Names are not secret, so this works while locked."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT service FROM entries ORDER BY service COLLATE NOCASE')]
+
+    def close(self):
+        self._conn.close()
+
+
+class VaultSession:
+    """One client's access to a vault: holds the derived key until locked or idle for AUTO_LOCK_SECONDS."""
+
+    def __init__(self, vault: Vault):
+        self.vault = vault
+        self._aead = None
+        self._last_used = 0.0
+
+    @property
+    def initialised(self) -> bool:
+        return self.vault.initialised
+
+    @property
+    def unlocked(self) -> bool:
+        if self._aead is not None and time.monotonic() - self._last_used > AUTO_LOCK_SECONDS:
+            self.lock()
+        return self._aead is not None
+
+    def unlock(self, passphrase: str):
+        """Derives the vault key from the passphrase and keeps it for this session."""
+        self._aead = self.vault.derive(passphrase)
+        self._last_used = time.monotonic()
+
+    def lock(self):
+        self._aead = None
+
+    def _cipher(self) -> AESGCM:
+        if not self.unlocked:
+            raise VaultLockedError('Unlock the vault first.')
+        self._last_used = time.monotonic()
+        return self._aead
+
+    def put(self, service: str, password: str) -> bool:
+        return self.vault.put(self._cipher(), service, password)
+
+    def get(self, service: str):
+        return self.vault.get(self._cipher(), service)
+
+    def delete(self, service: str) -> bool:
+        self._cipher()
+        return self.vault.delete(service)
+
+    def services(self):
+        return self.vault.services()
+
+    def save(self, service: str, password: str):
+        """Stores a password under a service name; returns whether one was replaced and the saved services."""
+        replaced = self.put(service.strip(), password)
+        return replaced, self.services()
+
+
+def read_legacy_file(path: str):
+    """Yields (service, password) from the old saved_passwords.txt format; later entries win on import."""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    for service, password in re.findall(r'^Service: (.*)\nPassword: (.*)$', text, flags=re.MULTILINE):
+        if service.strip() and password:
+            yield service.strip(), password
+
+
+def import_legacy_file(vault: VaultSession, path: str) -> int:
+    count = 0
+    for service, password in read_legacy_file(path):
+        vault.put(service, password)
+        count += 1
+    return count
+
+
+_default_vault = None
+_default_vault_lock = threading.Lock()
+
+
+def default_vault() -> Vault:
+    """The vault at DEFAULT_VAULT_PATH, opened once per process; each client unlocks its own session of it."""
+    global _default_vault
+    with _default_vault_lock:
+        if _default_vault is None:
+            _default_vault = Vault(DEFAULT_VAULT_PATH)
+        return _default_vault
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Manage the encrypted password vault.')
+    parser.add_argument('--vault', default=DEFAULT_VAULT_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('init', help='set the master passphrase of a new vault')
+    commands.add_parser('list', help='list saved services')
+    commands.add_parser('get', help='print the password for a service').add_argument('service')
+    commands.add_parser('delete', help='remove a service').add_argument('service')
+    commands.add_parser('import', help='import entries from saved_passwords.txt').add_argument('file')
+    args = parser.parse_args(argv)
+
+    vault = Vault(args.vault)
+    if args.command == 'list':
+        for service in vault.services():
+            print(service)
+        return
+    if args.command == 'init':
+        passphrase = getpass.getpass('New master passphrase: ')
+        if passphrase != getpass.getpass('Repeat it: '):
+            print('Error: the passphrases do not match.', file=sys.stderr)
+            sys.exit(1)
+        try:
+            vault.initialise(passphrase)
+        except ValueError as e:
+            print(f'Error: {e}', file=sys.stderr)
+            sys.exit(1)
+        print(f'✅ Vault created at {args.vault}.')
+        return
+
+    session = vault.session()
+    try:
+        session.unlock(getpass.getpass('Master passphrase: '))
+    except (WrongPassphraseError, VaultNotInitialisedError) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == 'get':
+        password = session.get(args.service)
+        if password is None:
+            print(f"No password saved for '{args.service}'.", file=sys.stderr)
+            sys.exit(1)
+        print(password)
+    elif args.command == 'delete':
+        print('✅ Deleted.' if session.delete(args.service) else f"No password saved for '{args.service}'.")
+    elif args.command == 'import':
+        count = import_legacy_file(session, args.file)
+        print(f'✅ Imported {count} entries into {args.vault}. Delete {args.file} once you have checked them; '
+              'it still holds the passwords in plain text.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# analytics.py
+#
+# How a player plays: rolling win rate, move distribution, move-transition
+# matrices and win-stay/lose-shift behaviour.
+#
+# PlayAnalytics keeps running counts (fixed-size tables) plus one byte per
+# round for the outcomes, and update() only reads the rounds added since it
+# last ran, through the history's offset index. Each batch of new rounds is
+# turned into arrays and counted with NumPy, so catching up on a long history
+# costs one pass and every later rerun costs only the new rounds. A reset or
+# compaction of the history (a new generation) starts the counts again.
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from game_logic import CHOICES, MOVE_INDEX, RESULTS
+
+ROLLING_WINDOW = 50
+# The rolling win rate is plotted with at most this many points.
+MAX_CHART_POINTS = 1000
+# Rounds read from the history per step while catching up.
+READ_CHUNK = 20_000
+
+RESULT_CODE = {result: code for code, result in RESULTS.items()}
+# Rows of the stay/shift table, indexed by outcome + 1.
+AFTER_OUTCOME = ("After a loss", "After a tie", "After a win")
+
+
+class PlayAnalytics:
+    """Incrementally updated play statistics of one history; shareable between sessions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, generation):
+        self.generation = generation
+        self.rounds = 0
+        self.player_moves = np.zeros(3, dtype=np.int64)
+        self.computer_moves = np.zeros(3, dtype=np.int64)
+        # [previous move, next player move]
+        self.player_transitions = np.zeros((3, 3), dtype=np.int64)
+        self.after_computer = np.zeros((3, 3), dtype=np.int64)
+        # [previous outcome + 1, 0 = stayed / 1 = shifted]
+        self.stay_shift = np.zeros((3, 2), dtype=np.int64)
+        self._outcomes = np.zeros(1024, dtype=np.int8)
+        self._last = None  # (player move, computer move, outcome) of the latest round
+
+    def update(self, store):
+        """Counts the rounds added to the store since the last update."""
+        with self._lock:
+            total, generation = store.summary['rounds'], store.generation
+            if generation != self.generation or total < self.rounds:
+                self._reset(generation)
+            while self.rounds < total:
+                records = store.read_rounds(self.rounds, min(total, self.rounds + READ_CHUNK))
+                if not records:
+                    break
+                self._add(records)
+
+    def _add(self, records):
+        frame = pd.DataFrame.from_records(records, columns=["Player", "Computer", "Result"])
+        player = frame["Player"].map(MOVE_INDEX).fillna(-1).to_numpy(np.int64)
+        computer = frame["Computer"].map(MOVE_INDEX).fillna(-1).to_numpy(np.int64)
+        outcome = frame["Result"].map(RESULT_CODE).fillna(0).to_numpy(np.int64)
+
+        self.player_moves += np.bincount(player[player >= 0], minlength=3)
+        self.computer_moves += np.bincount(computer[computer >= 0], minlength=3)
+
+        # Each round paired with the one before it, including the last round of the previous batch.
+        last = self._last or (-1, -1, 0)
+        previous_player = np.concatenate(([last[0]], player[:-1]))
+        previous_computer = np.concatenate(([last[1]], computer[:-1]))
+        previous_outcome = np.concatenate(([last[2]], outcome[:-1]))
+
+        valid = (previous_player >= 0) & (player >= 0)
+        self.player_transitions += np.bincount(previous_player[valid] * 3 + player[valid], minlength=9).reshape(3, 3)
+        shifted = (player[valid] != previous_player[valid]).astype(np.int64)
+        self.stay_shift += np.bincount((previous_outcome[valid] + 1) * 2 + shifted, minlength=6).reshape(3, 2)
+        valid = (previous_computer >= 0) & (player >= 0)
+        self.after_computer += np.bincount(previous_computer[valid] * 3 + player[valid], minlength=9).reshape(3, 3)
+
+        end = self.rounds + len(records)
+        if end > len(self._outcomes):
+            self._outcomes = np.resize(self._outcomes, max(end, 2 * len(self._outcomes)))
+        self._outcomes[self.rounds:end] = outcome
+        self.rounds = end
+        self._last = (player[-1], computer[-1], outcome[-1])
+
+    # --- VIEWS ---
+    def rolling_rates(self, window: int = ROLLING_WINDOW, points: int = MAX_CHART_POINTS) -> pd.DataFrame:
+        """Win and loss rate over the last `window` rounds, at up to `points` rounds spread over the history."""
+        outcomes = self._outcomes[:self.rounds]
+        wins = np.concatenate(([0], np.cumsum(outcomes == 1)))
+        losses = np.concatenate(([0], np.cumsum(outcomes == -1)))
+        ends = np.unique(np.linspace(1, self.rounds, min(points, self.rounds)).astype(np.int64))
+        starts = np.maximum(ends - window, 0)
+        played = ends - starts
+        return pd.DataFrame({
+            "Win rate": (wins[ends] - wins[starts]) / played,
+            "Loss rate": (losses[ends] - losses[starts]) / played,
+        }, index=pd.Index(ends, name="Round"))
+
+    def view(self) -> dict:
+        """Every table and chart of the dashboard, as DataFrames."""
+        with self._lock:
+            if not self.rounds:
+                return {}
+            return {
+                "rounds": self.rounds,
+                "rolling": self.rolling_rates(),
+                "moves": pd.DataFrame({"You": self.player_moves, "Computer": self.computer_moves}, index=list(CHOICES)),
+                "transitions": _row_shares(self.player_transitions, "Your previous move", "Your next move"),
+                "after_computer": _row_shares(self.after_computer, "Computer's previous move", "Your next move"),
+                "stay_shift": _stay_shift_table(self.stay_shift),
+            }
+
+
+def _percent(counts: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    return np.round(np.divide(100 * counts, totals, out=np.zeros(counts.shape), where=totals > 0), 1)
+
+
+def _row_shares(counts: np.ndarray, rows: str, columns: str) -> pd.DataFrame:
+    """Counts as percentages of each row, so each row reads as 'what came next'."""
+    shares = _percent(counts, counts.sum(axis=1, keepdims=True))
+    return pd.DataFrame(shares, index=pd.Index(CHOICES, name=rows), columns=pd.Index(CHOICES, name=columns))
+
+
+def _stay_shift_table(counts: np.ndarray) -> pd.DataFrame:
+    totals = counts.sum(axis=1)
+    return pd.DataFrame({"Stayed %": _percent(counts[:, 0], totals), "Shifted %": _percent(counts[:, 1], totals),
+                         "Rounds": totals}, index=list(AFTER_OUTCOME))
@@ -0,0 +1,216 @@
+# game_logic.py
+#
+# Round outcome and the computer opponent's strategies.
+#
+# Every strategy predicts the player's next move from what it has seen and
+# plays the move that beats it. Learning is online: each round updates a
+# fixed-size table in constant time, and older evidence is decayed so the
+# opponent follows a player who changes habits. All strategies learn from every
+# round, so switching strategy mid-game keeps what they learned. Their state is
+# saved next to the game history, so it survives restarts without replaying
+# the history.
+
+import json
+import os
+import random
+import threading
+
+from history_store import atomic_write_bytes
+
+# Moves are also numbered 0-2 in this order, so each move beats the one before
+# it (mod 3). simulate.py plays whole games as arrays of these numbers.
+CHOICES = ("Rock", "Paper", "Scissors")
+MOVE_INDEX = {move: index for index, move in enumerate(CHOICES)}
+# OUTCOME[player][computer]: 1 if the player wins, -1 if the computer wins, 0 for a tie.
+OUTCOME = tuple(tuple((0, 1, -1)[(player - computer) % 3] for computer in range(3)) for player in range(3))
+RESULTS = {1: "You Win!", -1: "Computer Wins!", 0: "It's a Tie!"}
+# The move each move beats, and the move that beats each move.
+BEATS = {move: CHOICES[(index - 1) % 3] for index, move in enumerate(CHOICES)}
+COUNTER = {move: CHOICES[(index + 1) % 3] for index, move in enumerate(CHOICES)}
+
+# Weight kept by old evidence each time new evidence arrives.
+DECAY = 0.95
+DEFAULT_STRATEGY = 'ensemble'
+
+
+def determine_winner(player_choice, computer_choice):
+    return RESULTS[OUTCOME[MOVE_INDEX[player_choice]][MOVE_INDEX[computer_choice]]]
+
+
+def _likeliest(counts: dict, rng):
+    """The move with the highest count, ties broken at random; None if nothing has been seen."""
+    best = max(counts.values())
+    if best <= 0:
+        return None
+    return rng.choice([move for move in CHOICES if counts[move] == best])
+
+
+def _decayed_add(counts: dict, move: str):
+    for key in counts:
+        counts[key] *= DECAY
+    counts[move] += 1
+
+
+class Strategy:
+    """Base class: predict() guesses the player's move, choose() beats it, update() learns from the round."""
+
+    name = 'random'
+    label = 'Random'
+
+    def predict(self, rng=random):
+        return None
+
+    def choose(self, rng=random):
+        predicted = self.predict(rng)
+        return COUNTER[predicted] if predicted else rng.choice(CHOICES)
+
+    def update(self, player_move: str):
+        pass
+
+    def state(self) -> dict:
+        return {}
+
+    def load(self, state: dict):
+        pass
+
+
+class FrequencyStrategy(Strategy):
+    """Expects the player's most frequent (recent) move."""
+
+    name = 'frequency'
+    label = 'Frequency'
+
+    def __init__(self):
+        self.counts = {move: 0.0 for move in CHOICES}
+
+    def predict(self, rng=random):
+        return _likeliest(self.counts, rng)
+
+    def update(self, player_move):
+        _decayed_add(self.counts, player_move)
+
+    def state(self):
+        return {'counts': self.counts}
+
+    def load(self, state):
+        self.counts.update(state.get('counts', {}))
+
+
+class MarkovStrategy(Strategy):
+    """
+    Expects whatever the player most often played after their last `order`
+    moves. The table has at most 3**order rows of three counts.
+    """
+
+    def __init__(self, order: int = 1):
+        self.order = order
+        self.name = f'markov{order}'
+        self.label = f'Pattern (last {order} move{"s" if order > 1 else ""})'
+        self.recent = ''
+        self.table = {}
+
+    def _context(self):
+        return self.recent if len(self.recent) == self.order else None
+
+    def predict(self, rng=random):
+        row = self.table.get(self._context())
+        return _likeliest(row, rng) if row else None
+
+    def update(self, player_move):
+        context = self._context()
+        if context is not None:
+            _decayed_add(self.table.setdefault(context, {move: 0.0 for move in CHOICES}), player_move)
+        # Contexts are strings of first letters, e.g. 'RP' for Rock then Paper.
+        self.recent = (self.recent + player_move[0])[-self.order:]
+
+    def state(self):
+        return {'recent': self.recent, 'table': self.table}
+
+    def load(self, state):
+        self.recent = state.get('recent', '')[-self.order:]
+        self.table = state.get('table', {})
+
+
+class EnsembleStrategy(Strategy):
+    """
+    Runs several strategies side by side, scores each on whether its move
+    would have won the round, and plays the move of the best-scoring one.
+    """
+
+    name = 'ensemble'
+    label = 'Adaptive (ensemble)'
+
+    def __init__(self):
+        self.members = [Strategy(), FrequencyStrategy(), MarkovStrategy(1), MarkovStrategy(2), MarkovStrategy(3)]
+        self.scores = {member.name: 0.0 for member in self.members}
+
+    def _best(self):
+        return max(self.members, key=lambda member: self.scores[member.name])
+
+    def predict(self, rng=random):
+        return self._best().predict(rng)
+
+    def choose(self, rng=random):
+        return self._best().choose(rng)
+
+    def update(self, player_move, rng=random):
+        for member in self.members:
+            predicted = member.predict(rng)
+            if predicted is not None:
+                outcome = determine_winner(player_move, COUNTER[predicted])
+                reward = 1 if outcome == "Computer Wins!" else -1 if outcome == "You Win!" else 0
+            else:
+                reward = 0
+            self.scores[member.name] = self.scores[member.name] * DECAY + reward
+            member.update(player_move)
+
+    def state(self):
+        return {'scores': self.scores, 'members': {member.name: member.state() for member in self.members}}
+
+    def load(self, state):
+        self.scores.update(state.get('scores', {}))
+        for member in self.members:
+            member.load(state.get('members', {}).get(member.name, {}))
+
+
+def new_strategies() -> dict:
+    strategies = [Strategy(), FrequencyStrategy(), MarkovStrategy(1), MarkovStrategy(2), EnsembleStrategy()]
+    return {strategy.name: strategy for strategy in strategies}
+
+
+class Opponent:
+    """The computer player: every strategy, trained on every round; shareable between sessions."""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.strategies = new_strategies()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                try:
+                    state = json.load(f)
+                except json.JSONDecodeError:
+                    state = {}
+            for name, strategy in self.strategies.items():
+                strategy.load(state.get(name, {}))
+
+    def choose(self, strategy: str = DEFAULT_STRATEGY, rng=random) -> str:
+        with self._lock:
+            return self.strategies.get(strategy, self.strategies[DEFAULT_STRATEGY]).choose(rng)
+
+    def learn(self, player_move: str):
+        """Updates every strategy with the player's move and saves their state."""
+        with self._lock:
+            for strategy in self.strategies.values():
+                strategy.update(player_move)
+            self._save()
+
+    def reset(self):
+        with self._lock:
+            self.strategies = new_strategies()
+            self._save()
+
+    def _save(self):
+        if self.path:
+            state = {name: strategy.state() for name, strategy in self.strategies.items()}
+            atomic_write_bytes(self.path, json.dumps(state).encode('utf-8'), durable=False)
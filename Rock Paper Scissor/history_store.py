@@ -0,0 +1,435 @@
+# history_store.py
+#
+# Append-only game history. Each round is one compact JSON line appended to
+# HISTORY_FILE, so saving a round costs the same however long the history is.
+# Two small files sit next to the log and are updated with every round:
+#
+#   <log>.idx           the byte offset of each live round, 8 bytes apiece, so
+#                       any page of history is read without scanning the log
+#   <log>.summary.json  running totals (wins, losses, ties, choice counts), so
+#                       scores load without reading the history at all, and the
+#                       generation: a number that grows when a reset, compaction
+#                       or rebuild changes existing rounds, which every process
+#                       reads
+#
+# A reset appends a marker line instead of rewriting the file. Once dead lines
+# (reset history, or a line cut short by a crash) outnumber live ones, the log
+# is compacted: live records are written to a temporary file, fsynced, and
+# atomically renamed over the log, so a crash leaves either the old log or the
+# new one. If the sidecars disagree with the log after a crash, they are
+# rebuilt from one scan of it.
+#
+# Several processes (or app servers) may write the same log. Every write holds
+# an exclusive lock on <log>.lock, and first checks whether the log changed
+# since this process last touched it; if so, it reloads the sidecars before
+# appending, so no process works from stale totals or offsets.
+#
+# FSYNC_POLICY decides how hard each append tries to reach the disk:
+#   always   - fsync after every round (safest, slowest)
+#   interval - fsync at most every FSYNC_INTERVAL seconds (default)
+#   never    - leave it to the OS
+
+import json
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+HISTORY_FILE = os.environ.get('RPS_HISTORY_FILE', 'game_history.jsonl')
+LEGACY_FILE = 'game_data.json'
+FSYNC_POLICY = os.environ.get('RPS_FSYNC', 'interval').lower()
+FSYNC_INTERVAL = float(os.environ.get('RPS_FSYNC_INTERVAL', '1'))
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+RESET_MARKER = {'reset': True}
+# Don't bother compacting logs with fewer dead lines than this.
+MIN_COMPACT_LINES = 100
+
+CHOICES = ("Rock", "Paper", "Scissors")
+OUTCOMES = {"You Win!": 'wins', "Computer Wins!": 'losses', "It's a Tie!": 'ties'}
+OFFSET = struct.Struct('<Q')
+
+
+def _fsync_directory(path: str):
+    """Makes a rename in the file's directory durable (a no-op where directories can't be opened)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def file_lock(handle):
+    """Holds an exclusive lock on an open file, shared by every process using it."""
+    if fcntl:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+    else:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+    try:
+        yield
+    finally:
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write_bytes(path: str, data: bytes, durable: bool = True):
+    """
+    Replaces a file so readers see all of the new contents or none of them.
+    Each process and thread writes its own temporary file, so writers that
+    don't hold a lock (such as two sessions saving the same opponent) never
+    write into each other's; the last rename wins.
+    """
+    tmp_path = f'{path}.{os.getpid()}-{threading.get_ident()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if durable:
+        _fsync_directory(path)
+
+
+def encode(record: dict) -> bytes:
+    return json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def empty_summary() -> dict:
+    return {
+        'rounds': 0, 'wins': 0, 'losses': 0, 'ties': 0,
+        'player_choices': {choice: 0 for choice in CHOICES},
+        'computer_choices': {choice: 0 for choice in CHOICES},
+        'log_bytes': 0,
+        'generation': 0,
+    }
+
+
+def add_to_summary(summary: dict, record: dict):
+    """Counts one round into the running totals."""
+    summary['rounds'] += 1
+    outcome = OUTCOMES.get(record.get("Result"))
+    if outcome:
+        summary[outcome] += 1
+    for side, key in (("Player", 'player_choices'), ("Computer", 'computer_choices')):
+        choice = record.get(side)
+        if choice in summary[key]:
+            summary[key][choice] += 1
+
+
+class HistoryStore:
+    """The round history of one log file; safe to share between sessions of the app."""
+
+    def __init__(self, path: str = HISTORY_FILE, fsync: str = FSYNC_POLICY, fsync_interval: float = FSYNC_INTERVAL):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f'fsync policy must be one of {", ".join(FSYNC_POLICIES)}, not {fsync!r}')
+        self.path, self.fsync, self.fsync_interval = path, fsync, fsync_interval
+        self.index_path = path + '.idx'
+        self.summary_path = path + '.summary.json'
+        self.lock_path = path + '.lock'
+        self._lock = threading.Lock()
+        self._lock_file = None
+        # (inode, size) of the log as this process last left it.
+        self._seen = None
+        self._log = None
+        self._index = None
+        self._last_fsync = 0.0
+        self._summary = empty_summary()
+        self._dead = 0
+
+    @property
+    def generation(self) -> int:
+        """
+        Changes whenever existing rounds change (reset, compaction), in every
+        process, so cached pages of history can tell they are stale; appends
+        leave it alone.
+        """
+        return self._summary.get('generation', 0)
+
+    def _next_generation(self, summary: dict) -> dict:
+        # A clock reading, and past any generation still on disk, so a store
+        # that never saw the last one (a fresh process rebuilding damaged
+        # sidecars) cannot hand out a number used for other content.
+        summary['generation'] = max(time.time_ns(), self.generation + 1, self._disk_generation() + 1)
+        return summary
+
+    def _disk_generation(self) -> int:
+        try:
+            with open(self.summary_path, 'r', encoding='utf-8') as f:
+                return int(json.load(f).get('generation', 0))
+        except (OSError, ValueError, TypeError, AttributeError):
+            return 0
+
+    # --- LOADING ---
+    def _scan(self):
+        """Reads the whole log: (live records with their offsets, dead line count, byte length of its valid part)."""
+        records, dead, valid_bytes = [], 0, 0
+        if not os.path.exists(self.path):
+            return records, dead, valid_bytes
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    dead += 1  # A crash cut the last append short.
+                    break
+                offset, valid_bytes = valid_bytes, valid_bytes + len(raw)
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    dead += 1
+                    continue
+                if record == RESET_MARKER:
+                    dead += len(records) + 1
+                    records = []
+                else:
+                    records.append((offset, record))
+        return records, dead, valid_bytes
+
+    def _disk_state(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size
+
+    @contextmanager
+    def _exclusive(self, reload: bool = False):
+        """Thread and process lock around any use of the log; catches up first if another process wrote it."""
+        with self._lock:
+            if self._lock_file is None:
+                self._lock_file = open(self.lock_path, 'a+b')
+            with file_lock(self._lock_file):
+                if reload or self._disk_state() != self._seen:
+                    self._reload()
+                yield
+                self._seen = self._disk_state()
+
+    def _reload(self):
+        self._close()
+        self._dead = 0
+        if not self._sidecars_match():
+            self._rebuild()
+
+    def _sidecars_match(self) -> bool:
+        try:
+            with open(self.summary_path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+            indexed = os.path.getsize(self.index_path) // OFFSET.size
+        except (OSError, ValueError):
+            return False
+        log_bytes = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if summary.get('log_bytes') != log_bytes or summary.get('rounds') != indexed:
+            return False
+        self._summary = summary
+        return True
+
+    def load(self) -> dict:
+        """
+        Readies the log for appends and returns the summary. Normally this only
+        reads the summary file; the log is scanned just when the sidecars are
+        missing or a crash left them behind the log.
+        """
+        with self._exclusive(reload=True):
+            return dict(self._summary)
+
+    def _rebuild(self):
+        self._close()
+        records, dead, valid_bytes = self._scan()
+        if os.path.exists(self.path) and os.path.getsize(self.path) > valid_bytes:
+            # Drop a torn final line so the next append starts on a line of its own.
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        summary = empty_summary()
+        for _, record in records:
+            add_to_summary(summary, record)
+        summary['log_bytes'] = valid_bytes
+        atomic_write_bytes(self.index_path, b''.join(OFFSET.pack(offset) for offset, _ in records))
+        self._summary, self._dead = self._next_generation(summary), dead
+        self._save_summary(durable=True)
+        self._maybe_compact()
+
+    # --- WRITING ---
+    def _open(self):
+        if self._log is None:
+            self._log = open(self.path, 'ab')
+            self._index = open(self.index_path, 'ab')
+        return self._log, self._index
+
+    def _close(self):
+        if self._log is not None:
+            self._log.close()
+            self._index.close()
+            self._log = self._index = None
+
+    def _save_summary(self, durable: bool):
+        atomic_write_bytes(self.summary_path, json.dumps(self._summary).encode('utf-8'), durable)
+
+    def _due_for_fsync(self) -> bool:
+        now = time.monotonic()
+        if self.fsync == 'always' or (self.fsync == 'interval' and now - self._last_fsync >= self.fsync_interval):
+            self._last_fsync = now
+            return True
+        return False
+
+    def _write(self, line: bytes, offset_entry: bool):
+        log, index = self._open()
+        log.write(line)
+        log.flush()
+        if offset_entry:
+            index.write(OFFSET.pack(self._summary['log_bytes']))
+            index.flush()
+        self._summary['log_bytes'] += len(line)
+        durable = self._due_for_fsync()
+        if durable:
+            os.fsync(log.fileno())
+            os.fsync(index.fileno())
+        self._save_summary(durable)
+
+    def append(self, record: dict) -> dict:
+        """
+        Saves one round and returns the updated summary. The round number is
+        given here, under the lock, so concurrent sessions never share one.
+        """
+        with self._exclusive():
+            record = {'Round': self._summary['rounds'] + 1, **{k: v for k, v in record.items() if k != 'Round'}}
+            add_to_summary(self._summary, record)
+            self._write(encode(record), offset_entry=True)
+            return dict(self._summary)
+
+    def clear(self):
+        """Forgets every round so far, by appending a reset marker."""
+        with self._exclusive():
+            self._dead += self._summary['rounds'] + 1
+            log_bytes = self._summary['log_bytes']
+            self._summary = self._next_generation(empty_summary())
+            self._summary['log_bytes'] = log_bytes
+            self._open()
+            self._index.truncate(0)
+            self._write(encode(RESET_MARKER), offset_entry=False)
+            self._maybe_compact()
+
+    def sync(self):
+        """Forces appended rounds to disk regardless of the fsync policy."""
+        with self._exclusive():
+            if self._log is not None:
+                os.fsync(self._log.fileno())
+                os.fsync(self._index.fileno())
+                self._last_fsync = time.monotonic()
+            self._save_summary(durable=True)
+
+    # --- READING ---
+    @property
+    def summary(self) -> dict:
+        with self._exclusive():
+            return dict(self._summary)
+
+    def read_rounds(self, start: int, stop: int):
+        """Rounds start..stop-1 (0-based, oldest first), read via the offset index."""
+        with self._exclusive():
+            rounds = self._summary['rounds']
+            start, stop = max(0, start), min(stop, rounds)
+            if start >= stop:
+                return []
+            if self._index is not None:
+                self._index.flush()
+            with open(self.index_path, 'rb') as f:
+                f.seek(start * OFFSET.size)
+                offsets = [offset for offset, in OFFSET.iter_unpack(f.read((stop - start) * OFFSET.size))]
+            end = self._summary['log_bytes']
+            if stop < rounds:
+                with open(self.index_path, 'rb') as f:
+                    f.seek(stop * OFFSET.size)
+                    end, = OFFSET.unpack(f.read(OFFSET.size))
+            with open(self.path, 'rb') as f:
+                f.seek(offsets[0])
+                data = f.read(end - offsets[0])
+        # Reset markers can't fall inside a live range, so every line is a round.
+        return [json.loads(line) for line in data.splitlines()[:stop - start]]
+
+    def tail(self, count: int):
+        """The latest `count` rounds, oldest first."""
+        rounds = self.summary['rounds']
+        return self.read_rounds(rounds - count, rounds)
+
+    def records(self):
+        """Every live round, oldest first."""
+        return self.read_rounds(0, self.summary['rounds'])
+
+    # --- COMPACTION ---
+    def _maybe_compact(self):
+        if self._dead >= MIN_COMPACT_LINES and self._dead > self._summary['rounds']:
+            self._rewrite([record for _, record in self._scan()[0]])
+
+    def _rewrite(self, records):
+        self._close()
+        lines = [encode(record) for record in records]
+        offsets, position = [], 0
+        for line in lines:
+            offsets.append(position)
+            position += len(line)
+        atomic_write_bytes(self.path, b''.join(lines))
+        atomic_write_bytes(self.index_path, b''.join(OFFSET.pack(offset) for offset in offsets))
+        summary = empty_summary()
+        for record in records:
+            add_to_summary(summary, record)
+        summary['log_bytes'] = position
+        self._summary, self._dead = self._next_generation(summary), 0
+        self._save_summary(durable=True)
+        self._last_fsync = time.monotonic()
+
+    def compact(self):
+        """Rewrites the log with only its live records."""
+        with self._exclusive():
+            self._rewrite([record for _, record in self._scan()[0]])
+
+    def replace(self, records):
+        """Atomically replaces the whole history, e.g. when migrating."""
+        with self._exclusive():
+            self._rewrite(list(records))
+
+    def close(self):
+        with self._lock:
+            self._close()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+
+def migrate_legacy(store: HistoryStore, legacy_path: str = LEGACY_FILE) -> int:
+    """
+    One-time import of the old game_data.json list into the log. The old file
+    is renamed to <name>.migrated afterwards, so this runs once. Returns the
+    number of rounds imported.
+    """
+    if not os.path.exists(legacy_path) or os.path.exists(store.path):
+        return 0
+    with open(legacy_path, 'r', encoding='utf-8') as f:
+        try:
+            history = json.load(f)
+        except json.JSONDecodeError:
+            history = []
+    store.replace(history)
+    os.replace(legacy_path, legacy_path + '.migrated')
+    return len(history)
@@ -1,56 +1,78 @@
+import secrets
+
 import streamlit as st
-import random
 import pandas as pd
-import json
-import os
-
-DATA_FILE = "game_data.json"
-
-#Function to Load Game Data
-def load_data():
-    """Loads game history and scores from a JSON file."""
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return []
-    return []
-
-#Function to Save Game Data
-def save_data(history):
-    with open(DATA_FILE, 'w') as f:
-        json.dump(history, f, indent=4)
-
-#Initialize Session State
-if 'initialized' not in st.session_state:
-    st.session_state.history = load_data()
-    st.session_state.player_score = 0
-    st.session_state.computer_score = 0
-    
-    # Calculate scores from loaded history
-    for round_data in st.session_state.history:
-        if "You Win" in round_data["Result"]:
-            st.session_state.player_score += 1
-        elif "Computer Wins" in round_data["Result"]:
-            st.session_state.computer_score += 1
-            
-    st.session_state.initialized = True
+from analytics import ROLLING_WINDOW, PlayAnalytics
+from game_logic import DEFAULT_STRATEGY, Opponent, new_strategies
+from players import DEFAULT_PLAYER, OpenShards, leaderboard, migrate_shared_history, play_round, player_id
+
+# Rounds shown per page of the history table.
+HISTORY_PAGE_SIZE = 50
+LEADERBOARD_SIZE = 10
+# Open shards kept per server process; the least recently used are closed beyond this.
+MAX_OPEN_SHARDS = 256
+
+#Pick the Player
+# A new session gets its own guest name, kept in the URL so a reload keeps it.
+if 'player' not in st.session_state:
+    st.session_state.player = st.query_params.get('player') or f"{DEFAULT_PLAYER}-{secrets.token_hex(3)}"
+player = player_id(st.sidebar.text_input("Player name", key='player'))
+st.query_params['player'] = player
+
+#Open the Player's Game History
+@st.cache_resource
+def migrate():
+    """Moves the history of earlier versions, shared by everyone, to the guest player; once per process."""
+    migrate_shared_history()
+
+migrate()
+
+@st.cache_resource
+def open_shards():
+    """Open history shards of every player, shared by all sessions; the least recently used are closed."""
+    return OpenShards(MAX_OPEN_SHARDS)
+
+def get_store(player):
+    """The player's own history shard, shared by every session of that player."""
+    return open_shards().get(player)
+
+store = get_store(player)
+
+@st.cache_resource(max_entries=MAX_OPEN_SHARDS)
+def get_opponent(player):
+    """The computer player, with what it has learned about this player saved next to their history."""
+    return Opponent(get_store(player).path + '.opponent.json')
+
+opponent = get_opponent(player)
+
+@st.cache_data(max_entries=64)
+def history_page(player, start, stop, generation):
+    """One window of rounds as a DataFrame; generation changes when a reset invalidates cached pages."""
+    return pd.DataFrame(get_store(player).read_rounds(start, stop))
+
+@st.cache_resource(max_entries=MAX_OPEN_SHARDS)
+def get_analytics(player):
+    """Running play statistics of the player, updated from the last round they covered."""
+    return PlayAnalytics()
+
+@st.cache_data(max_entries=64)
+def analytics_view(player, rounds, generation):
+    """Dashboard tables for a history of `rounds` rounds; a new round or a reset changes the key."""
+    analytics = get_analytics(player)
+    analytics.update(get_store(player))
+    return analytics.view()
+
+@st.cache_data(ttl=10)
+def top_players():
+    return pd.DataFrame(leaderboard(limit=LEADERBOARD_SIZE))
 
 
 #UI and Game Logic
 st.title("Rock Paper Scissors Game")
 
-# Game Logic Function
-def determine_winner(player_choice, computer_choice):
-    if player_choice == computer_choice:
-        return "It's a Tie!"
-    elif (player_choice == "Rock" and computer_choice == "Scissors") or \
-         (player_choice == "Scissors" and computer_choice == "Paper") or \
-         (player_choice == "Paper" and computer_choice == "Rock"):
-        return "You Win!"
-    else:
-        return "Computer Wins!"
+strategy_labels = {name: strategy.label for name, strategy in new_strategies().items()}
+strategy = st.selectbox("Computer opponent", list(strategy_labels), format_func=strategy_labels.get,
+                        index=list(strategy_labels).index(DEFAULT_STRATEGY))
 
 st.header("Choose your weapon:")
 col1, col2, col3 = st.columns(3)
@@ -63,24 +85,11 @@ if col2.button("Paper"):
 if col3.button("Scissors"):
     player_choice = "Scissors"
 
+summary = store.summary
+
 if player_choice:
-    computer_choice = random.choice(["Rock", "Paper", "Scissors"])
-    result = determine_winner(player_choice, computer_choice)
-
-    # Update scores
-    if "You Win" in result:
-        st.session_state.player_score += 1
-    elif "Computer Wins" in result:
-        st.session_state.computer_score += 1
-
-    # Append new round to history and save it
-    st.session_state.history.append({
-        "Round": len(st.session_state.history) + 1,
-        "Player": player_choice,
-        "Computer": computer_choice,
-        "Result": result
-    })
-    save_data(st.session_state.history)
+    # Play and save the round; the store numbers it and updates the running score totals
+    computer_choice, result, summary = play_round(store, opponent, player_choice, strategy)
 
     # Display current round's result
     st.write(f"You chose: **{player_choice}**")
@@ -89,32 +98,62 @@ if player_choice:
 
 #Display Scores and History
 st.header("Game Score")
-st.write(f"**Player:** {st.session_state.player_score} | **Computer:** {st.session_state.computer_score}")
+st.write(f"**Player:** {summary['wins']} | **Computer:** {summary['losses']} | **Ties:** {summary['ties']}")
+
+if summary['rounds']:
+    choices = ", ".join(f"{choice} {count}" for choice, count in summary['player_choices'].items())
+    st.caption(f"Your picks over {summary['rounds']} rounds: {choices}")
 
-if st.session_state.history:
     st.header("Game History")
-    # Display history in a tabular format using pandas
-    history_df = pd.DataFrame(st.session_state.history)
-    st.dataframe(history_df)
+    # Only one page of rounds is read and rendered, latest first, so reruns
+    # stay quick however long the history is.
+    pages = (summary['rounds'] + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (1 = latest, {pages} pages)", min_value=1, max_value=pages, value=1)
+    stop = summary['rounds'] - (page - 1) * HISTORY_PAGE_SIZE
+    start = max(0, stop - HISTORY_PAGE_SIZE)
+    st.dataframe(history_page(player, start, stop, store.generation))
 
     # Determine and display the overall winner
-    if st.session_state.player_score > st.session_state.computer_score:
+    if summary['wins'] > summary['losses']:
         st.success("You are the overall winner so far!")
-    elif st.session_state.computer_score > st.session_state.player_score:
+    elif summary['losses'] > summary['wins']:
         st.error("The computer is the overall winner so far!")
     else:
         st.info("It's a tie overall so far!")
 
+    #Play Analytics, only computed while shown
+    if st.checkbox("Show play analytics"):
+        view = analytics_view(player, summary['rounds'], store.generation)
+        st.header("Play Analytics")
+        st.subheader(f"Rolling win rate (last {ROLLING_WINDOW} rounds)")
+        st.line_chart(view['rolling'])
+        st.subheader("Move distribution")
+        st.bar_chart(view['moves'])
+        st.subheader("What you play next")
+        st.caption("Percentage of your next moves after each of your moves, and after each of the computer's.")
+        st.dataframe(view['transitions'])
+        st.dataframe(view['after_computer'])
+        st.subheader("Win-stay / lose-shift")
+        st.dataframe(view['stay_shift'])
+
+#Leaderboard of Every Player
+st.sidebar.header("Leaderboard")
+leaders = top_players()
+if leaders.empty:
+    st.sidebar.caption("No rounds played yet.")
+else:
+    st.sidebar.dataframe(leaders, hide_index=True)
+
 #Option to Reset the Game
-if st.button("Reset Game"):
-    # Clear the session state
-    st.session_state.history = []
-    st.session_state.player_score = 0
-    st.session_state.computer_score = 0
-    st.session_state.initialized = False # Allows re-initialization on rerun
-    
-    # Clear the JSON file
-    save_data([]) 
-    
-    # Rerun the app to reflect the reset state
-    st.rerun()
\ No newline at end of file
+# Anyone can type any player name, so wiping a history has to be confirmed.
+def reset_game():
+    # Clear this player's saved history and score totals; other players keep theirs
+    store.clear()
+    opponent.reset()
+    st.session_state.confirm_reset = False
+
+confirm_reset = st.checkbox(f"Yes, delete all of {player}'s rounds", key='confirm_reset')
+# The app reruns after the click and shows the reset state
+st.button("Reset Game", disabled=not confirm_reset, on_click=reset_game)
@@ -0,0 +1,146 @@
+# players.py
+#
+# One history shard per player: DATA_DIR/<player>.jsonl with its sidecars and
+# the opponent's learned state. Players never share a file, so they never wait
+# on each other; two sessions of the same player are serialised by the shard's
+# file lock (history_store.py).
+#
+# OpenShards keeps the stores of the most recently seen players open and
+# closes the least recently used beyond its limit, so file handles stay
+# bounded however many players come and go.
+#
+# The leaderboard only reads each shard's <player>.jsonl.summary.json, a few
+# hundred bytes, so it costs one small read per player however long their
+# histories are.
+#
+# Earlier versions kept one log for everyone (game_history.jsonl, and before
+# that game_data.json). That history is moved to DEFAULT_PLAYER's shard the
+# first time the app starts.
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from game_logic import DEFAULT_STRATEGY, Opponent, determine_winner
+from history_store import HISTORY_FILE, LEGACY_FILE, HistoryStore, migrate_legacy
+
+DATA_DIR = os.environ.get('RPS_DATA_DIR', 'players')
+DEFAULT_PLAYER = 'guest'
+MAX_NAME_LENGTH = 40
+
+SHARD_SUFFIX = '.jsonl'
+SUMMARY_SUFFIX = SHARD_SUFFIX + '.summary.json'
+# Files kept next to a log, moved along with it when migrating.
+SIDECAR_SUFFIXES = ('.idx', '.summary.json', '.opponent.json')
+
+
+def player_id(name: str) -> str:
+    """A file-safe id for a player name: lowercase letters, digits, '-' and '_'."""
+    slug = re.sub(r'[^a-z0-9_-]+', '-', name.strip().lower()).strip('-')[:MAX_NAME_LENGTH]
+    return slug or DEFAULT_PLAYER
+
+
+def shard_path(player: str, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, player_id(player) + SHARD_SUFFIX)
+
+
+def open_shard(player: str, data_dir: str = DATA_DIR) -> HistoryStore:
+    """The loaded history store of one player, created empty for a new player."""
+    os.makedirs(data_dir, exist_ok=True)
+    store = HistoryStore(shard_path(player, data_dir))
+    store.load()
+    return store
+
+
+def play_round(store: HistoryStore, opponent: Opponent, player_choice: str, strategy: str = DEFAULT_STRATEGY):
+    """
+    Plays one round against the opponent and saves it to the player's shard.
+    Returns (computer choice, result, updated summary).
+    """
+    computer_choice = opponent.choose(strategy)
+    result = determine_winner(player_choice, computer_choice)
+    opponent.learn(player_choice)
+    # The store numbers the round and updates the running score totals with it
+    summary = store.append({"Player": player_choice, "Computer": computer_choice, "Result": result})
+    return computer_choice, result, summary
+
+
+class OpenShards:
+    """
+    Open history stores of at most `limit` players, least recently used first.
+    Opening one more closes the oldest; a closed store reopens its files on
+    its next use, so a session still holding one keeps working.
+    """
+
+    def __init__(self, limit: int, data_dir: str = DATA_DIR):
+        self.limit, self.data_dir = limit, data_dir
+        self._stores = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, player: str) -> HistoryStore:
+        player = player_id(player)
+        with self._lock:
+            store = self._stores.get(player)
+            if store is not None:
+                self._stores.move_to_end(player)
+                return store
+            store = self._stores[player] = open_shard(player, self.data_dir)
+            while len(self._stores) > self.limit:
+                _, evicted = self._stores.popitem(last=False)
+                evicted.close()
+            return store
+
+    def close(self):
+        with self._lock:
+            while self._stores:
+                self._stores.popitem()[1].close()
+
+
+def migrate_shared_history(data_dir: str = DATA_DIR, shared_path: str = HISTORY_FILE,
+                           legacy_path: str = LEGACY_FILE) -> bool:
+    """
+    Moves the single shared history of earlier versions into DEFAULT_PLAYER's
+    shard, unless that shard already exists. Returns whether anything moved.
+    """
+    target = shard_path(DEFAULT_PLAYER, data_dir)
+    if os.path.exists(target):
+        return False
+    os.makedirs(data_dir, exist_ok=True)
+    if os.path.exists(shared_path):
+        # Sidecars first: a crash part-way leaves the log behind, and the
+        # shard's sidecars are rebuilt from it on the next try.
+        for suffix in SIDECAR_SUFFIXES:
+            if os.path.exists(shared_path + suffix):
+                os.replace(shared_path + suffix, target + suffix)
+        os.replace(shared_path, target)
+        return True
+    return migrate_legacy(HistoryStore(target), legacy_path) > 0
+
+
+def leaderboard(data_dir: str = DATA_DIR, limit: int = None):
+    """Players ranked by wins, then win rate, from their shards' summary files."""
+    try:
+        names = [name for name in os.listdir(data_dir) if name.endswith(SUMMARY_SUFFIX)]
+    except FileNotFoundError:
+        return []
+    rows = []
+    for name in names:
+        try:
+            with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not summary.get('rounds'):
+            continue
+        rows.append({
+            'Player': name[:-len(SUMMARY_SUFFIX)],
+            'Rounds': summary['rounds'],
+            'Wins': summary['wins'],
+            'Losses': summary['losses'],
+            'Ties': summary['ties'],
+            'Win rate': round(summary['wins'] / summary['rounds'], 3),
+        })
+    rows.sort(key=lambda row: (-row['Wins'], -row['Win rate'], row['Player']))
+    return rows[:limit] if limit else rows
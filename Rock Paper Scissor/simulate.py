@@ -0,0 +1,347 @@
+# simulate.py
+#
+# Headless strategy tournaments, no Streamlit needed:
+#
+#   python simulate.py                                   # every bot against every other
+#   python simulate.py --bots ensemble,markov1,rock_heavy --games 2000 --rounds 500
+#   python simulate.py --json results.json --workers 4
+#
+# Moves are the numbers 0-2 from game_logic, and each round is resolved by
+# indexing game_logic.OUTCOME, the same table determine_winner uses. A match
+# plays many independent games at once: each bot keeps its state as arrays with
+# one row per game, so a round of every game is a handful of NumPy operations.
+# The learning bots mirror the strategies in game_logic (same decay, same
+# predict-then-counter rule), written against arrays instead of one game.
+# parity_check() feeds both the same fixed moves with the same tie-breaking
+# and compares every move they make; a tournament does not start unless
+# they agree.
+#
+# Matches of a round-robin tournament run in a process pool. Each cell of the
+# result matrix is the row bot's win rate against the column bot, with a 95%
+# Wilson score interval over all rounds played.
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+
+from game_logic import (CHOICES, DECAY, MOVE_INDEX, OUTCOME, EnsembleStrategy, FrequencyStrategy,
+                        MarkovStrategy)
+
+OUTCOME_TABLE = np.array(OUTCOME, dtype=np.int8)
+Z_95 = 1.959964
+
+
+def counter(moves: np.ndarray) -> np.ndarray:
+    """The move that beats each move."""
+    return (moves + 1) % 3
+
+
+# --- BOTS ---
+class Bot:
+    """Plays `games` games at once; move() returns one move per game, observe() learns from a round."""
+
+    def __init__(self, games: int, rng: np.random.Generator):
+        self.games, self.rng = games, rng
+
+    def predict(self) -> np.ndarray:
+        """The opponent's expected move in each game, or -1 where there is no guess yet."""
+        return np.full(self.games, -1, dtype=np.int64)
+
+    def move(self) -> np.ndarray:
+        predicted = self.predict()
+        return np.where(predicted < 0, self.rng.integers(0, 3, self.games), counter(predicted))
+
+    def observe(self, own: np.ndarray, opponent: np.ndarray):
+        pass
+
+
+class RandomBot(Bot):
+    pass
+
+
+class BiasedBot(Bot):
+    """Plays Rock 60% of the time, like the players in our own game_data.json."""
+
+    weights = np.array([0.6, 0.2, 0.2])
+
+    def move(self):
+        return self.rng.choice(3, size=self.games, p=self.weights)
+
+
+class CycleBot(Bot):
+    """Rock, Paper, Scissors, Rock, ... from a random starting point per game."""
+
+    def __init__(self, games, rng):
+        super().__init__(games, rng)
+        self.next = rng.integers(0, 3, games)
+
+    def move(self):
+        return self.next
+
+    def observe(self, own, opponent):
+        self.next = (self.next + 1) % 3
+
+
+class BeatLastBot(Bot):
+    """Plays whatever would have beaten the opponent's previous move."""
+
+    def predict(self):
+        return getattr(self, 'last', super().predict())
+
+    def observe(self, own, opponent):
+        self.last = opponent
+
+
+def _likeliest(counts: np.ndarray, rng) -> np.ndarray:
+    """Row-wise argmax with random tie-breaking; -1 for rows with nothing counted."""
+    jitter = rng.random(counts.shape) * 1e-9
+    return np.where(counts.max(axis=1) > 0, np.argmax(counts + jitter, axis=1), -1)
+
+
+class FrequencyBot(Bot):
+    def __init__(self, games, rng):
+        super().__init__(games, rng)
+        self.counts = np.zeros((games, 3))
+
+    def predict(self):
+        return _likeliest(self.counts, self.rng)
+
+    def observe(self, own, opponent):
+        self.counts *= DECAY
+        self.counts[np.arange(self.games), opponent] += 1
+
+
+class MarkovBot(Bot):
+    """Order-k model of the opponent: a (games, 3**k, 3) table of decayed counts."""
+
+    def __init__(self, games, rng, order: int = 1):
+        super().__init__(games, rng)
+        self.order = order
+        self.table = np.zeros((games, 3 ** order, 3))
+        self.context = np.zeros(games, dtype=np.int64)
+        self.seen = 0
+        self.rows = np.arange(games)
+
+    def predict(self):
+        if self.seen < self.order:
+            return super().predict()
+        return _likeliest(self.table[self.rows, self.context], self.rng)
+
+    def observe(self, own, opponent):
+        if self.seen >= self.order:
+            self.table[self.rows, self.context] *= DECAY
+            self.table[self.rows, self.context, opponent] += 1
+        self.context = (self.context * 3 + opponent) % (3 ** self.order)
+        self.seen += 1
+
+
+class EnsembleBot(Bot):
+    """Scores its members on whether their move would have won, and plays the best one's move per game."""
+
+    def __init__(self, games, rng):
+        super().__init__(games, rng)
+        self.members = [RandomBot(games, rng), FrequencyBot(games, rng),
+                        MarkovBot(games, rng, 1), MarkovBot(games, rng, 2), MarkovBot(games, rng, 3)]
+        self.scores = np.zeros((games, len(self.members)))
+        self.rows = np.arange(games)
+
+    def move(self):
+        self.predictions = np.stack([member.predict() for member in self.members], axis=1)
+        random_moves = self.rng.integers(0, 3, (self.games, len(self.members)))
+        moves = np.where(self.predictions < 0, random_moves, counter(self.predictions))
+        return moves[self.rows, np.argmax(self.scores, axis=1)]
+
+    def observe(self, own, opponent):
+        would_play = counter(self.predictions)
+        rewards = np.where(self.predictions < 0, 0, OUTCOME_TABLE[would_play, opponent[:, None]])
+        self.scores = self.scores * DECAY + rewards
+        for member in self.members:
+            member.observe(own, opponent)
+
+
+BOTS = {
+    'random': RandomBot,
+    'rock_heavy': BiasedBot,
+    'cycle': CycleBot,
+    'beat_last': BeatLastBot,
+    'frequency': FrequencyBot,
+    'markov1': lambda games, rng: MarkovBot(games, rng, 1),
+    'markov2': lambda games, rng: MarkovBot(games, rng, 2),
+    'markov3': lambda games, rng: MarkovBot(games, rng, 3),
+    'ensemble': EnsembleBot,
+}
+
+
+# --- PARITY WITH game_logic ---
+# The game_logic strategy each learning bot mirrors.
+STRATEGIES = {
+    'frequency': FrequencyStrategy,
+    'markov1': lambda: MarkovStrategy(1),
+    'markov2': lambda: MarkovStrategy(2),
+    'markov3': lambda: MarkovStrategy(3),
+    'ensemble': EnsembleStrategy,
+}
+PARITY_ROUNDS = 2000
+
+
+class FirstChoice:
+    """
+    A stand-in random source that always takes the first option, for both
+    game_logic (choice) and the bots (random, integers), so ties are broken
+    the same way on both sides.
+    """
+
+    def choice(self, options):
+        return options[0]
+
+    def random(self, shape=None):
+        return np.zeros(shape)
+
+    def integers(self, low, high, size=None):
+        return np.full(size, low)
+
+
+def parity_check(rounds: int = PARITY_ROUNDS, seed: int = 0) -> dict:
+    """
+    Plays one game of the same `rounds` player moves (Rock-heavy, from `seed`)
+    against each learning bot and its game_logic strategy. Returns
+    {bot: first round where their moves differ}, empty when all agree.
+    """
+    moves = np.random.default_rng(seed).choice(3, size=rounds, p=[0.5, 0.25, 0.25])
+    first, mismatches = FirstChoice(), {}
+    for name, new_strategy in STRATEGIES.items():
+        strategy, bot = new_strategy(), BOTS[name](1, first)
+        for round_number, move in enumerate(moves, 1):
+            expected = MOVE_INDEX[strategy.choose(first)]
+            played = int(bot.move()[0])
+            if played != expected:
+                mismatches[name] = round_number
+                break
+            if isinstance(strategy, EnsembleStrategy):
+                strategy.update(CHOICES[move], first)
+            else:
+                strategy.update(CHOICES[move])
+            bot.observe(np.array([played]), np.array([move]))
+    return mismatches
+
+
+# --- MATCHES AND TOURNAMENTS ---
+def play_match(first: str, second: str, games: int, rounds: int, seed) -> dict:
+    """Plays `games` games of `rounds` rounds; counts are from the first bot's side."""
+    rng = np.random.default_rng(seed)
+    bot_a, bot_b = BOTS[first](games, rng), BOTS[second](games, rng)
+    wins = losses = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        move_a, move_b = bot_a.move(), bot_b.move()
+        outcome = OUTCOME_TABLE[move_a, move_b]
+        wins += int(np.count_nonzero(outcome == 1))
+        losses += int(np.count_nonzero(outcome == -1))
+        bot_a.observe(move_a, move_b)
+        bot_b.observe(move_b, move_a)
+    played = games * rounds
+    return {
+        'first': first, 'second': second, 'rounds': played,
+        'wins': wins, 'losses': losses, 'ties': played - wins - losses,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def wilson_interval(successes: int, trials: int, z: float = Z_95):
+    """
+    Wilson score interval for a proportion. Rounds within one game are not
+    fully independent for learning bots, so read it as a lower bound on the
+    true uncertainty.
+    """
+    if trials == 0:
+        return (0.0, 1.0)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return (max(0.0, centre - margin), min(1.0, centre + margin))
+
+
+def tournament(bots, games: int, rounds: int, workers: int = None, seed: int = 0) -> dict:
+    """Round-robin of every pair of bots (and each bot against itself), one match per process task."""
+    pairs = list(combinations(bots, 2)) + [(bot, bot) for bot in bots]
+    seeds = np.random.SeedSequence(seed).spawn(len(pairs))
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        matches = list(pool.map(play_match, *zip(*pairs), [games] * len(pairs), [rounds] * len(pairs), seeds))
+    elapsed = time.perf_counter() - started
+
+    matrix = {row: {} for row in bots}
+    for match in matches:
+        sides = [(match['first'], match['second'], match['wins'], match['losses'])]
+        if match['first'] != match['second']:
+            sides.append((match['second'], match['first'], match['losses'], match['wins']))
+        for row, column, wins, losses in sides:
+            low, high = wilson_interval(wins, match['rounds'])
+            matrix[row][column] = {
+                'win_rate': wins / match['rounds'], 'loss_rate': losses / match['rounds'],
+                'ci95': [low, high], 'net': (wins - losses) / match['rounds'],
+            }
+    total_rounds = sum(match['rounds'] for match in matches)
+    return {
+        'bots': list(bots), 'games': games, 'rounds_per_game': rounds, 'seed': seed,
+        'matrix': matrix, 'total_rounds': total_rounds, 'seconds': elapsed,
+        'rounds_per_second': total_rounds / elapsed if elapsed else None,
+    }
+
+
+def print_matrix(results: dict):
+    bots = results['bots']
+    width = max(len(bot) for bot in bots) + 2
+    print('Win rate of row vs column (95% CI)'.ljust(width))
+    print(' ' * width + ''.join(bot.rjust(22) for bot in bots))
+    for row in bots:
+        cells = []
+        for column in bots:
+            cell = results['matrix'][row][column]
+            low, high = cell['ci95']
+            cells.append(f"{cell['win_rate']:.3f} [{low:.3f},{high:.3f}]".rjust(22))
+        print(row.ljust(width) + ''.join(cells))
+    print(f"\n{results['total_rounds']:,} rounds in {results['seconds']:.1f}s "
+          f"({results['rounds_per_second']:,.0f} rounds/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a round-robin tournament between Rock Paper Scissors bots.')
+    parser.add_argument('--bots', default=','.join(BOTS), help=f'comma-separated, from: {", ".join(BOTS)}')
+    parser.add_argument('--games', type=int, default=1000, help='independent games per match, played in parallel')
+    parser.add_argument('--rounds', type=int, default=1000, help='rounds per game')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args(argv)
+
+    bots = [bot.strip() for bot in args.bots.split(',') if bot.strip()]
+    unknown = [bot for bot in bots if bot not in BOTS]
+    if unknown:
+        print(f"Error: unknown bots {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
+
+    mismatches = parity_check(seed=args.seed)
+    if mismatches:
+        for bot, round_number in mismatches.items():
+            print(f"🔴 {bot} no longer matches game_logic (first differs in round {round_number})", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ Learning bots match game_logic over {PARITY_ROUNDS} rounds", file=sys.stderr)
+
+    results = tournament(bots, args.games, args.rounds, args.workers, args.seed)
+    print_matrix(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+# config.py
+
+import os
+
+# --- STORAGE ---
+# Which task store the app runs against: 'firestore' (the default, needs
+# serviceAccountKey.json) or 'sqlite' (a local single-node database file).
+TASK_BACKEND = os.environ.get('TODO_BACKEND', 'firestore').lower()
+
+# Path of the database file used by the SQLite backend.
+SQLITE_PATH = os.environ.get('TODO_SQLITE_PATH', 'todos.db')
+
+# --- STARTUP ---
+# Connect to the backend and fill the task cache when the server starts,
+# before the first request, instead of on the first page load.
+PREWARM = os.environ.get('TODO_PREWARM', '').lower() in ('1', 'true', 'yes')
+
+# Run the due-date notifier inside the app, where it sees every write the UI
+# makes. Off by default; it starts once the backend has connected. Leave it
+# off when a separate notifier.py runs against Firestore.
+NOTIFIER = os.environ.get('TODO_NOTIFIER', '').lower() in ('1', 'true', 'yes')
@@ -0,0 +1,351 @@
+# fake_firestore.py
+#
+# An in-memory stand-in for the part of the Firestore client that
+# firebase_backend uses, so the Firestore code path runs with no project,
+# credentials or network (the load test uses it):
+#
+#   import fake_firestore
+#   fake_firestore.install(latency=0.005)   # before firebase_backend is imported
+#
+# install() registers fake firebase_admin and google.cloud.firestore_v1 modules.
+# Collections support add/document/where/order_by/start_after/limit/stream and
+# on_snapshot; documents support get/set/update/delete; batches are atomic.
+# Queries follow Firestore's ordering (nulls first, ties broken by document id,
+# in the direction of the last order_by). Every call that would be a network
+# round trip sleeps for `latency` seconds, so the cost of talking to a real
+# Firestore can be approximated. Snapshot listeners are called on the writing
+# thread once the write has been applied.
+
+import copy
+import secrets
+import string
+import sys
+import threading
+import time
+import types
+from datetime import datetime, timezone
+
+ID_ALPHABET = string.ascii_letters + string.digits
+SERVER_TIMESTAMP = object()
+_OPERATORS = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a is not None and b is not None and a < b,
+    '<=': lambda a, b: a is not None and b is not None and a <= b,
+    '>': lambda a, b: a is not None and b is not None and a > b,
+    '>=': lambda a, b: a is not None and b is not None and a >= b,
+}
+
+
+class NotFound(Exception):
+    """Raised when updating a document that does not exist, like google.api_core.exceptions.NotFound."""
+
+
+class Query:
+    ASCENDING = 'ASCENDING'
+    DESCENDING = 'DESCENDING'
+
+    def __init__(self, collection, filters=(), orders=(), cursor=None, limit=None):
+        self._collection = collection
+        self._filters, self._orders, self._cursor, self._limit = tuple(filters), tuple(orders), cursor, limit
+
+    def _copy(self, **changes):
+        fields = {'filters': self._filters, 'orders': self._orders, 'cursor': self._cursor, 'limit': self._limit}
+        fields.update(changes)
+        return Query(self._collection, **fields)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        if op_string not in _OPERATORS:
+            raise ValueError(f"Operator '{op_string}' is not supported by the fake Firestore")
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=ASCENDING):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def start_after(self, snapshot):
+        return self._copy(cursor=snapshot)
+
+    def limit(self, count: int):
+        return self._copy(limit=count)
+
+    def _matches(self, data) -> bool:
+        return all(field in data and _OPERATORS[op](data[field], value) for field, op, value in self._filters)
+
+    def _sort_key(self, doc_id, data):
+        # Firestore leaves out documents missing an ordered field and sorts nulls first.
+        return tuple((data[field] is not None, data[field]) for field, _ in self._orders) + (doc_id,)
+
+    def _run(self):
+        """Matching (id, data) pairs in query order; data are the stored dicts, which snapshots copy on to_dict()."""
+        store = self._collection._store
+        with store.lock:
+            docs = [(doc_id, data) for doc_id, data in store.collection(self._collection.id).items()
+                    if self._matches(data) and all(field in data for field, _ in self._orders)]
+        # Stored dicts are replaced on every write, never changed in place, so
+        # they can be sorted and read here without holding the lock.
+        descending = bool(self._orders) and self._orders[-1][1] == Query.DESCENDING
+        # Sort by each order field from the last to the first, so earlier fields take precedence.
+        docs.sort(key=lambda item: item[0], reverse=descending)
+        for position in reversed(range(len(self._orders))):
+            field, direction = self._orders[position]
+            docs.sort(key=lambda item: (item[1][field] is not None, item[1][field]),
+                      reverse=direction == Query.DESCENDING)
+        if self._cursor is not None and self._cursor.exists:
+            cursor_data = self._cursor.to_dict()
+            if all(field in cursor_data for field, _ in self._orders):
+                cursor = self._sort_key(self._cursor.id, cursor_data)
+                for index, (doc_id, data) in enumerate(docs):
+                    if self._after(self._sort_key(doc_id, data), cursor):
+                        docs = docs[index:]
+                        break
+                else:
+                    docs = []
+        if self._limit is not None:
+            docs = docs[:self._limit]
+        return docs
+
+    def _after(self, key, cursor) -> bool:
+        """Whether a sort key comes after the cursor's in this query's order."""
+        directions = [direction for _, direction in self._orders]
+        directions.append(directions[-1] if directions else Query.ASCENDING)
+        for value, cursor_value, direction in zip(key, cursor, directions):
+            if value != cursor_value:
+                return (value > cursor_value) == (direction == Query.ASCENDING)
+        return False
+
+    def stream(self):
+        self._collection._store.round_trip()
+        return iter([DocumentSnapshot(doc_id, data) for doc_id, data in self._run()])
+
+    def get(self):
+        return list(self.stream())
+
+    def on_snapshot(self, callback):
+        return self._collection._store.watch(self, callback)
+
+
+class CollectionReference(Query):
+    def __init__(self, store, collection_id: str):
+        self._store = store
+        self.id = collection_id
+        super().__init__(self)
+
+    def document(self, document_id: str = None):
+        return DocumentReference(self, document_id or ''.join(secrets.choice(ID_ALPHABET) for _ in range(20)))
+
+    def add(self, data: dict):
+        doc_ref = self.document()
+        doc_ref.set(data)
+        return self._store.now(), doc_ref
+
+
+class DocumentReference:
+    def __init__(self, collection: CollectionReference, document_id: str):
+        self._collection, self.id = collection, document_id
+
+    @property
+    def _store(self):
+        return self._collection._store
+
+    def get(self):
+        self._store.round_trip()
+        with self._store.lock:
+            return DocumentSnapshot(self.id, self._store.collection(self._collection.id).get(self.id))
+
+    def set(self, data: dict):
+        self._store.commit([('set', self, data)])
+
+    def update(self, data: dict):
+        self._store.commit([('update', self, data)])
+
+    def delete(self):
+        self._store.commit([('delete', self, None)])
+
+
+class DocumentSnapshot:
+    def __init__(self, document_id: str, data):
+        self.id, self._data = document_id, data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+
+class WriteBatch:
+    def __init__(self, store):
+        self._store, self._writes = store, []
+
+    def set(self, doc_ref, data):
+        self._writes.append(('set', doc_ref, data))
+
+    def update(self, doc_ref, data):
+        self._writes.append(('update', doc_ref, data))
+
+    def delete(self, doc_ref):
+        self._writes.append(('delete', doc_ref, None))
+
+    def commit(self):
+        self._store.commit(self._writes)
+        self._writes = []
+
+
+ChangeType = types.SimpleNamespace(ADDED=types.SimpleNamespace(name='ADDED'),
+                                   MODIFIED=types.SimpleNamespace(name='MODIFIED'),
+                                   REMOVED=types.SimpleNamespace(name='REMOVED'))
+
+
+class DocumentChange:
+    def __init__(self, change_type, document: DocumentSnapshot):
+        self.type, self.document = change_type, document
+
+
+class Watch:
+    def __init__(self, store, query, callback):
+        self._store, self.query, self.callback = store, query, callback
+
+    def unsubscribe(self):
+        self._store.unwatch(self)
+
+
+class FakeFirestore:
+    """The whole database: collections of documents, shared by every client created by install()."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.lock = threading.RLock()
+        self._collections = {}
+        self._watches = []
+        # Snapshot callbacks run one write at a time, in commit order.
+        self._notify_lock = threading.Lock()
+
+    def collection(self, collection_id: str) -> dict:
+        return self._collections.setdefault(collection_id, {})
+
+    def now(self):
+        return datetime.now(timezone.utc)
+
+    def round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def commit(self, writes):
+        """Applies writes atomically: all of them, or none if an update targets a missing document."""
+        self.round_trip()
+        with self._notify_lock:
+            with self.lock:
+                for op, doc_ref, _ in writes:
+                    if op == 'update' and doc_ref.id not in self.collection(doc_ref._collection.id):
+                        raise NotFound(f'No document to update: {doc_ref._collection.id}/{doc_ref.id}')
+                timestamp, touched = self.now(), {}
+                for op, doc_ref, data in writes:
+                    documents = self.collection(doc_ref._collection.id)
+                    key = (doc_ref._collection.id, doc_ref.id)
+                    touched.setdefault(key, documents.get(doc_ref.id))
+                    if op == 'delete':
+                        documents.pop(doc_ref.id, None)
+                        continue
+                    values = {field: timestamp if value is SERVER_TIMESTAMP else copy.deepcopy(value)
+                              for field, value in data.items()}
+                    if op == 'update':
+                        documents[doc_ref.id] = {**documents[doc_ref.id], **values}
+                    else:
+                        documents[doc_ref.id] = values
+                updates = [(watch, self._changes(watch.query, touched)) for watch in self._watches]
+            for watch, changes in updates:
+                if changes:
+                    watch.callback(None, changes, timestamp)
+
+    def _changes(self, query, touched):
+        changes = []
+        for (collection_id, doc_id), before in touched.items():
+            if collection_id != query._collection.id:
+                continue
+            after = self.collection(collection_id).get(doc_id)
+            was, now = before is not None and query._matches(before), after is not None and query._matches(after)
+            if now:
+                snapshot = DocumentSnapshot(doc_id, after)
+                changes.append(DocumentChange(ChangeType.MODIFIED if was else ChangeType.ADDED, snapshot))
+            elif was:
+                changes.append(DocumentChange(ChangeType.REMOVED, DocumentSnapshot(doc_id, before)))
+        return changes
+
+    def watch(self, query, callback) -> Watch:
+        watch = Watch(self, query, callback)
+        with self._notify_lock:
+            with self.lock:
+                self._watches.append(watch)
+                initial = [DocumentChange(ChangeType.ADDED, DocumentSnapshot(doc_id, data)) for doc_id, data in query._run()]
+            callback(None, initial, self.now())
+        return watch
+
+    def unwatch(self, watch: Watch):
+        with self.lock:
+            if watch in self._watches:
+                self._watches.remove(watch)
+
+
+class Client:
+    def __init__(self, store: FakeFirestore):
+        self._store = store
+
+    def collection(self, collection_id: str) -> CollectionReference:
+        return CollectionReference(self._store, collection_id)
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self._store)
+
+
+class FieldFilter:
+    def __init__(self, field_path: str, op_string: str, value):
+        self.field_path, self.op_string, self.value = field_path, op_string, value
+
+
+def install(latency: float = 0.0) -> FakeFirestore:
+    """
+    Registers fake firebase_admin and google.cloud.firestore_v1 modules backed
+    by a new, empty FakeFirestore, and returns it. Call before importing
+    firebase_backend; if it is already imported, its client is reset.
+    """
+    store = FakeFirestore(latency)
+
+    firestore = types.ModuleType('firebase_admin.firestore')
+    firestore.SERVER_TIMESTAMP = SERVER_TIMESTAMP
+    firestore.Query = Query
+    firestore.client = lambda app=None: Client(store)
+
+    credentials = types.ModuleType('firebase_admin.credentials')
+    credentials.Certificate = lambda path: path
+
+    firebase_admin = types.ModuleType('firebase_admin')
+    firebase_admin._apps = {}
+    firebase_admin.initialize_app = lambda credential=None, options=None, name='[DEFAULT]': \
+        firebase_admin._apps.setdefault(name, credential)
+    firebase_admin.credentials, firebase_admin.firestore = credentials, firestore
+
+    base_query = types.ModuleType('google.cloud.firestore_v1.base_query')
+    base_query.FieldFilter = FieldFilter
+
+    modules = {
+        'firebase_admin': firebase_admin,
+        'firebase_admin.credentials': credentials,
+        'firebase_admin.firestore': firestore,
+        'google.cloud.firestore_v1.base_query': base_query,
+    }
+    for name in ('google', 'google.cloud', 'google.cloud.firestore_v1'):
+        if name not in sys.modules:
+            package = types.ModuleType(name)
+            package.__path__ = []
+            modules[name] = package
+    sys.modules.update(modules)
+
+    backend = sys.modules.get('firebase_backend')
+    if backend is not None:
+        backend.firebase_admin, backend.credentials, backend.firestore = firebase_admin, credentials, firestore
+        backend.FieldFilter = FieldFilter
+        backend._db = backend._tasks_ref = None
+    return store
@@ -2,21 +2,41 @@
 
 import firebase_admin
 from firebase_admin import credentials, firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
 from datetime import datetime
+import threading
+from metrics import backend_phase_seconds, timed
+from startup_profile import phase as startup_phase
 
 # --- SETUP ---
-# Make sure your serviceAccountKey.json is in the same directory
-try:
-    cred = credentials.Certificate('serviceAccountKey.json')
-    # Prevent re-initializing the app which causes an error
-    if not firebase_admin._apps:
-        firebase_admin.initialize_app(cred)
-except Exception as e:
-    print(f"🔴 Could not initialize Firebase. Make sure 'serviceAccountKey.json' is correct. Error: {e}")
+# Firebase is initialised on first use rather than at import, so importing this
+# module (e.g. in NiceGUI's reload watcher) costs nothing and needs no
+# credentials. Every page then shares the one client.
+_client_lock = threading.Lock()
+_db = None
+_tasks_ref = None
 
-db = firestore.client()
-# Make sure this collection name matches what you have in your Firestore database.
-tasks_ref = db.collection('todos') 
+
+def connect():
+    """Initialises Firebase and the Firestore client once, and returns the 'todos' collection."""
+    global _db, _tasks_ref
+    if _tasks_ref is None:
+        with _client_lock:
+            if _tasks_ref is None:
+                with startup_phase('firebase_init'):
+                    # Make sure your serviceAccountKey.json is in the same directory
+                    try:
+                        cred = credentials.Certificate('serviceAccountKey.json')
+                        # Prevent re-initializing the app which causes an error
+                        if not firebase_admin._apps:
+                            firebase_admin.initialize_app(cred)
+                    except Exception as e:
+                        print(f"🔴 Could not initialize Firebase. Make sure 'serviceAccountKey.json' is correct. Error: {e}")
+
+                    _db = firestore.client()
+                    # Make sure this collection name matches what you have in your Firestore database.
+                    _tasks_ref = _db.collection('todos')
+    return _tasks_ref
 
 
 # --- CORRECTED FUNCTION ---
@@ -25,29 +45,134 @@ tasks_ref = db.collection('todos')
 def add_task(text: str, due_date=None):
     """
     Adds a new task to the 'todos' collection.
-    Now correctly accepts an optional due_date.
+    Now correctly accepts an optional due_date, and returns the new task's id.
     """
     if text.strip():
-        tasks_ref.add({
+        _, doc_ref = connect().add({
             'text': text,
             'completed': False,
             'created_at': firestore.SERVER_TIMESTAMP, # This is a great way to set the time!
             'due_date': due_date, # This now works because due_date is a parameter
             'notified': False # Added for the external notifier concept
         })
+        return doc_ref.id
 
 
 def update_task(task_id: str, data: dict):
     """Updates an existing task document."""
-    tasks_ref.document(task_id).update(data)
+    connect().document(task_id).update(data)
 
 
 def delete_task(task_id: str):
     """Deletes a task document by its ID."""
-    tasks_ref.document(task_id).delete()
+    connect().document(task_id).delete()
+
+
+# --- BATCHED WRITES ---
+# Firestore rejects a WriteBatch with more than 500 operations.
+MAX_BATCH_SIZE = 500
+
+
+def new_task_id() -> str:
+    """Reserves a document id so a task can be shown before it is written."""
+    return connect().document().id
+
+
+def commit_batch(ops):
+    """
+    Commits [(op, task_id, data)] writes as one atomic WriteBatch. op is 'add'
+    (data holds 'text' and 'due_date'), 'set' (data is a whole task, written
+    as-is), 'update' (data holds the changed fields) or 'delete' (data is
+    ignored).
+    """
+    if len(ops) > MAX_BATCH_SIZE:
+        raise ValueError(f"A batch holds at most {MAX_BATCH_SIZE} writes, got {len(ops)}")
+    tasks_ref = connect()
+    batch = _db.batch()
+    for op, task_id, data in ops:
+        doc_ref = tasks_ref.document(task_id)
+        if op == 'add':
+            batch.set(doc_ref, {
+                'text': data['text'],
+                'completed': False,
+                'created_at': firestore.SERVER_TIMESTAMP,
+                'due_date': data.get('due_date'),
+                'notified': False,
+            })
+        elif op == 'set':
+            batch.set(doc_ref, {**data, 'created_at': data.get('created_at') or firestore.SERVER_TIMESTAMP})
+        elif op == 'update':
+            batch.update(doc_ref, data)
+        elif op == 'delete':
+            batch.delete(doc_ref)
+        else:
+            raise ValueError(f"Unknown write operation '{op}'")
+    batch.commit()
+
+
+# Sort keys understood by get_tasks, mapped to Firestore field names.
+# Firestore sorts a null due date before every date, which the SQLite backend
+# and task_views.sort_key_for follow.
+SORT_FIELDS = {'created_at': 'created_at', 'due_date': 'due_date', 'text': 'text'}
+
 
+def _filtered(status=None, notified=None, due_after=None, due_before=None):
+    """Builds the query for the filters shared by get_tasks and watch_tasks."""
+    query = connect()
+    if status is not None:
+        query = query.where(filter=FieldFilter('completed', '==', status == 'completed'))
+    if notified is not None:
+        query = query.where(filter=FieldFilter('notified', '==', notified))
+    if due_after is not None:
+        query = query.where(filter=FieldFilter('due_date', '>=', due_after))
+    if due_before is not None:
+        query = query.where(filter=FieldFilter('due_date', '<=', due_before))
+    return query
+
+
+def get_tasks(status=None, notified=None, due_after=None, due_before=None, sort_by='created_at',
+              direction='desc', page_size=None, start_after=None):
+    """
+    Retrieves tasks as (task_id, task_data) pairs, letting Firestore do the work.
+    The arguments are described on task_storage.TaskBackend.get_tasks.
+
+    Combining a filter with a sort field needs a composite index, which
+    Firestore offers to create from the error message on first use.
+    """
+    query = _filtered(status=status, notified=notified, due_after=due_after, due_before=due_before)
+    firestore_direction = firestore.Query.ASCENDING if direction == 'asc' else firestore.Query.DESCENDING
+    query = query.order_by(SORT_FIELDS[sort_by], direction=firestore_direction)
+
+    if start_after is not None:
+        cursor = connect().document(start_after).get()
+        if cursor.exists:
+            query = query.start_after(cursor)
+    if page_size is not None:
+        query = query.limit(page_size)
+
+    # Timed separately so slow refreshes can be pinned on the network or on decoding.
+    with timed(backend_phase_seconds, phase='firestore_query'):
+        docs = list(query.stream())
+    with timed(backend_phase_seconds, phase='to_dict'):
+        return [(doc.id, doc.to_dict()) for doc in docs]
+
+
+# Firestore change types, mapped to the names shared by every backend.
+_CHANGE_TYPES = {'ADDED': 'added', 'MODIFIED': 'modified', 'REMOVED': 'removed'}
+
+
+def watch_tasks(on_changes, status=None, notified=None):
+    """
+    Calls on_changes with [(change_type, task_id, task_data)] from a Firestore
+    snapshot listener on the tasks matching the filters; the first call
+    delivers every match as 'added'. Returns a function that stops watching.
+    """
+    def on_snapshot(col_snapshot, changes, read_time):
+        on_changes([
+            (_CHANGE_TYPES[change.type.name], change.document.id,
+             None if change.type.name == 'REMOVED' else change.document.to_dict())
+            for change in changes
+        ])
 
-def get_tasks():
-    """Retrieves all tasks, ordered by creation date."""
-    # This correctly returns a list of DocumentSnapshot objects that main.py can use.
-    return list(tasks_ref.order_by('created_at', direction=firestore.Query.DESCENDING).stream())
\ No newline at end of file
+    watch = _filtered(status=status, notified=notified).on_snapshot(on_snapshot)
+    return watch.unsubscribe
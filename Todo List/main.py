@@ -1,7 +1,24 @@
-from nicegui import ui
+import startup_profile # Imported first so the startup clock starts before the heavy imports.
+from time import perf_counter
+
+with startup_profile.phase('import_nicegui'):
+    from nicegui import app, ui, run
+    from fastapi.responses import PlainTextResponse
+import asyncio
 from functools import partial
-from firebase_backend import add_task, update_task, delete_task, get_tasks
+from bisect import bisect_left, insort
+with startup_profile.phase('import_task_storage'):
+    import config
+    from task_storage import (
+        get_backend, get_tasks, start_task_cache, cache_version, new_task_id, prewarm,
+        add_task_async, update_task_async, delete_task_async, update_tasks_async, delete_tasks_async,
+        PartialWriteError,
+    )
+    from notifier import DueDateNotifier
+    from search_index import match_score
+    from task_views import fetch_page, matches_status, misordered, search_view, sort_key_for
 from datetime import datetime, timezone, time
+from metrics import card_render_seconds, render_prometheus, render_seconds, timed
 
 # Add custom styles for an attractive UI
 ui.add_head_html('''
@@ -32,84 +49,305 @@ ui.add_head_html('''
 </style>
 ''')
 
+# Number of task cards fetched and rendered per page of the infinite list.
+PAGE_SIZE = 25
+
+# Seconds of typing pause before the search box runs a search.
+SEARCH_DEBOUNCE = 0.25
+
+
+class KeyedTaskList:
+    """
+    Keeps one card per task id inside a container, ordered by a sort key.
+    Changing a task rebuilds only that card and moves it if its position
+    changed, so the work and the websocket traffic per update grow with the
+    size of the change rather than the length of the list.
+    """
+
+    def __init__(self, container, build_card, empty_label):
+        self.container = container
+        self.build_card = build_card
+        self.empty_label = empty_label
+        self.tasks = {}
+        self.cards = {}
+        self.sort_key = None
+        self.descending = False
+        self._keys = [] # Ascending (sort value, task_id) of every card.
+
+    def reset(self, sort_key, descending: bool):
+        """Removes every card and sets the order for the cards added next."""
+        self.container.clear()
+        self.tasks.clear()
+        self.cards.clear()
+        self._keys.clear()
+        self.sort_key, self.descending = sort_key, descending
+
+    def _key(self, task_id: str, task_data: dict):
+        return (self.sort_key((task_id, task_data)), task_id)
+
+    def _place(self, task_id: str, key, appended: bool = False):
+        """Inserts a key and moves the card to its position in the container."""
+        insort(self._keys, key)
+        position = bisect_left(self._keys, key)
+        if self.descending:
+            position = len(self._keys) - 1 - position
+        # Pages arrive in sort order, so new cards usually already sit at the end.
+        if not (appended and position == len(self._keys) - 1):
+            self.cards[task_id].move(target_index=position)
+
+    def upsert(self, task_id: str, task_data: dict):
+        """Adds a card for a new task, or patches the card of a changed one."""
+        if task_id in self.cards:
+            old_data = self.tasks[task_id]
+            if old_data == task_data:
+                return
+            card = self.cards[task_id]
+            card.clear()
+            with card, timed(card_render_seconds, action='patch'):
+                self.build_card(task_id, task_data)
+            self.tasks[task_id] = task_data
+            old_key, new_key = self._key(task_id, old_data), self._key(task_id, task_data)
+            if old_key != new_key:
+                self._keys.pop(bisect_left(self._keys, old_key))
+                self._place(task_id, new_key)
+        else:
+            with self.container:
+                card = ui.card().classes('w-full task-card').props('flat bordered')
+            with card, timed(card_render_seconds, action='create'):
+                self.build_card(task_id, task_data)
+            self.cards[task_id] = card
+            self.tasks[task_id] = task_data
+            self._place(task_id, self._key(task_id, task_data), appended=True)
+        self.empty_label.visible = False
+
+    def remove(self, task_id: str):
+        """Removes a task's card, if it is shown."""
+        if task_id not in self.cards:
+            return
+        self._keys.pop(bisect_left(self._keys, self._key(task_id, self.tasks.pop(task_id))))
+        self.container.remove(self.cards.pop(task_id))
+        self.empty_label.visible = not self.cards
+
+@app.get('/metrics')
+def metrics_endpoint():
+    """Backend and rendering metrics in the Prometheus text format."""
+    return PlainTextResponse(render_prometheus(), media_type='text/plain; version=0.0.4')
+
+
+async def prewarm_backend():
+    """Opens the backend connection and primes the task cache before the first request."""
+    try:
+        await run.io_bound(prewarm)
+    except Exception as e:
+        print(f"🔴 Pre-warm failed, the first page will connect instead: {e}")
+
+if config.PREWARM:
+    app.on_startup(prewarm_backend)
+
+
+# The due-date notifier runs in the server process, so it is told about every
+# write the UI makes, whichever backend is in use.
+notifier_task = None
+
+async def start_notifier():
+    """Starts the notifier once the backend connects; without a backend it would only fail and retry."""
+    global notifier_task
+    try:
+        await run.io_bound(lambda: get_backend().connect())
+    except Exception as e:
+        print(f"🔴 Due-date notifier not started, the backend did not connect: {e}")
+        return
+    notifier_task = asyncio.create_task(DueDateNotifier().run())
+
+async def stop_notifier():
+    if notifier_task is not None:
+        notifier_task.cancel()
+
+if config.NOTIFIER:
+    app.on_startup(start_notifier)
+    app.on_shutdown(stop_notifier)
+else:
+    print("ℹ️ Due-date notifier is off; set TODO_NOTIFIER=1 to run it inside the app.")
+
+
 @ui.page('/')
 async def main():
+    page_started = perf_counter()
     # --- State Management & Component References ---
-    app_state = {'task_container': None, 'loading_spinner': None}
-    search_input, sort_by_select, sort_direction_select = None, None, None
+    # `task_list` keeps the loaded tasks and their cards, keyed by task id, so
+    # handlers can patch it optimistically without refetching.
+    app_state = {
+        'task_list': None, 'loading_spinner': None, 'cache_version': None,
+        'cursor': None, 'exhausted': False, 'loading': None, 'search_results': None, 'search_scores': {},
+        'search_term': '', 'search_sort': None, 'search_offset': 0, 'generation': 0, 'search_timer': None,
+    }
+    search_input, sort_by_select, sort_direction_select, status_select = None, None, None, None
 
     # --- Core Logic Functions ---
+    def list_sort_key(sort_by: str):
+        """The card order for a sort field; relevance follows the scores of the latest search."""
+        if sort_by == 'relevance':
+            return lambda item: app_state['search_scores'].get(item[0], 0.0)
+        return sort_key_for(sort_by)
+
+    def schedule_search():
+        """Debounces typing: each keystroke restarts a short timer before searching."""
+        if app_state['search_timer'] is not None:
+            app_state['search_timer'].cancel()
+        app_state['search_timer'] = ui.timer(SEARCH_DEBOUNCE, refresh_tasks, once=True)
+
     async def refresh_tasks():
-        """Clears and reloads all tasks, applying current search and sort settings."""
-        if not app_state['task_container']: return
-        
+        """Clears the list and loads the first page for the current search, filter and sort."""
+        if not app_state['task_list']: return
+
+        # Each refresh gets a generation number; results of an older refresh
+        # that finish late are dropped, so a stale query never wins.
+        app_state['generation'] += 1
+        generation = app_state['generation']
+
+        search_term = search_input.value.strip().lower() if search_input.value else ''
+        sort_by = sort_by_select.value
+        if sort_by == 'relevance' and not search_term:
+            sort_by = 'created_at'
+
+        with timed(render_seconds, phase='clear'):
+            app_state['task_list'].reset(list_sort_key(sort_by), descending=(sort_direction_select.value == 'desc'))
+        app_state.update({'cursor': None, 'exhausted': False, 'search_results': None, 'search_scores': {},
+                          'search_term': search_term, 'search_sort': sort_by, 'search_offset': 0})
+
+        if search_term:
+            # Searching needs every task's text, so it runs against the live cache.
+            try:
+                await run.io_bound(start_task_cache)
+                if generation != app_state['generation']: return
+                app_state['cache_version'] = cache_version()
+                with timed(render_seconds, phase='search'):
+                    app_state['search_results'], app_state['search_scores'] = search_cached_tasks(search_term, sort_by)
+            except Exception as e:
+                ui.notify(f'Error loading tasks: {e}', color='negative')
+                print(f"Error in refresh_tasks: {e}")
+                return
+
+        await load_next_page()
+        if generation == app_state['generation']:
+            app_state['task_list'].empty_label.visible = not app_state['task_list'].tasks
+
+    def search_cached_tasks(search_term: str, sort_by: str):
+        """The matches of a search term under the current status filter and direction, and their scores."""
+        return search_view(search_term, status_select.value, sort_by, sort_direction_select.value)
+
+    def in_view(task_data: dict) -> bool:
+        """Whether a task belongs in the list under the current status filter and search."""
+        if not matches_status(task_data, status_select.value):
+            return False
+        return app_state['search_results'] is None or match_score(app_state['search_term'], task_data.get('text', '')) > 0
+
+    async def load_next_page():
+        """Appends the next page of tasks, from the backend or from the current search results."""
+        generation = app_state['generation']
+        if app_state['exhausted'] or app_state['loading'] == generation: return
+
+        app_state['loading'] = generation
         app_state['loading_spinner'].visible = True
-        app_state['task_container'].clear()
-        
         try:
-            search_term = search_input.value.strip().lower() if search_input.value else ''
-            all_tasks = get_tasks()
-            
-            filtered_tasks = [(t.id, t.to_dict()) for t in all_tasks if search_term in t.to_dict().get('text', '').lower()]
-            
-            sort_by = sort_by_select.value
-            direction = sort_direction_select.value
-            is_reversed = (direction == 'desc')
-
-            if sort_by == 'Alphabetical':
-                sort_key = lambda item: item[1].get('text', '').lower()
-            elif sort_by == 'Due Date':
-                sort_key = lambda item: item[1].get('due_date') or datetime.max.replace(tzinfo=timezone.utc)
-            else: # Default to 'Creation Date'
-                sort_key = lambda item: item[1].get('created_at') or datetime.min.replace(tzinfo=timezone.utc)
-
-            filtered_tasks.sort(key=sort_key, reverse=is_reversed)
-            
-            with app_state['task_container']:
-                if not filtered_tasks:
-                    ui.label('No tasks found.').classes('text-gray-500 text-center py-8')
-                else:
-                    for task_id, task_data in filtered_tasks:
-                        display_task(task_id, task_data)
+            if app_state['search_results'] is not None:
+                # Cards added or removed optimistically do not shift the offset into the results.
+                start = app_state['search_offset']
+                page = app_state['search_results'][start:start + PAGE_SIZE]
+                app_state['search_offset'] = start + len(page)
+            else:
+                with timed(render_seconds, phase='fetch'):
+                    page = await run.io_bound(fetch_page, status_select.value, sort_by_select.value,
+                                              sort_direction_select.value, PAGE_SIZE, app_state['cursor'])
+                if generation != app_state['generation']: return
+                out_of_order = misordered(page, sort_by_select.value, sort_direction_select.value)
+                if out_of_order:
+                    print(f"⚠️ The backend returned {len(out_of_order)} task(s) out of the list's sort order, e.g. {out_of_order[0]}")
+
+            if len(page) < PAGE_SIZE:
+                app_state['exhausted'] = True
+            if page:
+                app_state['cursor'] = page[-1][0]
+            with timed(render_seconds, phase='render_page'):
+                for task_id, task_data in page:
+                    app_state['task_list'].upsert(task_id, task_data)
         except Exception as e:
             ui.notify(f'Error loading tasks: {e}', color='negative')
-            print(f"Error in refresh_tasks: {e}")
+            print(f"Error in load_next_page: {e}")
         finally:
-            app_state['loading_spinner'].visible = False
+            if app_state['loading'] == generation:
+                app_state['loading'] = None
+                app_state['loading_spinner'].visible = False
+
+    async def handle_scroll(event):
+        """Loads more tasks once the list is scrolled close to its end."""
+        if event.vertical_percentage > 0.9:
+            await load_next_page()
 
-    def display_task(task_id: str, task_data: dict):
-        """Renders a single task card in the UI."""
+    async def apply_optimistically(changes: dict, write, error_message: str) -> bool:
+        """
+        Shows {task_id: task_data or None} changes right away, then awaits the
+        write and restores the previous tasks whose writes failed.
+        """
+        task_list = app_state['task_list']
+        previous = {task_id: task_list.tasks.get(task_id) for task_id in changes}
+        patch_tasks(changes)
+        try:
+            await write
+            return True
+        except Exception as e:
+            if isinstance(e, PartialWriteError):
+                # Part of a bulk write committed; keep those tasks as written.
+                previous = {task_id: previous[task_id] for task_id in e.task_ids if task_id in previous}
+            patch_tasks(previous)
+            ui.notify(f'{error_message}: {e}', color='negative')
+            return False
+
+    def patch_tasks(changes: dict):
+        """
+        Applies {task_id: task_data or None} to the keyed task list. A task that
+        does not match the status filter or the search is taken off the list
+        instead of shown.
+        """
+        task_list = app_state['task_list']
+        for task_id, task_data in changes.items():
+            if task_data is None or not in_view(task_data):
+                task_list.remove(task_id)
+                continue
+            if app_state['search_results'] is not None and task_id not in task_list.tasks:
+                # Ranked by its own text until the next search scores it from the cache.
+                app_state['search_scores'][task_id] = match_score(app_state['search_term'], task_data.get('text', ''))
+            task_list.upsert(task_id, task_data)
+
+    def build_card(task_id: str, task_data: dict):
+        """Renders the contents of a single task card."""
         text, completed = task_data.get('text', ''), task_data.get('completed', False)
         current_status = 'Completed' if completed else 'Pending'
         due_date = task_data.get('due_date')
         
-        with app_state['task_container']:
-            with ui.card().classes('w-full task-card').props('flat bordered'):
-                with ui.row().classes('items-center justify-between w-full'):
-                    label_class = 'line-through text-gray-500' if completed else ''
-                    ui.label(text).classes(f'text-sm {label_class} flex-1')
-                    
-                    with ui.row().classes('items-center gap-2'):
-                        if due_date:
-                            is_overdue = not completed and due_date.astimezone() < datetime.now().astimezone()
-                            color = 'text-red-500' if is_overdue else 'text-gray-500'
-                            with ui.row().classes('items-center gap-1'):
-                                ui.icon('event', color='red-5' if is_overdue else 'gray-5').classes('text-sm')
-                                ui.label(due_date.astimezone().strftime("%b %d, %I:%M %p")).classes(f'text-xs {color}')
-                        
-                        ui.select(options=['Pending', 'Completed'], value=current_status, on_change=lambda e: handle_status_change(task_id, e)).props('dense outlined').classes('w-32')
-                        
-                        with ui.button(icon='edit', on_click=lambda: show_edit_dialog(task_id, task_data)).props('flat round color=primary'): ui.tooltip('Edit Task')
-                        with ui.button(icon='delete', on_click=lambda: show_delete_dialog(task_id, text)).props('flat round color=negative'): ui.tooltip('Delete Task')
+        with ui.row().classes('items-center justify-between w-full'):
+            label_class = 'line-through text-gray-500' if completed else ''
+            ui.label(text).classes(f'text-sm {label_class} flex-1')
+            
+            with ui.row().classes('items-center gap-2'):
+                if due_date:
+                    is_overdue = not completed and due_date.astimezone() < datetime.now().astimezone()
+                    color = 'text-red-500' if is_overdue else 'text-gray-500'
+                    with ui.row().classes('items-center gap-1'):
+                        ui.icon('event', color='red-5' if is_overdue else 'gray-5').classes('text-sm')
+                        ui.label(due_date.astimezone().strftime("%b %d, %I:%M %p")).classes(f'text-xs {color}')
+                
+                ui.select(options=['Pending', 'Completed'], value=current_status, on_change=lambda e: handle_status_change(task_id, e)).props('dense outlined').classes('w-32')
+                
+                with ui.button(icon='edit', on_click=lambda: show_edit_dialog(task_id, task_data)).props('flat round color=primary'): ui.tooltip('Edit Task')
+                with ui.button(icon='delete', on_click=lambda: show_delete_dialog(task_id, text)).props('flat round color=negative'): ui.tooltip('Delete Task')
 
     # --- Handlers that interact with the backend ---
     async def handle_status_change(task_id: str, event):
-        try:
-            update_task(task_id, {'completed': (event.value == 'Completed')})
+        update = {'completed': (event.value == 'Completed')}
+        task_data = {**app_state['task_list'].tasks.get(task_id, {}), **update}
+        if await apply_optimistically({task_id: task_data}, update_task_async(task_id, update), 'Error updating task'):
             ui.notify('Task status updated', color='positive')
-            await refresh_tasks()
-        except Exception as e:
-            ui.notify(f'Error updating task: {e}', color='negative')
 
     def show_edit_dialog(task_id: str, task_data: dict):
         with ui.dialog() as dialog, ui.card().classes('p-4 min-w-[400px]'):
@@ -137,13 +375,11 @@ async def main():
                 if new_due < datetime.now().astimezone():
                     ui.notify('Due date cannot be in the past.', color='negative'); return
 
-                try:
-                    update_task(task_id, {'text': edit_text.value.strip(), 'due_date': new_due})
+                update = {'text': edit_text.value.strip(), 'due_date': new_due}
+                edited = {**app_state['task_list'].tasks.get(task_id, task_data), **update}
+                dialog.close()
+                if await apply_optimistically({task_id: edited}, update_task_async(task_id, update), 'Error updating task'):
                     ui.notify('Task updated successfully', color='positive')
-                    await refresh_tasks()
-                    dialog.close()
-                except Exception as e:
-                    ui.notify(f'Error updating task: {e}', color='negative')
 
             with ui.row().classes('gap-2 mt-4'):
                 ui.button('Save', on_click=save_edit); ui.button('Cancel', on_click=dialog.close)
@@ -154,17 +390,31 @@ async def main():
             ui.label(f'Delete Task: "{text}"?').classes('text-lg font-bold')
             with ui.row().classes('gap-2 mt-4'):
                 async def delete_confirmed():
-                    try:
-                        delete_task(task_id)
+                    dialog.close()
+                    if await apply_optimistically({task_id: None}, delete_task_async(task_id), 'Error deleting task'):
                         ui.notify('🗑️ Task deleted', color='warning')
-                        await refresh_tasks()
-                    except Exception as e:
-                        ui.notify(f'Error deleting task: {e}', color='negative')
-                    finally:
-                        dialog.close()
                 ui.button('Delete', on_click=delete_confirmed, color='red'); ui.button('Cancel', on_click=dialog.close)
         await dialog
 
+    async def handle_bulk_update(status: str, update: dict = None):
+        """Completes or deletes every task with a status, as a single batch of writes."""
+        try:
+            task_ids = [task_id for task_id, _ in await run.io_bound(get_tasks, status=status)]
+        except Exception as e:
+            ui.notify(f'Error loading tasks: {e}', color='negative'); return
+        if not task_ids:
+            ui.notify(f'No {status} tasks.', color='info'); return
+
+        if update is None:
+            changes = {task_id: None for task_id in task_ids}
+            write = delete_tasks_async(task_ids)
+        else:
+            loaded = app_state['task_list'].tasks
+            changes = {task_id: {**loaded[task_id], **update} for task_id in task_ids if task_id in loaded}
+            write = update_tasks_async(task_ids, update)
+        if await apply_optimistically(changes, write, 'Error updating tasks'):
+            ui.notify(f"{len(task_ids)} tasks {'deleted' if update is None else 'updated'}", color='positive')
+
     # --- UI LAYOUT ---
     with ui.column().classes('items-center w-full min-h-screen p-4 sm:p-8'):
         with ui.card().classes('glass-card max-w-2xl w-full p-6 sm:p-8 rounded-2xl'):
@@ -195,13 +445,17 @@ async def main():
                     if due_datetime < datetime.now().astimezone():
                         ui.notify('Due date cannot be in the past.', color='negative'); return
 
+                    text = new_task_input.value.strip()
+                    # The first id can mean connecting to the backend, so it is reserved off the event loop.
                     try:
-                        add_task(new_task_input.value.strip(), due_date=due_datetime)
-                        ui.notify('Task added successfully', color='positive')
-                        new_task_input.value, due_date_input.value, due_time_input.value = '', None, None
-                        await refresh_tasks()
+                        task_id = await run.io_bound(new_task_id)
                     except Exception as e:
-                        ui.notify(f'Error adding task: {e}', color='negative')
+                        ui.notify(f'Error adding task: {e}', color='negative'); return
+                    task_data = {'text': text, 'completed': False, 'created_at': datetime.now(timezone.utc), 'due_date': due_datetime, 'notified': False}
+                    new_task_input.value, due_date_input.value, due_time_input.value = '', None, None
+                    write = add_task_async(text, due_date=due_datetime, task_id=task_id)
+                    if await apply_optimistically({task_id: task_data}, write, 'Error adding task'):
+                        ui.notify('Task added successfully', color='positive')
 
                 add_button = ui.button('Add Task', on_click=handle_add_task).props('color=primary rounded-lg w-full')
 
@@ -212,12 +466,17 @@ async def main():
                 # REQUIREMENT: Search on type by adding on_change event
                 search_input = ui.input(
                     placeholder='Search tasks...'
-                ).props('outlined dense clearable').classes('w-full').on('update:model-value', refresh_tasks)
+                ).props('outlined dense clearable').classes('w-full').on('update:model-value', schedule_search)
 
                 with ui.row().classes('w-full items-center gap-2'):
+                    status_select = ui.select(
+                        options={'all': 'All', 'pending': 'Pending', 'completed': 'Completed'},
+                        value='all', label='Show'
+                    ).props('dense outlined').classes('flex-grow')
+
                     sort_by_select = ui.select(
-                        options=['Creation Date', 'Due Date', 'Alphabetical'], 
-                        value='Creation Date', label='Sort by'
+                        options={'created_at': 'Creation Date', 'due_date': 'Due Date', 'text': 'Alphabetical', 'relevance': 'Relevance'},
+                        value='created_at', label='Sort by'
                     ).props('dense outlined').classes('flex-grow')
                     
                     sort_direction_select = ui.select(
@@ -226,13 +485,54 @@ async def main():
                     ).props('dense outlined').classes('flex-grow')
 
                     ui.button('Apply Sort', on_click=refresh_tasks).props('color=primary h-[40px]')
+
+                with ui.row().classes('w-full justify-end gap-2'):
+                    ui.button('Complete All', icon='done_all', on_click=lambda: handle_bulk_update('pending', {'completed': True})).props('flat dense color=primary')
+                    ui.button('Delete Completed', icon='delete_sweep', on_click=lambda: handle_bulk_update('completed')).props('flat dense color=negative')
             
             # --- Task Display Area ---
+            # Pages are appended as the scroll area nears its end, so first paint
+            # only costs one page regardless of how many tasks exist.
+            with ui.scroll_area(on_scroll=handle_scroll).classes('w-full h-[60vh]'):
+                empty_label = ui.label('No tasks found.').classes('w-full text-gray-500 text-center py-8')
+                empty_label.visible = False
+                app_state['task_list'] = KeyedTaskList(ui.column().classes('w-full gap-3'), build_card, empty_label)
             app_state['loading_spinner'] = ui.spinner(size='lg', color='primary').classes('my-4 self-center')
-            app_state['task_container'] = ui.column().classes('w-full gap-3')
 
     # Initial load of tasks after the UI is built
     await refresh_tasks()
+    startup_profile.first_page_rendered(perf_counter() - page_started)
+
+    def refresh_if_changed():
+        """
+        Re-runs an active search when the live cache has received changes from
+        any client, and patches only the cards whose match changed. The list
+        keeps showing as many results as were loaded.
+        """
+        if app_state['search_results'] is None or app_state['cache_version'] == cache_version():
+            return
+        version = cache_version()
+        task_list = app_state['task_list']
+        with timed(render_seconds, phase='search'):
+            results, scores = search_cached_tasks(app_state['search_term'], app_state['search_sort'])
+        if app_state['search_sort'] == 'relevance':
+            # A card's place comes from its score, so cards whose score changed
+            # are taken out under the old scores and put back under the new.
+            for task_id in [task_id for task_id in task_list.tasks if scores.get(task_id) != app_state['search_scores'].get(task_id)]:
+                task_list.remove(task_id)
+        app_state['search_scores'] = scores
+
+        shown = dict(results[:max(app_state['search_offset'], PAGE_SIZE)])
+        with timed(render_seconds, phase='render_page'):
+            for task_id in [task_id for task_id in task_list.tasks if task_id not in shown]:
+                task_list.remove(task_id)
+            for task_id, task_data in shown.items():
+                task_list.upsert(task_id, task_data)
+        app_state.update({'search_results': results, 'search_offset': len(shown), 'cache_version': version,
+                          'exhausted': len(shown) >= len(results)})
+        task_list.empty_label.visible = not task_list.tasks
+
+    ui.timer(1.0, refresh_if_changed)
 
 if __name__ in {"__main__", "__mp_main__"}:
     ui.run(port=8081, reload=True, title="To-Do App")
\ No newline at end of file
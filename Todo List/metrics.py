@@ -0,0 +1,151 @@
+# metrics.py
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Calls slower than this many milliseconds are printed; unset to turn off.
+SLOW_CALL_MS = float(os.environ['TODO_SLOW_CALL_MS']) if os.environ.get('TODO_SLOW_CALL_MS') else None
+
+# Latency buckets in seconds, from a cached read to a slow network round trip.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Buckets for how many documents a single call read.
+COUNT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+
+_registry = []
+_lock = threading.Lock()
+
+
+def _format_labels(labels: tuple) -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Counter:
+    """A monotonically increasing value per label set."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help_text = name, help_text
+        self._values = {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} counter'
+        for labels, value in sorted(self._values.items()):
+            yield f'{self.name}{_format_labels(labels)} {value}'
+
+
+class Gauge:
+    """A value per label set that can go up and down."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help_text = name, help_text
+        self._values = {}
+        _registry.append(self)
+
+    def set(self, value: float, **labels):
+        with _lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} gauge'
+        for labels, value in sorted(self._values.items()):
+            yield f'{self.name}{_format_labels(labels)} {value}'
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set, as Prometheus expects."""
+
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name, self.help_text, self.buckets = name, help_text, tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, series in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, series):
+                yield f'{self.name}_bucket{_format_labels(labels + (("le", bound),))} {count}'
+            yield f'{self.name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {series[-1]}'
+            yield f'{self.name}_sum{_format_labels(labels)} {series[-2]}'
+            yield f'{self.name}_count{_format_labels(labels)} {series[-1]}'
+
+
+def render_prometheus() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    with _lock:
+        lines = [line for metric in _registry for line in metric.render()]
+    return '\n'.join(lines) + '\n'
+
+
+# --- TODO APP METRICS ---
+backend_call_seconds = Histogram('todo_backend_call_seconds', 'Latency of task backend calls.')
+backend_call_errors = Counter('todo_backend_call_errors_total', 'Task backend calls that raised.')
+backend_documents_read = Histogram('todo_backend_documents_read', 'Tasks returned by a single backend call.', COUNT_BUCKETS)
+backend_phase_seconds = Histogram('todo_backend_phase_seconds', 'Time spent in phases of a backend call, e.g. query vs decoding.')
+render_seconds = Histogram('todo_render_seconds', 'Time spent in phases of refreshing the task list.')
+card_render_seconds = Histogram('todo_card_render_seconds', 'Time to build or patch a single task card.')
+startup_seconds = Gauge('todo_startup_seconds', 'Seconds each startup phase took, and time to the first rendered page.')
+
+
+def _log_if_slow(operation: str, seconds: float, detail: str = ''):
+    if SLOW_CALL_MS is not None and seconds * 1000 >= SLOW_CALL_MS:
+        print(f"🐢 Slow call: {operation} took {seconds * 1000:.1f} ms{detail}")
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    """Observes how long the block took in the given histogram."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+def instrumented(operation: str):
+    """
+    Records latency and errors of a backend call, and how many tasks it
+    returned when the result is a list. Slow calls are logged when
+    TODO_SLOW_CALL_MS is set.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                backend_call_errors.inc(operation=operation)
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                backend_call_seconds.observe(elapsed, operation=operation)
+            detail = ''
+            if isinstance(result, list):
+                backend_documents_read.observe(len(result), operation=operation)
+                detail = f' and read {len(result)} tasks'
+            _log_if_slow(operation, elapsed, detail)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,161 @@
+# notifier.py
+#
+# Runs inside the app when TODO_NOTIFIER is set (main.py starts it once the
+# backend connects, see config.NOTIFIER), so it sees every write the UI
+# makes. Run it on its own only with the Firestore backend, whose snapshot
+# listener reports writes from every process; the SQLite backend only
+# reports this process's writes.
+
+import asyncio
+import heapq
+import itertools
+import time
+
+import config
+from task_storage import update_tasks_async, watch_tasks
+
+# Seconds to wait after the first notification fires before marking the
+# batch as notified, so tasks due together share one batched write.
+FLUSH_DELAY = 1.0
+# A failed write is retried after FLUSH_DELAY, doubling up to this many seconds.
+MAX_FLUSH_DELAY = 60.0
+
+
+def _timestamp(due_date) -> float:
+    return due_date.timestamp()
+
+
+class DueDateNotifier:
+    """
+    Notifies about pending tasks when their due date arrives, then sets their
+    `notified` flag. Pending due dates live in a min-heap, so the service
+    sleeps until the earliest deadline instead of polling every task, and a
+    changed due date is rescheduled in O(log n).
+
+    The schedule is built from a single watch on pending, not-yet-notified
+    tasks: its first delivery is the indexed query that rebuilds the heap on
+    restart, and later deliveries add, move or drop individual tasks.
+    """
+
+    def __init__(self, on_due=None):
+        self.on_due = on_due or self.print_notification
+        self._heap = []             # (due timestamp, sequence, task_id); stale entries are skipped
+        self._due_at = {}           # task_id -> due timestamp of its live heap entry
+        self._tasks = {}            # task_id -> task_data for scheduled tasks
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._to_mark = set()       # fired task ids waiting for their notified flag
+        self._marking = set()       # fired task ids whose notified flag is being written
+        self._flush_task = None
+        self._loop = None
+        self._stop_watching = None
+
+    @staticmethod
+    def print_notification(task_id: str, task_data: dict):
+        due = task_data['due_date'].astimezone().strftime('%b %d, %I:%M %p')
+        print(f"🔔 Task due: {task_data.get('text', '')} ({due})")
+
+    # --- Schedule maintenance ---
+    def schedule(self, task_id: str, task_data: dict):
+        """Adds a task to the heap, or moves it if its due date changed."""
+        due_date = task_data.get('due_date')
+        if task_id in self._to_mark or task_id in self._marking:
+            return # Already fired; its notified flag is about to be written.
+        if due_date is None:
+            self.unschedule(task_id)
+            return
+        self._tasks[task_id] = task_data
+        due_at = _timestamp(due_date)
+        if self._due_at.get(task_id) == due_at:
+            return
+        earliest = self._heap[0][0] if self._heap else None
+        self._due_at[task_id] = due_at
+        heapq.heappush(self._heap, (due_at, next(self._sequence), task_id))
+        if earliest is None or due_at < earliest:
+            self._wakeup.set()
+
+    def unschedule(self, task_id: str):
+        """Forgets a task; its heap entry is dropped lazily when it surfaces."""
+        self._due_at.pop(task_id, None)
+        self._tasks.pop(task_id, None)
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._due_at):
+            # Mostly stale entries: rebuild so the heap stays proportional to the schedule.
+            self._heap = [entry for entry in self._heap if self._due_at.get(entry[2]) == entry[0]]
+            heapq.heapify(self._heap)
+
+    def _apply_changes(self, changes):
+        for change_type, task_id, task_data in changes:
+            if change_type == 'removed':
+                self.unschedule(task_id)
+                # Deleted or completed: there is nothing left to mark.
+                self._to_mark.discard(task_id)
+                self._marking.discard(task_id)
+            else:
+                self.schedule(task_id, task_data)
+
+    def _on_changes(self, changes):
+        # Watchers call back from backend threads; hand the changes to the loop.
+        self._loop.call_soon_threadsafe(self._apply_changes, changes)
+
+    # --- Firing ---
+    def _pop_due(self, now: float):
+        """Pops every task whose deadline has passed."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, _, task_id = heapq.heappop(self._heap)
+            if self._due_at.get(task_id) != due_at:
+                continue
+            del self._due_at[task_id]
+            due.append((task_id, self._tasks.pop(task_id)))
+        return due
+
+    async def _flush(self):
+        """Writes the notified flags, putting the ids back and retrying with backoff if the write fails."""
+        delay = FLUSH_DELAY
+        while self._to_mark:
+            await asyncio.sleep(delay)
+            self._marking, self._to_mark = self._to_mark, set()
+            try:
+                await update_tasks_async(list(self._marking), {'notified': True})
+                delay = FLUSH_DELAY
+            except Exception as e:
+                delay = min(delay * 2, MAX_FLUSH_DELAY)
+                print(f"🔴 Could not mark {len(self._marking)} tasks as notified, retrying in {delay:g}s: {e}")
+                self._to_mark |= self._marking
+            finally:
+                self._marking = set()
+
+    async def run(self):
+        """Runs until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._stop_watching = await self._loop.run_in_executor(
+            None, lambda: watch_tasks(self._on_changes, status='pending', notified=False))
+        try:
+            while True:
+                self._wakeup.clear()
+                for task_id, task_data in self._pop_due(time.time()):
+                    try:
+                        self.on_due(task_id, task_data)
+                    except Exception as e:
+                        print(f"🔴 Notification for task {task_id} failed: {e}")
+                    self._to_mark.add(task_id)
+                if self._to_mark and (self._flush_task is None or self._flush_task.done()):
+                    self._flush_task = asyncio.create_task(self._flush())
+
+                timeout = max(0.0, self._heap[0][0] - time.time()) if self._heap else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._stop_watching()
+
+
+if __name__ == '__main__':
+    if config.TASK_BACKEND == 'sqlite':
+        raise SystemExit('⚠️ With the SQLite backend the notifier runs inside the app; set TODO_NOTIFIER=1 and start main.py.')
+    print('⏰ Due-date notifier running. Press Ctrl+C to stop.')
+    try:
+        asyncio.run(DueDateNotifier().run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,145 @@
+# search_index.py
+
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+# Words are runs of letters and digits, compared in lower case.
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+# Scores for the ways a query word can match a word in a task's text.
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+SUBSTRING_SCORE = 1.5
+FUZZY_SCORE = 1.0
+
+# Minimum trigram similarity for a misspelt word to count as a fuzzy match.
+FUZZY_THRESHOLD = 0.4
+
+
+def tokenize(text: str):
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def trigrams(word: str):
+    """Trigrams of a word padded so that its start and end count too."""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TaskSearchIndex:
+    """
+    An inverted index from words to task ids, plus a trigram index over the
+    distinct words so partial and misspelt query words can still be matched.
+    Tasks are added, updated and removed one at a time, so keeping the index
+    current costs only as much as the text that changed.
+    """
+
+    def __init__(self):
+        self._words_of = {}                     # task_id -> set of words in its text
+        self._postings = defaultdict(set)       # word -> task ids containing it
+        self._trigram_words = defaultdict(set)  # trigram -> words containing it
+        self._vocabulary = []                   # every indexed word, sorted for prefix lookups
+
+    def __len__(self):
+        return len(self._words_of)
+
+    def set(self, task_id: str, text: str):
+        """Indexes a task's text, replacing whatever was indexed for it before."""
+        words = set(tokenize(text))
+        old_words = self._words_of.get(task_id, set())
+        for word in old_words - words:
+            self._unlink(task_id, word)
+        for word in words - old_words:
+            if word not in self._postings:
+                insort(self._vocabulary, word)
+                for trigram in trigrams(word):
+                    self._trigram_words[trigram].add(word)
+            self._postings[word].add(task_id)
+        self._words_of[task_id] = words
+
+    def remove(self, task_id: str):
+        for word in self._words_of.pop(task_id, set()):
+            self._unlink(task_id, word)
+
+    def clear(self):
+        self.__init__()
+
+    def _unlink(self, task_id: str, word: str):
+        postings = self._postings[word]
+        postings.discard(task_id)
+        if not postings:
+            del self._postings[word]
+            self._vocabulary.pop(bisect_left(self._vocabulary, word))
+            for trigram in trigrams(word):
+                self._trigram_words[trigram].discard(word)
+                if not self._trigram_words[trigram]:
+                    del self._trigram_words[trigram]
+
+    def _matches(self, query_word: str):
+        """Returns {indexed word: score} for every word a query word matches."""
+        matches = {}
+        if query_word in self._postings:
+            matches[query_word] = EXACT_SCORE
+
+        start = bisect_left(self._vocabulary, query_word)
+        for word in self._vocabulary[start:]:
+            if not word.startswith(query_word):
+                break
+            matches.setdefault(word, PREFIX_SCORE)
+
+        if len(query_word) < 3:
+            # Too short to share a trigram with anything: scan the vocabulary instead.
+            for word in self._vocabulary:
+                if word not in matches and query_word in word:
+                    matches[word] = SUBSTRING_SCORE
+        else:
+            query_trigrams = trigrams(query_word)
+            shared = defaultdict(int)
+            for trigram in query_trigrams:
+                for word in self._trigram_words.get(trigram, ()):
+                    shared[word] += 1
+            for word, count in shared.items():
+                if word in matches:
+                    continue
+                if query_word in word:
+                    matches[word] = SUBSTRING_SCORE
+                else:
+                    similarity = count / len(query_trigrams | trigrams(word))
+                    if similarity >= FUZZY_THRESHOLD:
+                        matches[word] = FUZZY_SCORE * similarity
+        return matches
+
+    def search(self, query: str, limit: int = None):
+        """
+        Returns [(task_id, score)], best first, for tasks that match every word
+        of the query exactly, by prefix, as a substring or fuzzily.
+        """
+        query_words = tokenize(query)
+        if not query_words:
+            return []
+
+        scores = None
+        for query_word in query_words:
+            word_scores = defaultdict(float)
+            for word, score in self._matches(query_word).items():
+                for task_id in self._postings[word]:
+                    if score > word_scores[task_id]:
+                        word_scores[task_id] = score
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {task_id: total + word_scores[task_id] for task_id, total in scores.items() if task_id in word_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit] if limit is not None else ranked
+
+
+def match_score(query: str, text: str) -> float:
+    """The score search() would give a task with this text for the query; 0.0 if it does not match."""
+    index = TaskSearchIndex()
+    index.set('', text)
+    ranked = index.search(query)
+    return ranked[0][1] if ranked else 0.0
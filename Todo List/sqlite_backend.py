@@ -0,0 +1,245 @@
+# sqlite_backend.py
+
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+
+import config
+
+# --- SETUP ---
+# One connection per thread; WAL mode lets readers keep going while a write
+# is in progress, which matters because NiceGUI runs queries in a thread pool.
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS todos (
+    id TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    due_date TEXT,
+    notified INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_todos_created_at ON todos (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_todos_due_date ON todos (IFNULL(due_date, ''), id);
+CREATE INDEX IF NOT EXISTS idx_todos_completed ON todos (completed, created_at);
+CREATE INDEX IF NOT EXISTS idx_todos_text ON todos (text COLLATE NOCASE, id);
+CREATE INDEX IF NOT EXISTS idx_todos_pending_due ON todos (completed, notified, IFNULL(due_date, ''), id);
+'''
+
+# Sort keys understood by get_tasks, mapped to the indexed SQL expressions.
+# Tasks without a due date sort first, as Firestore sorts nulls and as
+# task_views.sort_key_for orders the cards.
+SORT_FIELDS = {
+    'created_at': 'created_at',
+    'due_date': "IFNULL(due_date, '')",
+    'text': 'text COLLATE NOCASE',
+}
+
+# Columns that update_task is allowed to change.
+UPDATABLE_FIELDS = {'text', 'completed', 'due_date', 'notified'}
+
+_watchers = [] # (on_changes, filters) pairs registered through watch_tasks.
+
+
+def _connect() -> sqlite3.Connection:
+    """Returns this thread's connection, creating the schema on first use."""
+    global _schema_ready
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(config.SQLITE_PATH, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        _local.conn = conn
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                conn.executescript(SCHEMA)
+                _schema_ready = True
+    return conn
+
+
+def connect() -> sqlite3.Connection:
+    """Opens this thread's connection and makes sure the schema exists."""
+    return _connect()
+
+
+def _to_db(value):
+    """Stores datetimes as UTC ISO strings so they sort correctly as text."""
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat(timespec='microseconds')
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _to_task(row: sqlite3.Row) -> dict:
+    """Converts a row into the same task dict the Firestore backend returns."""
+    return {
+        'text': row['text'],
+        'completed': bool(row['completed']),
+        'created_at': datetime.fromisoformat(row['created_at']),
+        'due_date': datetime.fromisoformat(row['due_date']) if row['due_date'] else None,
+        'notified': bool(row['notified']),
+    }
+
+
+def _matches(task: dict, status=None, notified=None) -> bool:
+    if status is not None and task['completed'] != (status == 'completed'):
+        return False
+    return notified is None or task['notified'] == notified
+
+
+def _notify(changes):
+    """Passes changes to each watcher; a task that stops matching its filters is 'removed'."""
+    for on_changes, filters in list(_watchers):
+        on_changes([
+            change if change[0] == 'removed' or _matches(change[2], **filters) else ('removed', change[1], None)
+            for change in changes
+        ])
+
+
+# --- TASK OPERATIONS ---
+def add_task(text: str, due_date=None):
+    """Adds a new task and returns its id."""
+    if not text.strip():
+        return None
+    task_id = new_task_id()
+    commit_batch([('add', task_id, {'text': text, 'due_date': due_date})])
+    return task_id
+
+
+def update_task(task_id: str, data: dict):
+    """Updates an existing task."""
+    if data:
+        commit_batch([('update', task_id, data)])
+
+
+def delete_task(task_id: str):
+    """Deletes a task by its ID."""
+    commit_batch([('delete', task_id, None)])
+
+
+# --- BATCHED WRITES ---
+# Matches the Firestore limit so callers can chunk the same way for either backend.
+MAX_BATCH_SIZE = 500
+
+
+def new_task_id() -> str:
+    """Reserves an id so a task can be shown before it is written."""
+    return uuid.uuid4().hex
+
+
+def commit_batch(ops):
+    """Commits [(op, task_id, data)] writes in one transaction; see firebase_backend.commit_batch."""
+    if len(ops) > MAX_BATCH_SIZE:
+        raise ValueError(f"A batch holds at most {MAX_BATCH_SIZE} writes, got {len(ops)}")
+    changes = []
+    conn = _connect()
+    with conn:
+        for op, task_id, data in ops:
+            if op == 'add':
+                task = {
+                    'text': data['text'],
+                    'completed': False,
+                    'created_at': datetime.now(timezone.utc),
+                    'due_date': data.get('due_date'),
+                    'notified': False,
+                }
+                conn.execute(
+                    'INSERT INTO todos (id, text, completed, created_at, due_date, notified) VALUES (?, ?, ?, ?, ?, ?)',
+                    (task_id, *(_to_db(task[key]) for key in ('text', 'completed', 'created_at', 'due_date', 'notified'))),
+                )
+                changes.append(('added', task_id, task))
+            elif op == 'set':
+                task = {
+                    'text': data['text'],
+                    'completed': bool(data.get('completed', False)),
+                    'created_at': data.get('created_at') or datetime.now(timezone.utc),
+                    'due_date': data.get('due_date'),
+                    'notified': bool(data.get('notified', False)),
+                }
+                conn.execute(
+                    'INSERT OR REPLACE INTO todos (id, text, completed, created_at, due_date, notified) VALUES (?, ?, ?, ?, ?, ?)',
+                    (task_id, *(_to_db(task[key]) for key in ('text', 'completed', 'created_at', 'due_date', 'notified'))),
+                )
+                changes.append(('modified', task_id, task))
+            elif op == 'update':
+                unknown = set(data) - UPDATABLE_FIELDS
+                if unknown:
+                    raise ValueError(f"Cannot update task fields: {', '.join(sorted(unknown))}")
+                assignments = ', '.join(f'{field} = ?' for field in data)
+                cursor = conn.execute(f'UPDATE todos SET {assignments} WHERE id = ?', (*(_to_db(v) for v in data.values()), task_id))
+                if cursor.rowcount == 0:
+                    # Firestore fails a batch that updates a missing document; do the same.
+                    raise KeyError(f"No task with id '{task_id}'")
+                changes.append(('modified', task_id, None))
+            elif op == 'delete':
+                conn.execute('DELETE FROM todos WHERE id = ?', (task_id,))
+                changes.append(('removed', task_id, None))
+            else:
+                raise ValueError(f"Unknown write operation '{op}'")
+        # Watchers get the full task after the update, as with Firestore snapshots.
+        for index, (change_type, task_id, _) in enumerate(changes):
+            if change_type == 'modified':
+                row = conn.execute('SELECT * FROM todos WHERE id = ?', (task_id,)).fetchone()
+                changes[index] = (change_type, task_id, _to_task(row)) if row else ('removed', task_id, None)
+    _notify(changes)
+
+
+def get_tasks(status=None, notified=None, due_after=None, due_before=None, sort_by='created_at',
+              direction='desc', page_size=None, start_after=None):
+    """Retrieves tasks as (task_id, task_data) pairs; see task_storage.TaskBackend."""
+    sort_expr = SORT_FIELDS[sort_by]
+    order = 'ASC' if direction == 'asc' else 'DESC'
+    clauses, params = [], []
+
+    if status is not None:
+        clauses.append('completed = ?')
+        params.append(int(status == 'completed'))
+    if notified is not None:
+        clauses.append('notified = ?')
+        params.append(int(notified))
+    if due_after is not None:
+        clauses.append('due_date >= ?')
+        params.append(_to_db(due_after))
+    if due_before is not None:
+        clauses.append('due_date <= ?')
+        params.append(_to_db(due_before))
+
+    conn = _connect()
+    if start_after is not None:
+        # Keyset pagination on (sort value, id) so every page is an index seek.
+        cursor_row = conn.execute(f'SELECT {sort_expr} AS sort_value FROM todos WHERE id = ?', (start_after,)).fetchone()
+        if cursor_row is not None:
+            comparison = '>' if order == 'ASC' else '<'
+            clauses.append(f'({sort_expr}, id) {comparison} (?, ?)')
+            params.extend([cursor_row['sort_value'], start_after])
+
+    sql = 'SELECT * FROM todos'
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    sql += f' ORDER BY {sort_expr} {order}, id {order}'
+    if page_size is not None:
+        sql += ' LIMIT ?'
+        params.append(page_size)
+
+    return [(row['id'], _to_task(row)) for row in conn.execute(sql, params)]
+
+
+def watch_tasks(on_changes, status=None, notified=None):
+    """
+    Calls on_changes with [(change_type, task_id, task_data)] for every write
+    that touches a task matching the filters. The initial call delivers every
+    match as 'added'. Only writes made by this process are seen, which is the
+    single-node deployment this backend is meant for. Returns a function that
+    stops watching.
+    """
+    watcher = (on_changes, {'status': status, 'notified': notified})
+    _watchers.append(watcher)
+    on_changes([('added', task_id, task) for task_id, task in get_tasks(status=status, notified=notified)])
+    return lambda: _watchers.remove(watcher) if watcher in _watchers else None
@@ -0,0 +1,53 @@
+# startup_profile.py
+#
+# Cold-start profiling for the Todo app. main.py imports this module first so
+# its clock starts before the heavy imports, then wraps each startup step in
+# phase(). When the first page has rendered, the breakdown is printed, exposed
+# on /metrics as todo_startup_seconds and, if TODO_STARTUP_REPORT names a
+# file, written there as JSON so successive runs can be compared.
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from metrics import startup_seconds
+
+_started = time.perf_counter()
+_phases = {}
+_reported = False
+
+
+@contextmanager
+def phase(name: str):
+    """Records how long a startup step took; repeated names add up."""
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases[name] = _phases.get(name, 0.0) + time.perf_counter() - began
+
+
+def first_page_rendered(page_seconds: float):
+    """Call with a page's own render time once it has finished; only the first call reports."""
+    global _reported
+    if _reported:
+        return
+    _reported = True
+    _phases['first_page_render'] = page_seconds
+    report = {
+        'phases': {name: round(seconds, 4) for name, seconds in _phases.items()},
+        'time_to_first_page': round(time.perf_counter() - _started, 4),
+    }
+
+    for name, seconds in _phases.items():
+        startup_seconds.set(seconds, phase=name)
+    startup_seconds.set(report['time_to_first_page'], phase='first_page')
+
+    breakdown = ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in _phases.items())
+    print(f"⏱️ First page after {report['time_to_first_page'] * 1000:.0f} ms ({breakdown})")
+
+    report_path = os.environ.get('TODO_STARTUP_REPORT')
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,302 @@
+# task_storage.py
+
+import asyncio
+import importlib
+import threading
+from collections import deque
+from typing import Protocol
+
+import config
+from metrics import backend_documents_read, instrumented
+from startup_profile import phase as startup_phase
+from search_index import TaskSearchIndex
+
+# --- BACKEND INTERFACE ---
+class TaskBackend(Protocol):
+    """
+    The operations the Todo app needs from a task store. Each backend is a
+    module exposing these functions: firebase_backend (Firestore) and
+    sqlite_backend (a local database file).
+    """
+
+    def add_task(self, text: str, due_date=None):
+        """Adds a task and returns its id (None when the text is blank)."""
+
+    def update_task(self, task_id: str, data: dict):
+        """Updates the given fields of an existing task."""
+
+    def delete_task(self, task_id: str):
+        """Deletes a task by its id."""
+
+    def get_tasks(self, status=None, notified=None, due_after=None, due_before=None, sort_by='created_at',
+                  direction='desc', page_size=None, start_after=None):
+        """
+        Returns (task_id, task_data) pairs.
+
+        status:      'pending' or 'completed' to filter on the `completed` flag.
+        notified:    True or False to filter on the `notified` flag.
+        due_after / due_before: optional datetimes bounding `due_date` (inclusive).
+        sort_by:     'created_at', 'due_date' or 'text'; direction is 'asc' or 'desc'.
+        page_size:   maximum number of tasks to return (None returns every match).
+        start_after: the id of the last task of the previous page.
+        """
+
+    def connect(self):
+        """Opens the connection to the store; every other call does this on first use."""
+
+    MAX_BATCH_SIZE: int
+    """The most writes commit_batch accepts in one call."""
+
+    def new_task_id(self) -> str:
+        """Reserves an id so a task can be shown before it is written."""
+
+    def commit_batch(self, ops):
+        """
+        Atomically commits [(op, task_id, data)] writes, where op is 'add'
+        (data holds 'text' and 'due_date'), 'set' (data is a whole task,
+        written as-is and replacing any task with that id), 'update' (data
+        holds the changed fields) or 'delete'.
+        """
+
+    def watch_tasks(self, on_changes, status=None, notified=None):
+        """
+        Calls on_changes with [(change_type, task_id, task_data)] lists, where
+        change_type is 'added', 'modified' or 'removed', for the tasks matching
+        the optional status/notified filters. The first call delivers every
+        match; a task that stops matching is reported as 'removed'. Returns a
+        function that stops watching.
+        """
+
+
+# Backend names accepted in config.TASK_BACKEND, mapped to their modules.
+BACKENDS = {'firestore': 'firebase_backend', 'sqlite': 'sqlite_backend'}
+
+_backend = None
+
+
+def get_backend() -> TaskBackend:
+    """Imports the configured backend on first use, so unused ones never load."""
+    global _backend
+    if _backend is None:
+        if config.TASK_BACKEND not in BACKENDS:
+            raise ValueError(f"Unknown task backend '{config.TASK_BACKEND}'. Choose one of: {', '.join(BACKENDS)}")
+        with startup_phase('backend_import'):
+            _backend = importlib.import_module(BACKENDS[config.TASK_BACKEND])
+    return _backend
+
+
+def prewarm():
+    """Connects to the backend and fills the task cache ahead of the first request."""
+    with startup_phase('prewarm'):
+        get_backend().connect()
+        start_task_cache()
+
+
+@instrumented('add_task')
+def add_task(text: str, due_date=None):
+    return get_backend().add_task(text, due_date=due_date)
+
+
+@instrumented('update_task')
+def update_task(task_id: str, data: dict):
+    return get_backend().update_task(task_id, data)
+
+
+@instrumented('delete_task')
+def delete_task(task_id: str):
+    return get_backend().delete_task(task_id)
+
+
+@instrumented('get_tasks')
+def get_tasks(**query):
+    return get_backend().get_tasks(**query)
+
+
+def watch_tasks(on_changes, **filters):
+    return get_backend().watch_tasks(on_changes, **filters)
+
+
+# --- ASYNC WRITE PIPELINE ---
+class PartialWriteError(Exception):
+    """
+    Raised by a submit larger than one batch when a later batch fails after
+    earlier ones committed; task_ids are the tasks whose writes did not commit.
+    """
+
+    def __init__(self, error: Exception, task_ids):
+        super().__init__(str(error))
+        self.task_ids = task_ids
+
+
+class WritePipeline:
+    """
+    Runs task writes in an executor so they never block the event loop, and
+    coalesces writes submitted close together into one commit_batch call of
+    at most MAX_BATCH_SIZE writes. Each submit() resolves once its own writes
+    are committed and raises if they failed.
+    """
+
+    def __init__(self, linger: float = 0.02):
+        self.linger = linger
+        self._pending = deque()
+        self._flusher = None
+
+    async def submit(self, ops):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((list(ops), future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush())
+        await future
+
+    async def _flush(self):
+        # A short linger lets writes from a burst of clicks share one commit.
+        await asyncio.sleep(self.linger)
+        backend = get_backend()
+        while self._pending:
+            group, size = [], 0
+            while self._pending and (not group or size + len(self._pending[0][0]) <= backend.MAX_BATCH_SIZE):
+                ops, future = self._pending.popleft()
+                group.append((ops, future))
+                size += len(ops)
+            await self._commit(backend, group)
+
+    async def _commit(self, backend, group):
+        loop = asyncio.get_running_loop()
+        ops = [op for entry_ops, _ in group for op in entry_ops]
+        start = 0
+        try:
+            # Only a single bulk submit can exceed one batch; its chunks commit in order.
+            for start in range(0, len(ops), backend.MAX_BATCH_SIZE):
+                await loop.run_in_executor(None, _commit_batch, backend, ops[start:start + backend.MAX_BATCH_SIZE])
+        except Exception as e:
+            if len(group) > 1:
+                # One bad write fails the whole batch, so retry each submit on its
+                # own and let only the caller that caused the failure see it.
+                for entry in group:
+                    await self._commit(backend, [entry])
+                return
+            if start:
+                # The earlier batches stay written; only the rest failed.
+                e = PartialWriteError(e, [task_id for _, task_id, _ in ops[start:]])
+            if not group[0][1].done():
+                group[0][1].set_exception(e)
+            return
+        for _, future in group:
+            if not future.done():
+                future.set_result(None)
+
+
+@instrumented('commit_batch')
+def _commit_batch(backend, ops):
+    backend.commit_batch(ops)
+
+
+_pipeline = WritePipeline()
+
+
+def new_task_id() -> str:
+    return get_backend().new_task_id()
+
+
+async def add_task_async(text: str, due_date=None, task_id: str = None) -> str:
+    """Adds a task through the write pipeline and returns its id."""
+    if task_id is None:
+        task_id = await asyncio.get_running_loop().run_in_executor(None, new_task_id)
+    await _pipeline.submit([('add', task_id, {'text': text, 'due_date': due_date})])
+    return task_id
+
+
+async def update_task_async(task_id: str, data: dict):
+    await _pipeline.submit([('update', task_id, data)])
+
+
+async def delete_task_async(task_id: str):
+    await _pipeline.submit([('delete', task_id, None)])
+
+
+async def update_tasks_async(task_ids, data: dict):
+    """Applies the same update to many tasks in as few batches as possible."""
+    await _pipeline.submit([('update', task_id, data) for task_id in task_ids])
+
+
+async def delete_tasks_async(task_ids):
+    """Deletes many tasks in as few batches as possible."""
+    await _pipeline.submit([('delete', task_id, None) for task_id in task_ids])
+
+
+# --- LIVE TASK CACHE ---
+# A process-wide copy of every task. It is filled once by the backend's
+# watcher and then kept current by applying only the added, modified and
+# removed tasks, so searching and sorting never re-read the whole store.
+# The search index over task text is maintained from the same changes.
+_task_cache = {}
+_search_index = TaskSearchIndex()
+_cache_lock = threading.Lock()
+_cache_ready = threading.Event()
+_stop_watching = None
+_cache_version = 0
+
+
+def _apply_changes(changes):
+    """Applies a batch of changes from the backend's watcher to the cache."""
+    global _cache_version
+    backend_documents_read.observe(len(changes), operation='watch')
+    with _cache_lock:
+        for change_type, task_id, task_data in changes:
+            if change_type == 'removed':
+                _task_cache.pop(task_id, None)
+                _search_index.remove(task_id)
+            else:
+                _task_cache[task_id] = task_data
+                _search_index.set(task_id, task_data.get('text', ''))
+        _cache_version += 1
+    _cache_ready.set()
+
+
+def start_task_cache(timeout: float = 10.0):
+    """Starts watching the backend once and waits for the initial fill."""
+    global _stop_watching
+    with _cache_lock:
+        start = _stop_watching is None
+        if start:
+            _stop_watching = lambda: None
+    if start:
+        try:
+            _stop_watching = get_backend().watch_tasks(_apply_changes)
+        except Exception:
+            # Lets the next call try again instead of waiting on a watch that never started.
+            with _cache_lock:
+                _stop_watching = None
+            raise
+    _cache_ready.wait(timeout)
+
+
+def stop_task_cache():
+    """Stops watching the backend and empties the cache."""
+    global _stop_watching
+    with _cache_lock:
+        stop, _stop_watching = _stop_watching, None
+        _task_cache.clear()
+        _search_index.clear()
+    if stop is not None:
+        stop()
+    _cache_ready.clear()
+
+
+def get_cached_tasks():
+    """Returns (task_id, task_data) pairs from the live cache."""
+    start_task_cache()
+    with _cache_lock:
+        return list(_task_cache.items())
+
+
+def search_tasks(query: str, limit: int = None):
+    """Returns (task_id, task_data, score) for cached tasks matching a query, best first."""
+    start_task_cache()
+    with _cache_lock:
+        return [(task_id, _task_cache[task_id], score) for task_id, score in _search_index.search(query, limit)]
+
+
+def cache_version() -> int:
+    """A counter that increases every time the cache receives changes."""
+    return _cache_version
@@ -0,0 +1,74 @@
+# task_views.py
+#
+# What the task list shows for a status filter, sort and search term, with no
+# UI attached: main.py's refresh_tasks and load_next_page are built on these,
+# and the load test calls the same functions.
+#
+# A list without a search term is paged from the backend with keyset cursors;
+# a search runs against the live task cache and its search index, then is
+# filtered and sorted in memory.
+
+from datetime import datetime, timezone
+
+from task_storage import get_tasks, search_tasks
+
+# Status filter value that shows every task.
+ALL = 'all'
+
+
+def sort_key_for(sort_by: str, scores: dict = None):
+    """
+    Returns the key that orders (task_id, task_data) pairs by a sort field;
+    'relevance' needs the search scores. Tasks without a due date sort before
+    every dated task, as both backends order them.
+    """
+    if sort_by == 'relevance':
+        scores = scores or {}
+        return lambda item: scores.get(item[0], 0.0)
+    elif sort_by == 'text':
+        return lambda item: item[1].get('text', '').lower()
+    elif sort_by == 'due_date':
+        return lambda item: item[1].get('due_date') or datetime.min.replace(tzinfo=timezone.utc)
+    else: # Default to 'created_at'
+        return lambda item: item[1].get('created_at') or datetime.min.replace(tzinfo=timezone.utc)
+
+
+def matches_status(task_data: dict, status: str) -> bool:
+    return status == ALL or task_data.get('completed', False) == (status == 'completed')
+
+
+def fetch_page(status: str, sort_by: str, direction: str, page_size: int, start_after: str = None):
+    """One page of (task_id, task_data) from the backend, continuing after the task id `start_after`."""
+    return get_tasks(
+        status=None if status == ALL else status,
+        sort_by='created_at' if sort_by == 'relevance' else sort_by,
+        direction=direction,
+        page_size=page_size,
+        start_after=start_after,
+    )
+
+
+def misordered(page, sort_by: str, direction: str) -> list:
+    """
+    Ids in a page from fetch_page that sort_key_for, with ties broken by task
+    id, would place before the task above them. The list renders a page in
+    the order it was fetched only if this is empty.
+    """
+    key = sort_key_for('created_at' if sort_by == 'relevance' else sort_by)
+    keys = [(key(item), item[0]) for item in page]
+    if direction == 'desc':
+        return [page[i][0] for i in range(1, len(keys)) if keys[i] > keys[i - 1]]
+    return [page[i][0] for i in range(1, len(keys)) if keys[i] < keys[i - 1]]
+
+
+def search_view(search_term: str, status: str, sort_by: str, direction: str):
+    """
+    Looks a search term up in the task search index, then filters and sorts
+    the matches. Returns the (task_id, task_data) matches and their
+    {task_id: score}.
+    """
+    matches = search_tasks(search_term)
+    scores = {task_id: score for task_id, _, score in matches}
+    filtered_tasks = [(task_id, data) for task_id, data, _ in matches if matches_status(data, status)]
+    filtered_tasks.sort(key=sort_key_for(sort_by, scores), reverse=(direction == 'desc'))
+    return filtered_tasks, scores
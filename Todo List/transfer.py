@@ -0,0 +1,247 @@
+# transfer.py
+#
+# Streaming bulk import/export of tasks for the configured backend.
+#
+#   python transfer.py export backup.jsonl
+#   python transfer.py import backup.csv --concurrency 8
+#
+# Files are read and written one record at a time, so memory use stays
+# constant however many tasks there are. Imports write in chunked batches and
+# record a checkpoint after each one, so an interrupted import resumes where
+# it stopped instead of starting over.
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from task_storage import get_backend, get_tasks
+
+FIELDS = ['id', 'text', 'completed', 'created_at', 'due_date', 'notified']
+DATE_FIELDS = ('created_at', 'due_date')
+BOOL_FIELDS = ('completed', 'notified')
+
+
+# --- RECORD CONVERSION ---
+def to_record(task_id: str, task_data: dict) -> dict:
+    """Turns a task into a flat, JSON-safe record."""
+    record = {'id': task_id}
+    for field in FIELDS[1:]:
+        value = task_data.get(field)
+        record[field] = value.isoformat() if isinstance(value, datetime) else value
+    return record
+
+
+def from_record(record: dict, line_number: int, source: str):
+    """Turns a record back into (task_id, task_data), accepting CSV strings too."""
+    # Records without an id get a stable one, so re-running a chunk after a
+    # crash overwrites the tasks it already wrote instead of duplicating them.
+    task_id = record.get('id') or uuid.uuid5(uuid.NAMESPACE_URL, f'{os.path.abspath(source)}#{line_number}').hex
+    task_data = {'text': record['text']}
+    for field in DATE_FIELDS:
+        value = record.get(field)
+        task_data[field] = datetime.fromisoformat(value) if value else None
+    for field in BOOL_FIELDS:
+        value = record.get(field)
+        task_data[field] = value.strip().lower() in ('true', '1', 'yes') if isinstance(value, str) else bool(value)
+    return task_id, task_data
+
+
+# --- STREAMING READERS AND WRITERS ---
+def read_records(path: str, file_format: str):
+    """Yields (line_number, record) one at a time from a JSONL or CSV file."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if file_format == 'csv':
+            yield from enumerate(csv.DictReader(f), start=1)
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield line_number, json.loads(line)
+
+
+def iter_all_tasks(page_size: int):
+    """Yields every task, fetching one cursor page at a time."""
+    cursor = None
+    while True:
+        page = get_tasks(sort_by='created_at', direction='asc', page_size=page_size, start_after=cursor)
+        yield from page
+        if len(page) < page_size:
+            return
+        cursor = page[-1][0]
+
+
+def chunks(iterable, size: int):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def detect_format(path: str, file_format: str = None) -> str:
+    if file_format:
+        return file_format
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+# --- CHECKPOINTS ---
+class Checkpoint:
+    """
+    Remembers the last input line up to which every chunk has been committed.
+    Chunks can finish out of order, so only the contiguous prefix counts.
+    """
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.line = 0
+        self._done = {}  # first line of a finished chunk -> its last line
+        # Chunks are linked in order (previous last line + 1 -> first line) so
+        # the checkpoint can advance over every finished chunk without gaps.
+        self._next_first_line = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('source') == self.source:
+                self.line = saved.get('line', 0)
+
+    def link(self, after_line: int, first_line: int):
+        """Records that the chunk starting at first_line follows the one ending at after_line."""
+        with self._lock:
+            self._next_first_line[after_line + 1] = first_line
+
+    def mark_done(self, first_line: int, last_line: int):
+        with self._lock:
+            self._done[first_line] = last_line
+            links = self._next_first_line
+            while self.line + 1 in links and links[self.line + 1] in self._done:
+                self.line = self._done.pop(links.pop(self.line + 1))
+            self._save()
+
+    def _save(self):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'source': self.source, 'line': self.line}, f)
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# --- COMMANDS ---
+def export_tasks(path: str, file_format: str = None, page_size: int = 500) -> int:
+    """Writes every task to a JSONL or CSV file and returns how many were written."""
+    file_format = detect_format(path, file_format)
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS) if file_format == 'csv' else None
+        if writer:
+            writer.writeheader()
+        for task_id, task_data in iter_all_tasks(page_size):
+            record = to_record(task_id, task_data)
+            if writer:
+                writer.writerow(record)
+            else:
+                f.write(json.dumps(record) + '\n')
+            count += 1
+    return count
+
+
+def import_tasks(path: str, file_format: str = None, batch_size: int = None, concurrency: int = 4,
+                 checkpoint_path: str = None) -> int:
+    """
+    Writes every record of a JSONL or CSV file as a task, in batches committed
+    by up to `concurrency` workers, and returns how many were written. Lines
+    already covered by the checkpoint are skipped.
+    """
+    backend = get_backend()
+    file_format = detect_format(path, file_format)
+    batch_size = min(batch_size or backend.MAX_BATCH_SIZE, backend.MAX_BATCH_SIZE)
+    checkpoint = Checkpoint(checkpoint_path or path + '.checkpoint', path)
+    if checkpoint.line:
+        print(f"↪️ Resuming after line {checkpoint.line}")
+
+    records = ((n, r) for n, r in read_records(path, file_format) if n > checkpoint.line)
+    previous_last = checkpoint.line
+    in_flight = threading.BoundedSemaphore(concurrency * 2)
+    count = 0
+    count_lock = threading.Lock()
+    errors = []
+
+    def commit(chunk):
+        nonlocal count
+        try:
+            ops = [('set', *from_record(record, n, path)) for n, record in chunk]
+            backend.commit_batch(ops)
+            with count_lock:
+                count += len(chunk)
+            checkpoint.mark_done(chunk[0][0], chunk[-1][0])
+        except Exception as e:
+            errors.append(e)
+        finally:
+            in_flight.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for chunk in chunks(records, batch_size):
+            if errors:
+                break
+            # Never read further ahead than the workers can commit.
+            in_flight.acquire()
+            checkpoint.link(previous_last, chunk[0][0])
+            previous_last = chunk[-1][0]
+            pool.submit(commit, chunk)
+
+    if errors:
+        raise RuntimeError(f"Import stopped; rerun the same command to resume from line {checkpoint.line}") from errors[0]
+    checkpoint.clear()
+    return count
+
+
+def report(action: str, count: int, seconds: float):
+    rate = count / seconds if seconds > 0 else float('inf')
+    print(f"✅ {action} {count:,} tasks in {seconds:.2f}s ({rate:,.0f} tasks/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk import/export of tasks as JSONL or CSV.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='write every task to a file')
+    export_parser.add_argument('path')
+    export_parser.add_argument('--format', choices=['jsonl', 'csv'])
+    export_parser.add_argument('--page-size', type=int, default=500)
+
+    import_parser = subparsers.add_parser('import', help='write every record of a file as a task')
+    import_parser.add_argument('path')
+    import_parser.add_argument('--format', choices=['jsonl', 'csv'])
+    import_parser.add_argument('--batch-size', type=int, help='writes per batch (at most the backend limit)')
+    import_parser.add_argument('--concurrency', type=int, default=4, help='batches committed at once')
+    import_parser.add_argument('--checkpoint', help='checkpoint file (default: <path>.checkpoint)')
+
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    try:
+        if args.command == 'export':
+            count = export_tasks(args.path, args.format, args.page_size)
+            report('Exported', count, time.perf_counter() - started)
+        else:
+            count = import_tasks(args.path, args.format, args.batch_size, args.concurrency, args.checkpoint)
+            report('Imported', count, time.perf_counter() - started)
+    except Exception as e:
+        print(f"🔴 {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,434 @@
+# loadtest.py
+#
+# Load test for all three apps against local stand-ins, so it needs no
+# Firestore project, browser or network:
+#
+#   python loadtest.py                                       # every app -> loadtest_results.json
+#   python loadtest.py --apps todo,rps --users 100 --duration 20
+#   python loadtest.py --firestore-latency-ms 20             # pretend Firestore is 20 ms away
+#   python loadtest.py --baseline loadtest_baseline.json     # exit 1 on a regression
+#
+# The Todo List runs its Firestore backend on fake_firestore, an in-memory
+# stand-in (or on SQLite with --todo-backend sqlite). Password and Rock Paper
+# Scissor keep their vault and history shards in a temporary directory.
+#
+# Simulated users run concurrently in one asyncio loop. Each one repeats a
+# weighted mix of the work behind an app's event handlers, with a short random
+# think time in between. Blocking calls go to the thread pool the way
+# NiceGUI's run.io_bound (and Streamlit's script threads) would run them:
+#
+#   todo      refresh_tasks / load_next_page (task_views.fetch_page), a search
+#             (task_views.search_view), adding a task, toggling a task
+#   password  update_password (password_logic.new_password), save_password
+#             (VaultSession.save), copying a saved password
+#   rps       a round (players.play_round), a page of history, the analytics
+#             view, the leaderboard
+#
+# The handlers themselves are closures inside the NiceGUI pages and the
+# Streamlit script; their work lives in those module functions, which both
+# the apps and this harness call. Each operation's throughput and
+# p50/p95/p99 latency are written to a JSON file, along with the command,
+# commit and CPU count of the run.
+#
+# loadtest_baseline.json is a committed reference run, recorded on a 1-CPU
+# machine with the default settings:
+#
+#   python loadtest.py -o loadtest_baseline.json
+#
+# Against a --baseline run, a p95 more than TOLERANCE slower, lower
+# throughput, or any failed operation is a regression. Runs are only
+# compared when both used the same settings on the same number of CPUs;
+# otherwise the differences say nothing about the code, and the comparison
+# is refused (exit status 2). Record a new baseline on the machine instead.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP_DIRS = {'todo': 'Todo List', 'password': 'Password', 'rps': 'Rock Paper Scissor'}
+
+# How much slower (p95) or less busy (throughput) an operation may get before it counts as a regression...
+TOLERANCE = 0.25
+# ...as long as the p95 also grew by more than this, so millisecond noise is not flagged,
+MIN_REGRESSION_MS = 2.0
+# ...and both runs timed the operation at least this often.
+MIN_SAMPLES = 200
+
+# Same as PAGE_SIZE in Todo List/main.py and HISTORY_PAGE_SIZE in Rock Paper Scissor/main.py.
+TODO_PAGE_SIZE = 25
+RPS_PAGE_SIZE = 50
+SEARCH_TERMS = ('report', 'call', 'groceries', 'fix', 'email', 'plan meeting', 'pay')
+TASK_WORDS = ('write report', 'call mum', 'buy groceries', 'fix bike', 'email team', 'plan meeting', 'pay rent',
+              'book dentist', 'clean kitchen', 'read chapter')
+
+
+def _use_app(app: str):
+    """Makes an app's modules importable by name, as they are when the app runs from its folder."""
+    path = os.path.join(ROOT, APP_DIRS[app])
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def _in_thread(func, *args, **kwargs):
+    return asyncio.get_running_loop().run_in_executor(None, partial(func, *args, **kwargs))
+
+
+# --- TODO LIST ---
+def setup_todo(workdir: str, args):
+    os.environ['TODO_BACKEND'] = args.todo_backend
+    os.environ['TODO_SQLITE_PATH'] = os.path.join(workdir, 'todos.db')
+    _use_app('todo')
+    if args.todo_backend == 'firestore':
+        import fake_firestore
+        fake_firestore.install(latency=args.firestore_latency_ms / 1000)
+    import task_storage
+    import task_views
+
+    # Seed the store directly, in full batches.
+    backend = task_storage.get_backend()
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    task_ids = []
+    for start in range(0, args.todo_tasks, backend.MAX_BATCH_SIZE):
+        ops = []
+        for _ in range(min(backend.MAX_BATCH_SIZE, args.todo_tasks - start)):
+            task_id = backend.new_task_id()
+            task_ids.append(task_id)
+            ops.append(('set', task_id, {
+                'text': f'{rng.choice(TASK_WORDS)} {rng.randint(1, 999)}',
+                'completed': rng.random() < 0.3,
+                'created_at': now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+                'due_date': now + timedelta(hours=rng.randint(-48, 24 * 30)) if rng.random() < 0.6 else None,
+                'notified': False,
+            }))
+        backend.commit_batch(ops)
+    task_storage.prewarm()
+
+    def new_query(rng):
+        return {
+            'status': rng.choice((task_views.ALL, 'pending', 'completed')),
+            'sort_by': rng.choice(('created_at', 'due_date', 'text', 'relevance')),
+            'direction': rng.choice(('asc', 'desc')),
+        }
+
+    def check_order(page, query):
+        # The app renders a page through task_views.sort_key_for; a page it would reorder is a failure.
+        out_of_order = task_views.misordered(page, query['sort_by'], query['direction'])
+        if out_of_order:
+            raise AssertionError(f"{len(out_of_order)} task(s) out of {query['sort_by']} {query['direction']} order")
+
+    async def refresh(user):
+        # refresh_tasks: a new query from the first page.
+        user['query'] = new_query(user['rng'])
+        page = await _in_thread(task_views.fetch_page, page_size=TODO_PAGE_SIZE, **user['query'])
+        check_order(page, user['query'])
+        user['last'] = page[-1] if len(page) == TODO_PAGE_SIZE else None
+        user['cursor'] = user['last'] and user['last'][0]
+
+    async def next_page(user):
+        # load_next_page: infinite scroll continues the current query.
+        if not user.get('cursor'):
+            return await refresh(user)
+        page = await _in_thread(task_views.fetch_page, page_size=TODO_PAGE_SIZE, start_after=user['cursor'],
+                                **user['query'])
+        # Includes the last task of the previous page, so a cursor that drifts is caught too.
+        check_order([user['last']] + page, user['query'])
+        user['last'] = page[-1] if len(page) == TODO_PAGE_SIZE else None
+        user['cursor'] = user['last'] and user['last'][0]
+
+    async def search(user):
+        # refresh_tasks with a search term: the live cache and its index, filtered and sorted on the event loop.
+        await _in_thread(task_storage.start_task_cache)
+        task_views.search_view(user['rng'].choice(SEARCH_TERMS), **new_query(user['rng']))
+
+    async def add(user):
+        task_id = await task_storage.add_task_async(f"{user['rng'].choice(TASK_WORDS)} (load test)")
+        task_ids.append(task_id)
+
+    async def toggle(user):
+        await task_storage.update_task_async(user['rng'].choice(task_ids), {'completed': user['rng'].random() < 0.5})
+
+    actions = {'refresh': (refresh, 4), 'next_page': (next_page, 3), 'search': (search, 2),
+               'add_task': (add, 1), 'toggle_task': (toggle, 1)}
+    return actions, task_storage.stop_task_cache
+
+
+# --- PASSWORD ---
+def setup_password(workdir: str, args):
+    os.environ['PASSWORD_VAULT_PATH'] = os.path.join(workdir, 'vault.db')
+    # No breach index unless one is given, so scoring does not depend on what is on this machine.
+    os.environ['PASSWORD_BREACH_INDEX'] = args.breach_index or os.path.join(workdir, 'breached.idx')
+    _use_app('password')
+    from password_logic import new_password
+    from vault import Vault
+
+    # One vault per server process, as default_vault() gives every page, and an unlocked session of it.
+    shared_vault = Vault(os.environ['PASSWORD_VAULT_PATH'])
+    shared_vault.initialise('load test passphrase')
+    vault = shared_vault.session()
+    vault.unlock('load test passphrase')
+    new_password(16, True, True, True, True)  # loads the strength dictionaries
+
+    def next_password(user):
+        rng = user['rng']
+        flags = [rng.random() < 0.8 for _ in range(4)]
+        flags[1] = flags[1] or not any(flags)
+        user['password'], _ = new_password(rng.randint(8, 32), *flags)
+
+    async def update_password(user):
+        # A synchronous handler, so it runs on the event loop like in NiceGUI.
+        next_password(user)
+
+    async def save_password(user):
+        if 'password' not in user:
+            next_password(user)
+        service = f"service-{user['index']}-{user['rng'].randint(1, 20)}"
+        vault.save(service, user['password'])
+        user['saved'] = service
+
+    async def copy_saved(user):
+        if 'saved' in user:
+            vault.get(user['saved'])
+
+    actions = {'update_password': (update_password, 6), 'save_password': (save_password, 2),
+               'copy_saved': (copy_saved, 1)}
+    return actions, shared_vault.close
+
+
+# --- ROCK PAPER SCISSOR ---
+def setup_rps(workdir: str, args):
+    os.environ['RPS_DATA_DIR'] = os.path.join(workdir, 'players')
+    _use_app('rps')
+    import players
+    from analytics import PlayAnalytics
+    from game_logic import CHOICES, Opponent
+
+    # Per-player objects, as get_store / get_opponent / get_analytics cache them.
+    stores, opponents, analytics = {}, {}, {}
+    for number in range(args.rps_players):
+        name = f'player-{number}'
+        stores[name] = players.open_shard(name)
+        opponents[name] = Opponent(stores[name].path + '.opponent.json')
+        analytics[name] = PlayAnalytics()
+
+    def player_of(user):
+        return f"player-{user['index'] % args.rps_players}"
+
+    async def round_(user):
+        # Players lean towards Rock, so the learning opponent has something to find.
+        move = user['rng'].choices(CHOICES, weights=(0.5, 0.25, 0.25))[0]
+        name = player_of(user)
+        await _in_thread(players.play_round, stores[name], opponents[name], move)
+
+    async def history_page(user):
+        store = stores[player_of(user)]
+        rounds = store.summary['rounds']
+        await _in_thread(store.read_rounds, max(0, rounds - RPS_PAGE_SIZE), rounds)
+
+    async def analytics_view(user):
+        name = player_of(user)
+        await _in_thread(lambda: (analytics[name].update(stores[name]), analytics[name].view()))
+
+    async def leaderboard(user):
+        await _in_thread(players.leaderboard, limit=10)
+
+    def close():
+        for store in stores.values():
+            store.close()
+
+    actions = {'round': (round_, 6), 'history_page': (history_page, 2), 'analytics': (analytics_view, 1),
+               'leaderboard': (leaderboard, 1)}
+    return actions, close
+
+
+SETUPS = {'todo': setup_todo, 'password': setup_password, 'rps': setup_rps}
+
+
+# --- DRIVER ---
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def drive(actions: dict, users: int, duration: float, think: float, seed: int):
+    """Runs `users` simulated users for `duration` seconds; returns latencies and failures per operation."""
+    names = list(actions)
+    weights = [actions[name][1] for name in names]
+    latencies, failures, first_errors = defaultdict(list), defaultdict(int), {}
+    deadline = time.perf_counter() + duration
+
+    async def user(index: int):
+        state = {'index': index, 'rng': random.Random(seed * 100_003 + index)}
+        rng = state['rng']
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                await actions[name][0](state)
+            except Exception as e:
+                failures[name] += 1
+                first_errors.setdefault(name, f'{type(e).__name__}: {e}')
+            else:
+                latencies[name].append(time.perf_counter() - started)
+            if think:
+                await asyncio.sleep(rng.expovariate(1 / think))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(index) for index in range(users)))
+    return latencies, failures, first_errors, time.perf_counter() - started
+
+
+def run_app(app: str, args) -> dict:
+    with tempfile.TemporaryDirectory(prefix=f'loadtest-{app}-') as workdir:
+        print(f'{app}: setting up', file=sys.stderr)
+        actions, teardown = SETUPS[app](workdir, args)
+        try:
+            latencies, failures, first_errors, elapsed = asyncio.run(
+                drive(actions, args.users, args.duration, args.think_ms / 1000, args.seed))
+        finally:
+            teardown()
+
+    operations = {}
+    for name in actions:
+        values = sorted(latencies.get(name, []))
+        operations[name] = {
+            'count': len(values), 'failures': failures.get(name, 0),
+            'per_second': round(len(values) / elapsed, 1),
+            'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+            'max_ms': round(values[-1] * 1000, 3) if values else None,
+        }
+        if name in first_errors:
+            operations[name]['first_error'] = first_errors[name]
+    return {'seconds': round(elapsed, 2), 'operations': operations,
+            'per_second': round(sum(op['count'] for op in operations.values()) / elapsed, 1)}
+
+
+# --- REPORT ---
+def print_app(app: str, result: dict):
+    print(f"\n{app}: {result['per_second']:,.0f} operations/s over {result['seconds']}s")
+    print(f"  {'operation':16} {'count':>8} {'per sec':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'failed':>7}")
+    for name, op in result['operations'].items():
+        print(f"  {name:16} {op['count']:>8,} {op['per_second']:>9,.1f} {op['p50_ms']:>9.2f} "
+              f"{op['p95_ms']:>9.2f} {op['p99_ms']:>9.2f} {op['failures']:>7}")
+        if 'first_error' in op:
+            print(f"    🔴 {op['first_error']}")
+
+
+def _git_commit():
+    """The short commit the tree is at, marked '-dirty' if tracked files were changed since."""
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty', '--abbrev=7'], capture_output=True,
+                              text=True, cwd=ROOT).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _comparable(results: dict, baseline: dict) -> list:
+    """Why two runs cannot be compared: the settings (other than which apps ran) or CPU counts that differ."""
+    ignored = ('apps', 'tolerance')
+    settings = {key: value for key, value in results['settings'].items() if key not in ignored}
+    old_settings = {key: value for key, value in baseline.get('settings', {}).items() if key not in ignored}
+    differences = [f"{key}: {old_settings.get(key)!r} -> {settings.get(key)!r}"
+                   for key in sorted(settings.keys() | old_settings.keys()) if settings.get(key) != old_settings.get(key)]
+    if baseline.get('cpus') != results['cpus']:
+        differences.append(f"cpus: {baseline.get('cpus')} -> {results['cpus']}")
+    return differences
+
+
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE):
+    """Operations that got slower or less frequent than in the baseline, plus any that failed."""
+    regressions = []
+    for app, result in results['apps'].items():
+        old_ops = baseline.get('apps', {}).get(app, {}).get('operations', {})
+        for name, op in result['operations'].items():
+            if op['failures']:
+                regressions.append(f"{app} {name}: {op['failures']} failed ({op.get('first_error')})")
+            old = old_ops.get(name)
+            if not old or min(op['count'], old.get('count', 0)) < MIN_SAMPLES:
+                continue
+            if op['p95_ms'] > old['p95_ms'] * (1 + tolerance) and op['p95_ms'] - old['p95_ms'] > MIN_REGRESSION_MS:
+                regressions.append(f"{app} {name} p95: {old['p95_ms']:.2f} ms -> {op['p95_ms']:.2f} ms")
+            if op['per_second'] < old['per_second'] * (1 - tolerance):
+                regressions.append(f"{app} {name} throughput: {old['per_second']:,.1f}/s -> {op['per_second']:,.1f}/s")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test the Todo List, Password and Rock Paper Scissor apps locally.')
+    parser.add_argument('--apps', default=','.join(APP_DIRS), help=f'comma-separated, from: {", ".join(APP_DIRS)}')
+    parser.add_argument('--users', type=int, default=50, help='concurrent simulated users per app')
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load per app')
+    parser.add_argument('--think-ms', type=float, default=20, help='mean pause between a user\'s actions')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--todo-backend', choices=('firestore', 'sqlite'), default='firestore',
+                        help='firestore runs on the in-memory fake')
+    parser.add_argument('--todo-tasks', type=int, default=2000, help='tasks in the store before the test')
+    parser.add_argument('--firestore-latency-ms', type=float, default=0, help='simulated round trip to the fake Firestore')
+    parser.add_argument('--rps-players', type=int, default=None,
+                        help='history shards the users play on (default: one per user)')
+    parser.add_argument('--breach-index', help='breach index for password scoring (default: none)')
+    parser.add_argument('--output', '-o', default='loadtest_results.json')
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+    args.rps_players = args.rps_players or args.users
+
+    apps = [app.strip() for app in args.apps.split(',') if app.strip()]
+    unknown = [app for app in apps if app not in APP_DIRS]
+    if unknown:
+        print(f"Error: unknown apps {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
+
+    results = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'command': ' '.join(['python', 'loadtest.py', *(sys.argv[1:] if argv is None else argv)]),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'apps': {},
+    }
+    for app in apps:
+        results['apps'][app] = run_app(app, args)
+        print_app(app, results['apps'][app])
+
+    differences = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        differences = _comparable(results, baseline)
+        if not differences:
+            results['regressions'] = compare(results, baseline, args.tolerance)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nResults written to {args.output}', file=sys.stderr)
+
+    failed = any(op['failures'] for result in results['apps'].values() for op in result['operations'].values())
+    for regression in results.get('regressions', []):
+        print(f'🔴 {regression}', file=sys.stderr)
+    if failed or results.get('regressions'):
+        sys.exit(1)
+    if differences:
+        print(f"🔴 Not comparing with {args.baseline}, which was recorded with different settings:", file=sys.stderr)
+        for difference in differences:
+            print(f'    {difference}', file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()